@@ -1,12 +1,20 @@
 import streamlit as st
-from streamlit_quill import st_quill
-import pandas as pd
 from datetime import datetime
+from types import SimpleNamespace
 import json
 import os
-import re
-import requests
-from bs4 import BeautifulSoup
+import library_search
+import metrics
+import archive
+import changes
+import discussions
+import feeds
+import presets
+import rich_text
+import search_index
+import storage
+import tickets
+import views
 
 # --- CONFIG ---
 st.set_page_config(page_title="Arma Staff Portal", layout="wide")
@@ -15,10 +23,88 @@ st.set_page_config(page_title="Arma Staff Portal", layout="wide")
 SYSTEM_PASSWORD = st.secrets.get("SYSTEM_PASSWORD")
 SYSTEM_EMAIL = st.secrets.get("SYSTEM_EMAIL")
 DB_FILE = "portal_data.json"
+DB_BACKEND = st.secrets.get("DB_BACKEND", "json")
+DB_JOURNAL_COMPACT_BYTES = int(st.secrets.get("DB_JOURNAL_COMPACT_BYTES", 1_000_000))
+DB_FORMAT = st.secrets.get("DB_FORMAT", "json")
+WORKSHOP_CACHE_FILE = "workshop_cache.sqlite"
+WORKSHOP_MAX_CONNECTIONS = int(st.secrets.get("WORKSHOP_MAX_CONNECTIONS", 8))
+WORKSHOP_RATE = float(st.secrets.get("WORKSHOP_RATE", 4.0))
+WORKSHOP_DEPENDENCY_DEPTH = int(st.secrets.get("WORKSHOP_DEPENDENCY_DEPTH", 5))
+LIBRARY_REFRESH_INTERVAL = int(st.secrets.get("LIBRARY_REFRESH_INTERVAL", 0))
+FEED_PAGE_SIZE = int(st.secrets.get("FEED_PAGE_SIZE", 20))
+RICH_TEXT_CACHE_BYTES = int(st.secrets.get("RICH_TEXT_CACHE_BYTES", 16_000_000))
+RICH_TEXT_MAX_BYTES = int(st.secrets.get("RICH_TEXT_MAX_BYTES", 256_000))
+ARCHIVE_DIR = os.path.splitext(DB_FILE)[0] + ".archive"
+ARCHIVE_AFTER_DAYS = float(st.secrets.get("ARCHIVE_AFTER_DAYS", 30))
+DISCUSSIONS_DIR = os.path.splitext(DB_FILE)[0] + ".discussions"
+DISCUSSION_PAGE_SIZE = int(st.secrets.get("DISCUSSION_PAGE_SIZE", 30))
+SEARCH_INDEX_FILE = os.path.splitext(DB_FILE)[0] + ".search.sqlite"
+SEARCH_RESULTS = int(st.secrets.get("SEARCH_RESULTS", 20))
+LIVE_POLL_SECONDS = float(st.secrets.get("LIVE_POLL_SECONDS", 5))
+PRESENCE_DIR = os.path.splitext(DB_FILE)[0] + ".presence"
+PRESENCE_TIMEOUT = int(st.secrets.get("PRESENCE_TIMEOUT", 60))
+METRICS_ENABLED = bool(st.secrets.get("METRICS_ENABLED", False))
+METRICS_FILE = st.secrets.get("METRICS_FILE", "")
+METRICS_WRITE_INTERVAL = int(st.secrets.get("METRICS_WRITE_INTERVAL", 15))
+
+@st.cache_resource
+def get_store():
+    return storage.open_store(DB_BACKEND, DB_FILE, compact_bytes=DB_JOURNAL_COMPACT_BYTES, fmt=DB_FORMAT)
+
+STORE = get_store()
+
+@st.cache_resource
+def get_metrics():
+    """Timings and counters for the debug page and METRICS_FILE; a no-op unless METRICS_ENABLED."""
+    m = metrics.Metrics(enabled=METRICS_ENABLED)
+    store = get_store()
+    m.add_collector(lambda: [("db_read_bytes", {"backend": DB_BACKEND}, store.bytes_read),
+                             ("db_written_bytes", {"backend": DB_BACKEND}, store.bytes_written)])
+    if METRICS_ENABLED and METRICS_FILE: m.start_writer(METRICS_FILE, METRICS_WRITE_INTERVAL)
+    return m
+
+METRICS = get_metrics()
+
+@st.cache_resource
+def get_change_feed():
+    """Versioned log of which DB keys changed, polled by open sessions (see live_updates)."""
+    return changes.ChangeFeed()
+
+@st.cache_resource
+def get_presence():
+    """Heartbeats of signed-in users, shared by every replica through PRESENCE_DIR."""
+    return changes.Presence(PRESENCE_DIR, ttl=PRESENCE_TIMEOUT)
+
+@st.cache_resource
+def get_archive():
+    """Compressed cold storage for tickets completed more than ARCHIVE_AFTER_DAYS ago."""
+    return archive.Archive(ARCHIVE_DIR)
+
+@st.cache_resource
+def get_discussions():
+    """Per-ticket append-only discussion threads."""
+    return discussions.Discussions(DISCUSSIONS_DIR)
+
+@st.cache_resource
+def get_search_index():
+    """Full-text index over tickets, discussions and feeds; a file next to the database, shared by all processes."""
+    return search_index.SearchIndex(SEARCH_INDEX_FILE)
 
 # --- DATABASE FUNCTIONS ---
-def load_db():
-    if not os.path.exists(DB_FILE):
+def prepare_save(target, ours):
+    """Runs under the store lock on the document every save is about to write, merged with other writers'."""
+    tickets.assign_ids(target, ours)
+    presets.restore(target, ours)
+    if ARCHIVE_AFTER_DAYS > 0: archive.sweep(target, get_archive(), ARCHIVE_AFTER_DAYS)
+
+def prepare_load_save(target, ours):
+    """prepare_save plus the clean-ups that must see every writer's changes: the load_db save only."""
+    prepare_save(target, ours)
+    presets.collect(target)
+
+def read_db():
+    """load_db without the error page: raises json.JSONDecodeError instead, so threads can call it."""
+    if not STORE.exists():
         default_data = {
             "role_db": {SYSTEM_EMAIL: "SUPER_ADMIN"},
             "usernames": {SYSTEM_EMAIL: "SYSTEM_ADMIN"},
@@ -29,99 +115,148 @@ def load_db():
             "tutorials": [],
             "announcements": [],
             "mod_library": [],
-            "server_configs": []
+            "server_configs": [],
+            "_seq": {"mods": 0, "projects": 0}
         }
-        with open(DB_FILE, 'w') as f:
-            json.dump(default_data, f)
+        STORE.reset(default_data)
         return default_data
+    with METRICS.time("db_load"):
+        data = STORE.load()
+    if "usernames" not in data: data["usernames"] = {}
+    if "mod_library" not in data: data["mod_library"] = []
+    if "server_configs" not in data: data["server_configs"] = []
+    if "projects" not in data: data["projects"] = []
+    stamp = tickets.now_stamp()
+    for m in data.get("mods", []):
+        if "read" not in m: m["read"] = True
+        if m.get("complete") and "completed_at" not in m: m["completed_at"] = stamp
+    for p in data.get("projects", []):
+        if "read" not in p: p["read"] = True
+        if p.get("complete") and "completed_at" not in p: p["completed_at"] = stamp
+    # Renumbered tickets and moves that shrink the document are saved right away rather than on the next edit.
+    migrated = tickets.ensure_ids(data) > 0
+    # Only now: thread files are named by ticket id, so duplicate ids must be renumbered first.
+    for name in tickets.COLLECTIONS:
+        for t in data.get(name, []):
+            if 'discussion' in t:
+                get_discussions().import_inline(name, t)
+                migrated = True
+    if ARCHIVE_AFTER_DAYS > 0 and archive.due(data, ARCHIVE_AFTER_DAYS):
+        migrated = True  # the save's prepare_save does the sweep
+    if presets.migrate(data) or presets.unused(data):
+        migrated = True
+    if migrated:
+        data = STORE.save(data, prepare_load_save) or data
+    with METRICS.time("search_sync"):
+        get_search_index().sync(data, get_archive())
+    return data
+
+def load_db():
     try:
-        with open(DB_FILE, 'r') as f:
-            data = json.load(f)
-            if "usernames" not in data: data["usernames"] = {}
-            if "mod_library" not in data: data["mod_library"] = []
-            if "server_configs" not in data: data["server_configs"] = []
-            if "projects" not in data: data["projects"] = []
-            for m in data.get("mods", []):
-                if "read" not in m: m["read"] = True
-            for p in data.get("projects", []):
-                if "read" not in p: p["read"] = True
-            return data
-    except json.JSONDecodeError: return {} 
+        return read_db()
+    except json.JSONDecodeError as e:
+        # Saves are atomic, so this is real corruption: refuse to run on an empty DB.
+        st.error(f"Database file is unreadable ({e}). Restore it from a backup before continuing.")
+        st.stop()
 
-def save_db(data):
-    with open(DB_FILE, 'w') as f:
-        json.dump(data, f, indent=4)
+@st.cache_resource
+def get_shared_db():
+    """Process-wide copy of the DB; reloaded only when the file changes."""
+    return storage.SharedDB(STORE, load_db, feed=get_change_feed(), prepare=prepare_save)
 
-DB = load_db()
+def save_db(data):
+    seen = get_change_feed().version
+    with METRICS.time("db_save"):
+        try:
+            get_shared_db().save(data)
+        except storage.StaleDocument:
+            st.error("The data changed too much while this page was open, so your change was not saved. Reload the page and try again.")
+            st.stop()
+    if st.session_state.get("feed_seen") == seen:  # this session's own change is on screen already
+        st.session_state.feed_seen = get_change_feed().version
+    with METRICS.time("search_sync"):
+        get_search_index().sync(data, get_archive())
+
+FEED_SEEN = get_change_feed().version  # read first: a change racing the load reruns once rather than being missed
+DB = get_shared_db().get()
+DB_LOCK = get_shared_db().lock  # held by every edit of DB through its save_db, see storage.SharedDB
+
+@st.cache_resource
+def get_ticket_indexes():
+    """Ticket counters and id index, rebuilt only when a new copy of the DB is loaded."""
+    return tickets.IndexCache()
+
+TICKETS = get_ticket_indexes().get(DB)
 
 # --- HELPER: WORKSHOP SCRAPER ---
+def timed_get(get):
+    """Times each Workshop request up to its response headers and counts responses by status."""
+    if not METRICS_ENABLED: return get
+    def wrapped(url):
+        with METRICS.time("workshop_request"):
+            status, body = get(url)
+        METRICS.inc("workshop_responses", status=status)
+        return status, body
+    return wrapped
+
+@st.cache_resource
+def get_workshop_cache():
+    """Workshop metadata cache shared by all sessions (memory LRU + sqlite file)."""
+    import workshop  # requests + BeautifulSoup: only loaded once a page needs the Workshop
+    return workshop.MetadataCache(
+        WORKSHOP_CACHE_FILE,
+        ttl=int(st.secrets.get("WORKSHOP_CACHE_TTL", 86400)),
+        max_stale=int(st.secrets.get("WORKSHOP_CACHE_MAX_STALE", 7 * 86400)),
+        negative_ttl=int(st.secrets.get("WORKSHOP_CACHE_NEGATIVE_TTL", 3600)),
+        get=timed_get(workshop.make_session_get(max_connections=WORKSHOP_MAX_CONNECTIONS, rate=WORKSHOP_RATE)),
+    )
+
 def fetch_mod_details(mod_input):
-    mod_id = mod_input.strip()
-    if "reforger.armaplatform.com/workshop/" in mod_id:
-        try:
-            mod_id = mod_id.split("workshop/")[1].split("-")[0]
-        except: return None, None, None, "Invalid URL format"
-    
-    url = f"https://reforger.armaplatform.com/workshop/{mod_id}"
-    
-    try:
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers, timeout=5)
-        
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            title_tag = soup.find("meta", property="og:title")
-            mod_name = title_tag["content"] if title_tag else "Unknown Mod"
-            img_tag = soup.find("meta", property="og:image")
-            mod_img = img_tag["content"] if img_tag else None
-            mod_version = "" 
-            return mod_id, mod_name, mod_img, mod_version
-        else:
-            return mod_id, None, None, f"Error: {response.status_code}"
-    except Exception as e:
-        return mod_id, None, None, str(e)
-
-# --- SMART JSON INSERTER (FIXES BRACKET ISSUES) ---
-def inject_mod(current_text, mod_obj):
-    """
-    Intelligently inserts a mod object into a JSON list string.
-    Handles trailing whitespace and malformed JSON better.
-    """
-    # 1. Clean input
-    s = current_text.strip()
-    
-    # 2. Try Strict Parse (Best Case)
-    try:
-        data = json.loads(s)
-        if isinstance(data, list):
-            data.append(mod_obj)
-            return json.dumps(data, indent=4)
-    except:
-        pass # Fallback to string manipulation if JSON is currently invalid (common while editing)
-
-    # 3. String Manipulation Fallback
-    snippet = json.dumps(mod_obj, indent=4)
-    
-    if s.endswith("]"):
-        # We found the end of the list.
-        # Check if list is effectively empty "[]"
-        if len(s) < 3:
-            return f"[\n{snippet}\n]"
-        
-        # Peel off the last ']'
-        # rstrip() removes whitespace/newlines before the bracket to prevent weird gaps
-        content = s[:-1].rstrip()
-        
-        # Add comma, new object, and close bracket
-        return f"{content},\n{snippet}\n]"
-    
-    elif not s:
-        # Empty editor -> Start new list
-        return f"[\n{snippet}\n]"
-    
-    else:
-        # No closing bracket found? Just append (Safe fallback)
-        return s + ",\n" + snippet
+    import workshop
+    with METRICS.time("workshop_lookup"):
+        return workshop.fetch_mod_details(mod_input, cache=get_workshop_cache())
+
+def resolve_dependencies(mod_ids):
+    """`mod_ids` plus everything they depend on, dependencies first (see workshop.resolve_dependencies)."""
+    import workshop
+    cache = get_workshop_cache()
+    with METRICS.time("workshop_resolve"):
+        return workshop.resolve_dependencies(
+            mod_ids, lambda mod_id: cache.lookup(mod_id, dependencies=True),
+            max_depth=WORKSHOP_DEPENDENCY_DEPTH, max_workers=WORKSHOP_MAX_CONNECTIONS,
+        )
+
+@st.cache_resource
+def start_library_refresh():
+    """Keeps mod_library names/versions/images current in a background thread."""
+    import library_refresh
+    shared = get_shared_db()
+    # read_db, not load_db: the thread has no script run for st.error / st.stop.
+    return library_refresh.LibraryRefresher(
+        lambda: shared.get(read_db), shared.save, get_workshop_cache(), LIBRARY_REFRESH_INTERVAL,
+        max_workers=WORKSHOP_MAX_CONNECTIONS, lock=shared.lock,
+    ).start()
+
+if LIBRARY_REFRESH_INTERVAL > 0: start_library_refresh()
+
+@st.cache_resource
+def get_library_index():
+    """Search index over mod_library, shared by all sessions and kept in step with DB."""
+    return library_search.LibraryIndex()
+
+LIBRARY_PAGE_SIZE = 25
+
+# --- RICH TEXT ---
+@st.cache_resource
+def get_render_cache():
+    """Sanitized, image-extracted Quill HTML, cached per distinct content."""
+    return rich_text.RenderCache(
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "rich"), "app/static/rich/",
+        max_bytes=RICH_TEXT_CACHE_BYTES, max_html_bytes=RICH_TEXT_MAX_BYTES,
+    )
+
+def show_html(content):
+    st.markdown(get_render_cache().render(content), unsafe_allow_html=True)
 
 # --- LOCAL SESSION STATE ---
 if "logged_in" not in st.session_state: st.session_state.logged_in = False
@@ -131,12 +266,12 @@ if "selected_mod_id" not in st.session_state: st.session_state.selected_mod_id =
 if "selected_project_id" not in st.session_state: st.session_state.selected_project_id = None
 if "editor_content" not in st.session_state: st.session_state.editor_content = "[\n\n]"
 if "fetched_mod" not in st.session_state: st.session_state.fetched_mod = None
+if "bulk_results" not in st.session_state: st.session_state.bulk_results = None
+if "dependency_report" not in st.session_state: st.session_state.dependency_report = None
 if "editor_key" not in st.session_state: st.session_state.editor_key = 0 
-
-# --- CALLBACK TO SYNC EDITOR ---
-def sync_editor():
-    """Captures manual typing in the text box"""
-    st.session_state.editor_content = st.session_state[f"json_area_{st.session_state.editor_key}"]
+if "editor_model" not in st.session_state: st.session_state.editor_model = None
+if "lib_query" not in st.session_state: st.session_state.lib_query = ""
+if "lib_page" not in st.session_state: st.session_state.lib_page = 0
 
 # --- CSS ---
 st.markdown("""
@@ -226,10 +361,11 @@ if not st.session_state.logged_in:
                     if new_email in DB['role_db']: st.error("Account exists.")
                     elif new_pass != conf_pass: st.error("Passwords mismatch.")
                     elif new_email and new_pass and new_user:
-                        DB['role_db'][new_email] = "staff"
-                        DB['passwords'][new_email] = new_pass
-                        DB['usernames'][new_email] = new_user
-                        save_db(DB) 
+                        with DB_LOCK:
+                            DB['role_db'][new_email] = "staff"
+                            DB['passwords'][new_email] = new_pass
+                            DB['usernames'][new_email] = new_user
+                            save_db(DB)
                         st.success("Created! Login now.")
                     else: st.warning("All fields required.")
     st.stop()
@@ -247,15 +383,97 @@ def navigate_to(page, mod_id=None, proj_id=None):
     st.session_state.selected_project_id = proj_id
 
 def get_mod_status():
-    if not DB['mods']: return "🟢"
-    return "🔴" if any(not m['complete'] for m in DB['mods']) else "🟢"
+    return "🔴" if TICKETS.stats['mods'].active else "🟢"
+
+# --- FEEDS ---
+def render_pager(state_key, page, pages, caption):
+    """◀ / ▶ buttons around a "Page x of y" caption; state_key holds the page number."""
+    if pages <= 1: return
+    c_prev, c_pos, c_next = st.columns([1, 2, 1], vertical_alignment="center")
+    if c_prev.button("◀", key=f"{state_key}_prev", disabled=page == 0, use_container_width=True):
+        st.session_state[state_key] = page - 1
+        st.rerun()
+    c_pos.caption(f"Page {page + 1} of {pages} · {caption}")
+    if c_next.button("▶", key=f"{state_key}_next", disabled=page >= pages - 1, use_container_width=True):
+        st.session_state[state_key] = page + 1
+        st.rerun()
+
+def render_feed(key, items, render_item, sorts=None, empty="Nothing here yet."):
+    """
+    Renders one page of `items` with render_item(item), plus a sort picker and
+    pager. sorts maps a label to (key function or None for list order, reverse);
+    the first entry is the default.
+    """
+    if not items:
+        st.info(empty)
+        return
+    state_key = f"feed_{key}_page"
+    sorts = sorts or {"Newest first": (None, False)}
+    label = next(iter(sorts))
+    if len(sorts) > 1:
+        label = st.selectbox("Sort by", list(sorts), key=f"feed_{key}_sort",
+                             on_change=lambda: st.session_state.update({state_key: 0}))
+    sort_key, reverse = sorts[label]
+    pages = feeds.page_count(len(items), FEED_PAGE_SIZE)
+    page = min(st.session_state.get(state_key, 0), pages - 1)
+    for item in feeds.page_of(items, sort_key, reverse, page, FEED_PAGE_SIZE):
+        render_item(item)
+    render_pager(state_key, page, pages, f"{len(items)} total")
+
+# --- DISCUSSIONS ---
+@st.fragment(run_every=LIVE_POLL_SECONDS or None)
+def show_thread(collection, ticket_id):
+    """
+    The newest messages of a thread and "Load older", re-run every LIVE_POLL_SECONDS on its own.
+    The messages shown are kept in the session, so a poll costs one stat() plus reading what was appended.
+    """
+    threads = get_discussions()
+    shown_key = f"thread_{collection}_{ticket_id}"
+    limit = st.session_state.get(shown_key, DISCUSSION_PAGE_SIZE)
+    view = st.session_state.get(f"{shown_key}_view")
+    size = threads.size(collection, ticket_id)
+    if view is None or view["limit"] != limit or size < view["end"]:  # smaller: the thread was re-created
+        messages, start = threads.tail(collection, ticket_id, limit, before=size)
+        view = {"limit": limit, "messages": messages, "start": start, "end": size}
+        st.session_state[f"{shown_key}_view"] = view
+    elif size != view["end"]:
+        new, view["end"] = threads.since(collection, ticket_id, view["end"])
+        view["messages"] = view["messages"] + new
+    chat = st.container(height=400, border=True)
+    if view["start"] > 0:
+        chat.button("⬆️ Load older", key=f"{shown_key}_older", on_click=st.session_state.__setitem__,
+                    args=(shown_key, len(view["messages"]) + DISCUSSION_PAGE_SIZE))
+    for msg in view["messages"]: chat.markdown(f"**{msg['user']}**: {msg['text']}")
+
+def render_discussion(collection, ticket, form_key, read_only=False):
+    """A ticket's thread (kept current while open), "Load older" for more, and the reply form."""
+    st.subheader("Discussion")
+    threads = get_discussions()
+    show_thread(collection, ticket['id'])
+    if read_only:
+        st.caption("Archived tickets are read-only; re-open it to reply.")
+        return
+    with st.form(form_key):
+        txt = st.text_input("Message")
+        if st.form_submit_button("Send") and txt:
+            # One appended line; the main database is not touched.
+            threads.post(collection, ticket['id'], {"user": USER_NAME, "text": txt, "time": str(datetime.now())})
+            st.rerun()
+
+TICKET_SORTS = {
+    "Severity": (lambda t: t.get('severity', 1), True),
+    "Newest first": (None, True),
+    "Oldest first": (None, False),
+}
 
 # --- SIDEBAR ---
 st.sidebar.title("🛠 Staff Portal")
 st.sidebar.write(f"User: **{USER_NAME}**")
+st.sidebar.text_input("🔎 Search", key="search_query", placeholder="Tickets, discussions, posts...",
+                      on_change=navigate_to, args=("search",))
 
-unread_mods = len([m for m in DB['mods'] if not m.get('read', True)])
-unread_projs = len([p for p in DB['projects'] if not p.get('read', True)])
+unread_mods = TICKETS.stats['mods'].unread
+unread_projs = TICKETS.stats['projects'].unread
 total_unread = unread_mods + unread_projs
 
 if total_unread > 0 and user_role in ["admin", "SUPER_ADMIN"]:
@@ -272,6 +490,7 @@ if total_unread > 0 and user_role in ["admin", "SUPER_ADMIN"]:
     """, unsafe_allow_html=True)
 
 if st.sidebar.button("🚪 Logout"):
+    get_presence().leave(USER_EMAIL)
     st.session_state.logged_in = False
     st.rerun()
 st.sidebar.divider()
@@ -283,7 +502,9 @@ if user_role == "SUPER_ADMIN":
 
 if user_role in ["admin", "SUPER_ADMIN"]:
     st.sidebar.subheader("Server Admin")
-    st.sidebar.button(f"{get_mod_status()} Report Broken Mod", on_click=navigate_to, args=("report_broken_mod", None))
+    mod_stats = TICKETS.stats['mods']
+    st.sidebar.button(f"{get_mod_status()} Report Broken Mod", on_click=navigate_to, args=("report_broken_mod", None),
+                      help=f"{mod_stats.active} open, highest severity {mod_stats.max_open_severity}" if mod_stats.active else "No open issues")
     st.sidebar.button("🚀 Submit New Job", on_click=navigate_to, args=("create_project",))
 
 if user_role in ["CLPLEAD", "SUPER_ADMIN", "CLP"]:
@@ -295,6 +516,7 @@ if user_role in ["CLPLEAD", "SUPER_ADMIN", "CLP"]:
 if user_role == "SUPER_ADMIN":
     st.sidebar.divider()
     st.sidebar.button("🔑 Assign Roles", on_click=navigate_to, args=("roles",))
+    st.sidebar.button("📈 Performance", on_click=navigate_to, args=("metrics",))
 
 # --- TOP NAV ---
 if user_role != "staff":
@@ -309,405 +531,40 @@ if user_role != "staff":
     st.markdown("---")
 
 # --- PAGES ---
-
-if st.session_state.page == "view_announcements":
-    st.title("📢 Announcements")
-    if user_role == "SUPER_ADMIN":
-        with st.expander("Post New Announcement"):
-            title = st.text_input("Title")
-            content = st_quill(key="ann_quill")
-            if st.button("Post"):
-                DB['announcements'].insert(0, {"date": datetime.now().strftime("%Y-%m-%d"), "title": title, "content": content, "author": USER_NAME})
-                save_db(DB)
-                st.success("Posted!")
-                st.rerun()
-    if not DB['announcements']: st.info("No announcements.")
-    for a in DB['announcements']:
-        with st.container(border=True):
-            st.subheader(a['title'])
-            st.caption(f"{a['date']} by {a['author']}")
-            st.markdown(a['content'], unsafe_allow_html=True)
-
-elif st.session_state.page == "create_project":
-    st.title("🚀 Submit New Job / Project")
-    st.caption("This will create a task in the 'New Work' tab.")
-    with st.container(border=True):
-        p_name = st.text_input("Project Title")
-        p_assign = st.text_input("Lead Developer/Assignee")
-        p_sev = st.slider("Severity / Priority", 1, 10, 5)
-        st.write("Project Brief:")
-        p_desc = st_quill(key="proj_desc_page", html=True)
-        if st.button("Create Project", type="primary"):
-            DB['projects'].append({
-                "id": len(DB['projects']), "name": p_name, "assigned": p_assign, "severity": p_sev,
-                "description": p_desc, "complete": False, "discussion": [], "read": False
-            })
-            save_db(DB)
-            st.success("Project Created! Saved to New Work.")
-            st.session_state.page = "view_projects"
-            st.rerun()
-
-elif st.session_state.page == "report_broken_mod":
-    st.title("Report Broken Mod")
-    st.caption("This will create a ticket in the 'Broken Mods' tab.")
-    name = st.text_input("Mod Name")
-    json_code = st.text_area("JSON Code", height=100)
-    sev = st.slider("Severity", 1, 10)
-    assign = st.text_input("Assign To")
-    st.write("Description:")
-    desc = st_quill(key="mod_desc", html=True)
-    if st.button("Submit Report"):
-        DB['mods'].append({
-            "id": len(DB['mods']), "name": name, "json_data": json_code, "severity": sev,
-            "assignment": assign, "description": desc, "complete": False, "discussion": [], "read": False
-        })
-        save_db(DB)
-        st.success("Submitted! Saved to Broken Mods.")
-        st.session_state.page = "view_broken_mods"
-        st.rerun()
-
-elif st.session_state.page == "view_broken_mods":
-    if user_role not in ["admin", "SUPER_ADMIN"]: st.error("Access Denied.")
-    else:
-        st.title("Active Broken Mods")
-        active = [m for m in DB['mods'] if not m['complete']]
-        if not active: st.success("No active issues.")
-        for m in active:
-            with st.container(border=True):
-                c1, c2 = st.columns([5,1])
-                with c1: 
-                    prefix = "🆕 " if not m.get('read', True) else "⚠️ "
-                    st.subheader(f"{prefix}{m['name']}")
-                    st.caption(f"Severity: {m['severity']} | Assigned: {m['assignment']}")
-                with c2: 
-                    if st.button("Details", key=f"d_{m['id']}", on_click=navigate_to, args=("mod_detail", m['id'], None)): pass
-
-elif st.session_state.page == "view_projects":
-    st.title("New Work / Active Projects")
-    active_projs = [p for p in DB['projects'] if not p['complete']]
-    if not active_projs: st.info("No active projects.")
-    else:
-        for p in active_projs:
-            with st.container(border=True):
-                c1, c2 = st.columns([5,1])
-                with c1:
-                    prefix = "🆕 " if not p.get('read', True) else "📁 "
-                    st.subheader(f"{prefix}{p['name']}")
-                    sev = p.get('severity', 1)
-                    st.caption(f"Lead: {p['assigned']} | Severity: {sev}/10")
-                with c2:
-                    if st.button("Open", key=f"p_{p['id']}", on_click=navigate_to, args=("project_detail", None, p['id'])): pass
-
-elif st.session_state.page == "view_fixed_mods":
-    if user_role not in ["admin", "SUPER_ADMIN"]: st.error("Access Denied.")
-    else:
-        st.title("Fixed Mods Archive")
-        fixed = [m for m in DB['mods'] if m['complete']]
-        if not fixed: st.info("Empty archive.")
-        for m in fixed:
-            with st.container(border=True):
-                c1, c2 = st.columns([5,1])
-                with c1: st.subheader(f"✅ {m['name']}")
-                with c2: st.button("Archive View", key=f"a_{m['id']}", on_click=navigate_to, args=("mod_detail", m['id'], None))
-
-elif st.session_state.page == "mod_detail":
-    m = next((x for x in DB['mods'] if x['id'] == st.session_state.selected_mod_id), None)
-    if m and not m.get('read', True) and user_role in ["admin", "SUPER_ADMIN"]:
-        m['read'] = True
-        save_db(DB)
-        st.rerun()
-    if m:
-        st.title(f"Issue: {m['name']}")
-        c1, c2 = st.columns([2,1])
-        with c1:
-            st.caption(f"Severity: {m['severity']} | Assigned: {m['assignment']}")
-            if m.get('json_data'): st.code(m['json_data'], language='json')
-            st.markdown(m['description'], unsafe_allow_html=True)
-            st.divider()
-            if user_role in ["admin", "SUPER_ADMIN"]:
-                if not m['complete']:
-                    if st.button("✅ Mark Resolved", type="primary"):
-                        m['complete'] = True
-                        save_db(DB)
-                        st.success("Resolved!")
-                        st.session_state.page = "view_fixed_mods"
-                        st.rerun()
-                else:
-                    st.success("Resolved.")
-                    if st.button("Re-open"):
-                        m['complete'] = False
-                        save_db(DB)
-                        st.rerun()
-        with c2:
-            st.subheader("Discussion")
-            chat = st.container(height=400, border=True)
-            for msg in m.get('discussion', []): chat.markdown(f"**{msg['user']}**: {msg['text']}")
-            with st.form("chat"):
-                txt = st.text_input("Message")
-                if st.form_submit_button("Send") and txt:
-                    m.setdefault('discussion', []).append({"user": USER_NAME, "text": txt, "time": str(datetime.now())})
-                    save_db(DB)
-                    st.rerun()
-
-elif st.session_state.page == "project_detail":
-    p = next((x for x in DB['projects'] if x['id'] == st.session_state.selected_project_id), None)
-    if p and not p.get('read', True) and user_role in ["admin", "SUPER_ADMIN"]:
-        p['read'] = True
-        save_db(DB)
-        st.rerun()
-    if p:
-        st.title(f"Project: {p['name']}")
-        c1, c2 = st.columns([2,1])
-        with c1:
-            sev = p.get('severity', 1)
-            st.caption(f"Lead: {p['assigned']} | Severity: {sev}/10")
-            st.markdown(p['description'], unsafe_allow_html=True)
-            st.divider()
-            if not p['complete']:
-                if st.button("✅ Mark Complete", type="primary"):
-                    p['complete'] = True
-                    save_db(DB)
-                    st.success("Completed!")
-                    st.session_state.page = "view_projects"
-                    st.rerun()
-            else: st.success("Project Completed.")
-        with c2:
-            st.subheader("Discussion")
-            chat = st.container(height=400, border=True)
-            for msg in p.get('discussion', []): chat.markdown(f"**{msg['user']}**: {msg['text']}")
-            with st.form("p_chat"):
-                txt = st.text_input("Message")
-                if st.form_submit_button("Send") and txt:
-                    p.setdefault('discussion', []).append({"user": USER_NAME, "text": txt, "time": str(datetime.now())})
-                    save_db(DB)
-                    st.rerun()
-
-elif st.session_state.page == "create_event":
-    st.title("Create Event")
-    name = st.text_input("Name")
-    date = st.date_input("Date")
-    time = st.time_input("Time")
-    tz = st.selectbox("Timezone", ["EST", "UTC", "PST"])
-    loc = st.text_input("Location")
-    desc = st_quill(key="ev_desc")
-    if st.button("Publish"):
-        DB['events'].append({"name": name, "date": str(date), "time": str(time), "tz": tz, "loc": loc, "desc": desc})
-        save_db(DB)
-        st.success("Published!")
-        st.session_state.page = "view_events"
-        st.rerun()
-
-elif st.session_state.page == "view_events":
-    st.title("Events")
-    if not DB['events']: st.info("No events.")
-    for e in DB['events']:
-        with st.chat_message("event"):
-            st.write(f"### {e['name']}")
-            st.write(f"🕒 {e['date']} {e['time']} ({e['tz']}) | 📍 {e['loc']}")
-            st.markdown(e['desc'], unsafe_allow_html=True)
-
-elif st.session_state.page == "create_tutorial":
-    st.title("Create Tutorial")
-    title = st.text_input("Title")
-    content = st_quill(key="tut_desc")
-    if st.button("Save"):
-        DB['tutorials'].append({"title": title, "content": content})
-        save_db(DB)
-        st.success("Saved!")
-        st.session_state.page = "view_tutorials"
-        st.rerun()
-
-elif st.session_state.page == "view_tutorials":
-    st.title("Tutorials")
-    if not DB['tutorials']: st.info("No tutorials.")
-    for t in DB['tutorials']:
-        with st.container(border=True):
-            st.subheader(t['title'])
-            st.markdown(t['content'], unsafe_allow_html=True)
-
-elif st.session_state.page == "view_users":
-    st.title("Staff Roster")
-    for email, role in DB['role_db'].items():
-        with st.container(border=True):
-            c1, c2, c3 = st.columns([1,4,2])
-            u_name = DB.get('usernames', {}).get(email, "Unknown User")
-            with c1: st.write("👤")
-            with c2: 
-                st.subheader(u_name)
-                if user_role == "SUPER_ADMIN": st.caption(f"Email: {email}")
-                st.caption(f"Role: {role}")
-            with c3: st.write("🟢 Online" if email == USER_EMAIL else "⚪ Offline")
-
-elif st.session_state.page == "roles":
-    st.title("Role Management")
-    with st.container(border=True):
-        st.subheader("Update User Role")
-        u_email = st.text_input("User Email to Update")
-        u_role = st.selectbox("New Role", ["admin", "CLPLEAD", "CLP", "staff"])
-        if st.button("Update Role"):
-            if u_email in DB['role_db']:
-                DB['role_db'][u_email] = u_role
-                save_db(DB)
-                st.success("Updated!")
-            else: st.error("User not found.")
-    with st.expander("❌ Delete User (Danger Zone)"):
-        st.warning("Cannot be undone.")
-        del_email = st.text_input("Enter Email to Delete")
-        if st.button("Permanently Delete User", type="primary"):
-            if del_email in DB['role_db']:
-                del DB['role_db'][del_email]
-                if del_email in DB['passwords']: del DB['passwords'][del_email]
-                if del_email in DB['usernames']: del DB['usernames'][del_email]
-                save_db(DB)
-                st.success(f"User {del_email} deleted.")
-            else: st.error("User not found.")
-    st.table(pd.DataFrame(DB['role_db'].items(), columns=["Email", "Role"]))
-
-# --- MOD STUDIO ---
-elif st.session_state.page == "json_editor":
-    st.title("📝 Mod Configuration Studio")
-    if user_role != "SUPER_ADMIN":
-        st.error("Access Denied.")
-    else:
-        col_editor, col_tools = st.columns([2, 1])
-        
-        with col_editor:
-            with st.container(border=True):
-                st.subheader("📁 Configuration File Manager")
-                c_load, c_save = st.columns(2)
-                with c_load:
-                    config_names = [c['name'] for c in DB.get('server_configs', [])]
-                    selected_conf = st.selectbox("Load Saved Config", ["Select..."] + config_names)
-                    if st.button("📂 Load Preset") and selected_conf != "Select...":
-                        found = next((c for c in DB['server_configs'] if c['name'] == selected_conf), None)
-                        if found:
-                            st.session_state.editor_content = found['content']
-                            st.session_state.editor_key += 1
-                            st.success(f"Loaded '{selected_conf}'!")
-                            st.rerun()
-                with c_save:
-                    new_conf_name = st.text_input("Save Current as...")
-                    if st.button("💾 Save as Preset") and new_conf_name:
-                        DB['server_configs'] = [c for c in DB['server_configs'] if c['name'] != new_conf_name]
-                        DB['server_configs'].append({"name": new_conf_name, "content": st.session_state.editor_content})
-                        save_db(DB)
-                        st.success(f"Saved '{new_conf_name}'!")
-                        st.rerun()
-                if selected_conf != "Select...":
-                    if st.button("🗑️ Delete Selected Preset"):
-                        DB['server_configs'] = [c for c in DB['server_configs'] if c['name'] != selected_conf]
-                        save_db(DB)
-                        st.success("Deleted.")
-                        st.rerun()
-
-            st.divider()
-            st.subheader("Active JSON Editor")
-            st.caption("Press 'Ctrl+A' then 'Ctrl+C' inside the box to copy everything.")
-            
-            json_text = st.text_area(
-                "JSON Output", 
-                value=st.session_state.editor_content, 
-                height=600, 
-                key=f"json_area_{st.session_state.editor_key}", 
-                on_change=sync_editor
-            )
-
-        with col_tools:
-            # FIX: Place Tabs OUTSIDE the scrollable container
-            tab_search, tab_saved, tab_import = st.tabs(["🌐 Search", "💾 Library", "📥 Import"])
-            
-            with tab_search:
-                st.info("💡 **Tip:** Type a name to find the link, then Paste the URL to fetch data.")
-                search_term = st.text_input("1. Search Term", placeholder="e.g. RHS Status Quo")
-                if search_term:
-                    st.link_button(f"🌐 Open Search: '{search_term}'", f"https://reforger.armaplatform.com/workshop?search={search_term}")
-                st.divider()
-                st.write("**2. Paste Workshop URL**")
-                fetch_url = st.text_input("Paste URL here to auto-fetch", placeholder="https://reforger.armaplatform.com/workshop/...")
-                if st.button("🚀 Fetch Details"):
-                    if fetch_url:
-                        mid, mname, mimg, mver = fetch_mod_details(fetch_url)
-                        if mname:
-                            st.session_state.fetched_mod = {"modId": mid, "name": mname, "version": mver, "image_url": mimg}
-                            st.success("Found!")
-                        else: st.error("Could not find mod. Check URL.")
-                
-                with st.container(height=500, border=True):
-                    if st.session_state.fetched_mod:
-                        mod = st.session_state.fetched_mod
-                        if mod['image_url']: st.image(mod['image_url'])
-                        st.subheader(mod['name'])
-                        clean_mod = {"modId": mod['modId'], "name": mod['name'], "version": ""}
-                        st.code(json.dumps(clean_mod, indent=4), language='json')
-                        c1, c2 = st.columns(2)
-                        with c1:
-                            if st.button("💾 Save to Library"):
-                                DB['mod_library'].append(mod)
-                                save_db(DB)
-                                st.success("Saved!")
-                        with c2:
-                            if st.button("➕ Add to Editor"):
-                                new_text = inject_mod(st.session_state.editor_content, clean_mod)
-                                st.session_state.editor_content = new_text
-                                st.session_state.editor_key += 1
-                                st.rerun()
-
-            with tab_saved:
-                lib_search = st.text_input("Filter Library", placeholder="Filter by name...")
-                filtered = sorted(
-                    [m for m in DB['mod_library'] if lib_search.lower() in m.get('name','').lower()],
-                    key=lambda x: x.get('name', '').lower()
-                )
-                with st.container(height=600, border=True):
-                    if not filtered: st.info("No saved mods.")
-                    for mod in filtered:
-                        with st.container(border=True):
-                            c_info, c_add, c_copy, c_del = st.columns([3, 1, 1, 1], vertical_alignment="center")
-                            with c_info:
-                                st.write(f"**{mod['name']}**")
-                                mini_json = {"modId": mod['modId'], "name": mod['name'], "version": ""}
-                                json_str = json.dumps(mini_json, indent=4)
-                            with c_add:
-                                if st.button("➕", key=f"ins_{mod['modId']}", help="Insert into Editor", use_container_width=True):
-                                    new_text = inject_mod(st.session_state.editor_content, mini_json)
-                                    st.session_state.editor_content = new_text
-                                    st.session_state.editor_key += 1
-                                    st.rerun()
-                            with c_copy:
-                                with st.popover("📋", use_container_width=True):
-                                    st.code(json_str, language='json')
-                                    st.caption("Click the icon in the corner to copy.")
-                            with c_del:
-                                if st.button("🗑️", key=f"rm_{mod['modId']}", help="Delete from Library", use_container_width=True):
-                                    idx = DB['mod_library'].index(mod)
-                                    DB['mod_library'].pop(idx)
-                                    save_db(DB)
-                                    st.rerun()
-            
-            with tab_import:
-                st.subheader("Batch Importer")
-                st.caption("Paste a full JSON file or a list of mods. We will extract every mod block and save it to your library.")
-                import_text = st.text_area("Paste JSON Here", height=300)
-                if st.button("Process & Import Mods", type="primary"):
-                    try:
-                        pattern = r'\{[^{}]*"modId"[^{}]*\}'
-                        matches = re.findall(pattern, import_text, re.DOTALL)
-                        count_added = 0
-                        existing_ids = [m['modId'] for m in DB['mod_library']]
-                        for match in matches:
-                            try:
-                                mod_obj = json.loads(match)
-                                mid = mod_obj.get("modId")
-                                mname = mod_obj.get("name", "Unknown Imported Mod")
-                                mver = mod_obj.get("version", "")
-                                if mid and mid not in existing_ids:
-                                    DB['mod_library'].append({"modId": mid, "name": mname, "version": mver})
-                                    existing_ids.append(mid)
-                                    count_added += 1
-                            except: pass
-                        if count_added > 0:
-                            save_db(DB)
-                            st.success(f"Successfully imported {count_added} new mods to Library!")
-                            st.rerun()
-                        else: st.warning("No new mods found (or all were duplicates).")
-                    except Exception as e: st.error(f"Error processing text: {e}")
+# Each page lives in views/ and is imported the first time somebody opens it.
+app = SimpleNamespace(
+    DB=DB, DB_LOCK=DB_LOCK, STORE=STORE, TICKETS=TICKETS, USER_EMAIL=USER_EMAIL, USER_NAME=USER_NAME, user_role=user_role,
+    save_db=save_db, navigate_to=navigate_to, show_html=show_html, render_feed=render_feed, render_pager=render_pager,
+    render_discussion=render_discussion, TICKET_SORTS=TICKET_SORTS, get_archive=get_archive, get_discussions=get_discussions,
+    get_render_cache=get_render_cache, get_library_index=get_library_index, LIBRARY_PAGE_SIZE=LIBRARY_PAGE_SIZE,
+    get_workshop_cache=get_workshop_cache, fetch_mod_details=fetch_mod_details, WORKSHOP_MAX_CONNECTIONS=WORKSHOP_MAX_CONNECTIONS,
+    resolve_dependencies=resolve_dependencies, get_search_index=get_search_index, SEARCH_RESULTS=SEARCH_RESULTS,
+    DISCUSSIONS_DIR=DISCUSSIONS_DIR, get_presence=get_presence, LIVE_POLL_SECONDS=LIVE_POLL_SECONDS,
+    METRICS=METRICS, METRICS_ENABLED=METRICS_ENABLED, METRICS_FILE=METRICS_FILE, METRICS_WRITE_INTERVAL=METRICS_WRITE_INTERVAL,
+)
+
+st.session_state.feed_seen = FEED_SEEN
+with METRICS.time("page_render", page=st.session_state.page):
+    views.render(st.session_state.page, app)
+
+# --- LIVE UPDATES ---
+@st.fragment(run_every=LIVE_POLL_SECONDS or None)
+def live_updates(page, role):
+    """
+    Runs on its own every LIVE_POLL_SECONDS: a presence heartbeat, then a
+    full rerun if data this page shows changed since the session drew it.
+    Pages that are not in views.LIVE_KEYS (the forms) are never rerun.
+    """
+    get_presence().beat(USER_EMAIL)
+    data = get_shared_db().get()  # one stat(); a write by another process is loaded and published here
+    changed, st.session_state.feed_seen = get_change_feed().since(st.session_state.feed_seen)
+    keys = views.LIVE_KEYS.get(page)
+    if data['role_db'].get(USER_EMAIL, "staff") != role:
+        st.rerun(scope="app")
+    if keys is None or changed == set(): return
+    if role in ["admin", "SUPER_ADMIN"]: keys = keys | {"mods", "projects"}  # the sidebar's ticket counters
+    if changed is None or changed & keys:
+        METRICS.inc("live_reruns", page=page)
+        st.rerun(scope="app")
+
+live_updates(st.session_state.page, user_role)
@@ -0,0 +1,183 @@
+"""
+Cold storage for completed tickets.
+
+Tickets that have been complete for longer than ARCHIVE_AFTER_DAYS leave the
+main database and are appended to compressed segment files, so the document
+that is loaded and saved all day only holds current work.
+
+Layout of the archive directory:
+    index.jsonl           one summary line per archived (or restored) ticket
+    mods-0001.jsonl.gz    full tickets; every append is a separate gzip member
+    projects-0001.jsonl.gz
+
+Only index.jsonl is read up front (tail only, after the first time); a
+segment is opened when somebody views an archived ticket, and then only the
+gzip member holding it is decompressed.
+"""
+import gzip
+import json
+import os
+import threading
+import zlib
+from datetime import datetime, timedelta
+
+import storage
+from tickets import COLLECTIONS
+
+SUMMARY_FIELDS = ("id", "name", "severity", "created_at", "completed_at")
+SEGMENT_BYTES = 4 << 20
+
+
+def _read_member(path, offset):
+    """Decompresses the single gzip member starting at `offset`."""
+    d = zlib.decompressobj(wbits=31)
+    out = []
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        while not d.eof:
+            chunk = f.read(65536)
+            if not chunk: break
+            out.append(d.decompress(chunk))
+    return [json.loads(line) for line in b"".join(out).splitlines() if line]
+
+
+def _append(path, payload):
+    with open(path, 'ab') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class Archive:
+    def __init__(self, path, segment_bytes=SEGMENT_BYTES):
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self._index_path = os.path.join(path, "index.jsonl")
+        self._lock_path = os.path.join(path, "lock")
+        self._offset = 0
+        self._summaries = {name: {} for name in COLLECTIONS}
+        self._lock = threading.RLock()
+        self.refresh()
+
+    def refresh(self):
+        """Applies index lines appended (by any process) since the last call."""
+        with self._lock:
+            try:
+                if os.path.getsize(self._index_path) == self._offset: return
+            except FileNotFoundError:
+                return
+            with open(self._index_path, 'rb') as f:
+                f.seek(self._offset)
+                for raw in f:
+                    if not raw.endswith(b"\n"): break  # a writer is mid-line
+                    self._offset += len(raw)
+                    rec = json.loads(raw)
+                    entries = self._summaries.setdefault(rec["c"], {})
+                    if rec.get("restored"):
+                        entries.pop(rec["id"], None)
+                    else:
+                        entries[rec["id"]] = rec
+
+    def summaries(self, collection):
+        """[{"id", "name", "severity", "created_at", "completed_at", ...}] in archive order."""
+        self.refresh()
+        return list(self._summaries.get(collection, {}).values())
+
+    def __len__(self):
+        return sum(len(v) for v in self._summaries.values())
+
+    def get(self, collection, ticket_id):
+        """The full archived ticket, or None if it is not in the archive."""
+        self.refresh()
+        rec = self._summaries.get(collection, {}).get(ticket_id)
+        if rec is None: return None
+        for item in _read_member(os.path.join(self.path, rec["seg"]), rec["off"]):
+            if item.get('id') == ticket_id:
+                return item
+        return None
+
+    def tickets(self, collection):
+        """
+        Every full ticket archived for `collection`, decompressing each gzip
+        member once (get() would decompress one per ticket).
+        """
+        self.refresh()
+        members = {}
+        for rec in self._summaries.get(collection, {}).values():
+            members.setdefault((rec["seg"], rec["off"]), set()).add(rec["id"])
+        for (seg, off), ids in members.items():
+            for item in _read_member(os.path.join(self.path, seg), off):
+                if item.get('id') in ids: yield item
+
+    def put(self, collection, items):
+        """
+        Appends tickets as one gzip member plus their index lines. Tickets the
+        archive already holds (same id and completed_at, e.g. another replica
+        swept them first) are skipped. Returns the number written.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock, storage.file_lock(self._lock_path):
+            self.refresh()
+            held = self._summaries.get(collection, {})
+            new = [x for x in items
+                   if x.get('id') not in held or held[x['id']].get('completed_at') != x.get('completed_at')]
+            if not new: return 0
+            seg = self._segment(collection)
+            seg_path = os.path.join(self.path, seg)
+            off = os.path.getsize(seg_path) if os.path.exists(seg_path) else 0
+            _append(seg_path, gzip.compress("".join(json.dumps(x) + "\n" for x in new).encode()))
+            lines = []
+            for x in new:
+                rec = {"c": collection, **{k: x.get(k) for k in SUMMARY_FIELDS}, "seg": seg, "off": off}
+                lines.append(json.dumps(rec) + "\n")
+            _append(self._index_path, "".join(lines).encode())
+            self.refresh()
+            return len(new)
+
+    def restore(self, collection, ticket_id):
+        """Takes a ticket out of the archive (index tombstone) and returns it; None if it is not there."""
+        with self._lock, storage.file_lock(self._lock_path):
+            item = self.get(collection, ticket_id)
+            if item is not None:
+                _append(self._index_path, (json.dumps({"c": collection, "id": ticket_id, "restored": True}) + "\n").encode())
+                self.refresh()
+            return item
+
+    def _segment(self, collection):
+        """Newest segment file for `collection`, or a fresh one once it passes segment_bytes."""
+        prefix = f"{collection}-"
+        numbers = [int(n[len(prefix):-len(".jsonl.gz")]) for n in os.listdir(self.path)
+                   if n.startswith(prefix) and n.endswith(".jsonl.gz")]
+        last = max(numbers, default=1)
+        name = f"{collection}-{last:04d}.jsonl.gz"
+        path = os.path.join(self.path, name)
+        if os.path.exists(path) and os.path.getsize(path) >= self.segment_bytes:
+            name = f"{collection}-{last + 1:04d}.jsonl.gz"
+        return name
+
+
+def _expired(data, max_age_days, now):
+    cutoff = ((now or datetime.now()) - timedelta(days=max_age_days)).isoformat(timespec="seconds")
+    for name in COLLECTIONS:
+        old = [x for x in data.get(name, []) if x.get('complete') and (x.get('completed_at') or "9") <= cutoff]
+        if old: yield name, old
+
+
+def due(data, max_age_days, now=None):
+    """How many tickets sweep() would move right now."""
+    return sum(len(old) for _, old in _expired(data, max_age_days, now))
+
+
+def sweep(data, archive, max_age_days, now=None):
+    """
+    Moves tickets completed more than `max_age_days` ago from `data` into
+    `archive`. Returns how many. The app runs it in every save's prepare hook,
+    so a process that stays up for weeks keeps archiving, not just at startup.
+    """
+    moved = 0
+    for name, old in list(_expired(data, max_age_days, now)):
+        archive.put(name, old)
+        gone = {id(x) for x in old}
+        data[name] = [x for x in data[name] if id(x) not in gone]
+        moved += len(old)
+    return moved
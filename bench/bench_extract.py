@@ -0,0 +1,82 @@
+"""
+Micro-benchmark: full BeautifulSoup parse vs. the streaming head-only extractor.
+
+    python bench/bench_extract.py                # synthetic workshop-like page
+    python bench/bench_extract.py saved_pages/   # every *.html in a folder
+
+Pages are fed to the extractor in 8 KB chunks, the way requests streams them.
+"""
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import workshop  # noqa: E402
+
+
+def synthetic_page():
+    head = (
+        '<!DOCTYPE html><html><head><meta charset="utf-8">'
+        '<meta property="og:title" content="RHS - Status Quo">'
+        '<meta property="og:image" content="https://example.com/preview.jpg">'
+        + "<style>" + ".c{color:red}" * 3000 + "</style>"
+        + '<script>window.__CONFIG__=' + '{"k":"v"},' * 2000 + '{}</script></head>'
+    )
+    card = '<div class="card"><a href="/workshop/59{0:014X}-Mod">Mod {0}</a><p>' + "lorem ipsum " * 40 + "</p></div>"
+    body = "<body>" + "".join(card.format(i) for i in range(2000)) + "</body></html>"
+    return head + body
+
+
+def chunked(data, size=8192):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+class Counting:
+    """Wraps a chunk iterator to count how many bytes the extractor pulled."""
+
+    def __init__(self, data):
+        self.read = 0
+        self._it = chunked(data)
+
+    def __iter__(self):
+        for chunk in self._it:
+            self.read += len(chunk)
+            yield chunk
+
+    def close(self):
+        pass
+
+
+def measure(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    if len(sys.argv) > 1:
+        pages = {os.path.basename(p): open(p, "rb").read() for p in sorted(glob.glob(os.path.join(sys.argv[1], "*.html")))}
+    else:
+        pages = {"synthetic": synthetic_page().encode()}
+    print(f"{'page':<24}{'size':>10}{'soup ms':>10}{'soup KiB':>10}{'stream ms':>11}{'stream KiB':>12}{'read':>10}")
+    for name, data in pages.items():
+        soup_t, soup_mem = measure(lambda: workshop._soup_meta(data.decode("utf-8", "replace")))
+        counter = Counting(data)
+        assert workshop.extract_head_meta(counter).get("og:title"), f"{name}: no og:title found"
+        stream_t, stream_mem = measure(lambda: workshop.extract_head_meta(chunked(data)))
+        print(f"{name[:23]:<24}{len(data):>10}{soup_t * 1000:>10.1f}{soup_mem / 1024:>10.0f}"
+              f"{stream_t * 1000:>11.2f}{stream_mem / 1024:>12.0f}{counter.read:>10}")
+
+
+if __name__ == "__main__":
+    main()
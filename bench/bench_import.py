@@ -0,0 +1,77 @@
+"""
+Benchmark: Import-tab regex path (as shipped originally) vs. mod_import.
+
+    python bench/bench_import.py [n_mods ...]      # default: 1000 10000 50000
+
+Each run imports a generated server config (every 10th mod carries a nested
+"dependencies" list) into a library that already holds 10% of those mods. The regex
+misses every mod that has nested fields, so its "added" count is lower.
+The regex path is only timed up to 10k mods; it is quadratic beyond that.
+"""
+import io
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import mod_import  # noqa: E402
+
+
+def make_config(n):
+    mods = []
+    for i in range(n):
+        mod = {"modId": f"{i:016X}", "name": f"Mod {i}", "version": "1.0.0"}
+        if i % 10 == 0:
+            mod["dependencies"] = [{"modId": f"{(i + 1) % n:016X}", "name": f"Mod {(i + 1) % n}"}]
+        mods.append(mod)
+    return json.dumps({"bindAddress": "", "game": {"name": "Server", "mods": mods}}, indent=4)
+
+
+def legacy_import(library, import_text):
+    pattern = r'\{[^{}]*"modId"[^{}]*\}'
+    matches = re.findall(pattern, import_text, re.DOTALL)
+    count_added = 0
+    existing_ids = [m['modId'] for m in library]
+    for match in matches:
+        try:
+            mod_obj = json.loads(match)
+            mid = mod_obj.get("modId")
+            if mid and mid not in existing_ids:
+                library.append({"modId": mid, "name": mod_obj.get("name", "Unknown Imported Mod"), "version": mod_obj.get("version", "")})
+                existing_ids.append(mid)
+                count_added += 1
+        except Exception:
+            pass
+    return count_added
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [1000, 10000, 50000]
+    results = []
+    for n in sizes:
+        text = make_config(n)
+        seed = [{"modId": f"{i:016X}", "name": f"Mod {i}", "version": "1.0.0"} for i in range(5, n, 10)]
+
+        lib = list(seed)
+        t = time.perf_counter()
+        counts = mod_import.import_mods(lib, io.BytesIO(text.encode()))
+        new_t = time.perf_counter() - t
+
+        legacy_t = legacy_added = None
+        if n <= 10000:
+            lib = list(seed)
+            t = time.perf_counter()
+            legacy_added = legacy_import(lib, text)
+            legacy_t = time.perf_counter() - t
+
+        results.append({"mods": n, "bytes": len(text), "stream_s": round(new_t, 4), "stream_added": counts["added"],
+                        "regex_s": legacy_t and round(legacy_t, 4), "regex_added": legacy_added})
+        print(f"{n:>7} mods  {len(text) / 1e6:6.1f} MB  stream {new_t * 1000:8.1f} ms (added {counts['added']})  "
+              + (f"regex {legacy_t * 1000:8.1f} ms (added {legacy_added})" if legacy_t is not None else "regex skipped"))
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
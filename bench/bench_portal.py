@@ -0,0 +1,285 @@
+"""
+Benchmark: the portal's hot paths against synthetic databases.
+
+    python bench/bench_portal.py                                  # scales 1000 10000 100000
+    python bench/bench_portal.py --scales 1000 10000 --out new.json
+    python bench/bench_portal.py --compare old.json new.json      # ratios, slowest first
+
+Each operation is timed in isolation, without Streamlit. Where app.py used to
+inline a cheaper-looking expression (list scans, the editor's full re-dump,
+the Import regex), that original shape is timed as variant "legacy" next to
+the module the app calls now ("current"). Results are a JSON list of
+{"op", "variant", "scale", "median_s", "min_s", "runs", ...}; --out writes them
+with run metadata so two versions can be compared with --compare.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+import discussions  # noqa: E402
+import editor_model  # noqa: E402
+import feeds  # noqa: E402
+import library_search  # noqa: E402
+import mod_import  # noqa: E402
+import presets  # noqa: E402
+import rich_text  # noqa: E402
+import search_index  # noqa: E402
+import serializers  # noqa: E402
+import storage  # noqa: E402
+import synth  # noqa: E402
+import tickets  # noqa: E402
+from bench_import import legacy_import  # noqa: E402
+
+
+def timed(fn, repeat):
+    runs = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - t)
+    return {"median_s": round(statistics.median(runs), 9), "min_s": round(min(runs), 9), "runs": repeat}
+
+
+def legacy_inject(text, mod):
+    """Mod Studio's original inject_mod, strict-parse path."""
+    data = json.loads(text)
+    target = data["game"]["mods"] if isinstance(data, dict) else data
+    target.append(mod)
+    return json.dumps(data, indent=4)
+
+
+def bench_storage(data, n, backends, repeat, workdir):
+    results = []
+    for backend in backends:
+        store = storage.open_store(backend, os.path.join(workdir, f"{backend}-{n}.json"))
+        t = time.perf_counter()
+        store.reset(storage._clone(data))
+        results.append({"op": "reset", "variant": backend, "median_s": round(time.perf_counter() - t, 6), "runs": 1})
+        results.append({"op": "load", "variant": backend, **timed(store.load, repeat)})
+        doc = store.load()
+        rng = random.Random(n)
+
+        def edit_and_save():
+            m = rng.choice(doc["mods"])
+            m["read"] = not m.get("read", True)
+            store.save(doc)
+        results.append({"op": "save_one_edit", "variant": backend, **timed(edit_and_save, repeat)})
+        if hasattr(store, "close"): store.close()
+    return results
+
+
+def bench_formats(data, n, repeat, workdir):
+    """Snapshot save (encode + atomic write) and load (read + decode) per DB_FORMAT, with file size."""
+    results = []
+    path = os.path.join(workdir, f"snapshot-{n}")
+
+    def read():
+        with open(path, 'rb') as f:
+            return f.read()
+    codecs = {"legacy": (lambda d: json.dumps(d, indent=4), json.loads)}  # stdlib, indent=4: the old save_db
+    for fmt in serializers.FORMATS:
+        if fmt == "zstd" and serializers.zstandard is None: continue
+        codecs[fmt] = (lambda d, fmt=fmt: serializers.pack(d, fmt)[0], serializers.unpack)
+    for variant, (dump, parse) in codecs.items():
+        results.append({"op": "snapshot_save", "variant": variant, **timed(lambda: storage.atomic_write(path, dump(data)), repeat)})
+        results.append({"op": "snapshot_load", "variant": variant, "bytes": os.path.getsize(path),
+                        "engine": serializers.ENGINE, **timed(lambda: parse(read()), repeat)})
+    return results
+
+
+def bench_memory(data, n, repeat):
+    results = []
+    rng = random.Random(n)
+    mods, projects, library = data["mods"], data["projects"], data["mod_library"]
+
+    # Sidebar counters
+    legacy_unread = lambda: (len([m for m in mods if not m.get('read', True)]), len([p for p in projects if not p.get('read', True)]))
+    results.append({"op": "unread_count", "variant": "legacy", **timed(legacy_unread, repeat)})
+    index = None
+
+    def build_index():
+        nonlocal index
+        index = tickets.TicketIndex(data)
+    results.append({"op": "ticket_index_build", "variant": "current", **timed(build_index, repeat)})
+    results.append({"op": "unread_count", "variant": "current",
+                    **timed(lambda: (index.stats['mods'].unread, index.stats['projects'].unread), repeat)})
+    results.append({"op": "mod_status", "variant": "legacy", **timed(lambda: any(not m['complete'] for m in mods), repeat)})
+    results.append({"op": "mod_status", "variant": "current", **timed(lambda: index.stats['mods'].active > 0, repeat)})
+
+    # Ticket lookup: 100 random ids per run
+    ids = [rng.randrange(len(mods)) for _ in range(100)]
+    results.append({"op": "ticket_lookup_x100", "variant": "legacy",
+                    **timed(lambda: [next((x for x in mods if x['id'] == i), None) for i in ids], repeat)})
+    results.append({"op": "ticket_lookup_x100", "variant": "current", **timed(lambda: [index.get('mods', i) for i in ids], repeat)})
+
+    # Ticket feeds: materialize + sort everything vs one page
+    active = [m for m in mods if not m['complete']]
+    results.append({"op": "feed_first_page", "variant": "legacy",
+                    **timed(lambda: sorted(active, key=lambda t: t['severity'], reverse=True), repeat)})
+    results.append({"op": "feed_first_page", "variant": "current",
+                    **timed(lambda: feeds.page_of(active, lambda t: t['severity'], True, 0, 20), repeat)})
+
+    # Library filter + sort
+    query = library[len(library) // 2]["name"].split()[0].lower()
+    results.append({"op": "library_filter", "variant": "legacy", "query": query,
+                    **timed(lambda: sorted([m for m in library if query in m.get('name', '').lower()],
+                                           key=lambda x: x.get('name', '').lower()), repeat)})
+    lib_index = library_search.LibraryIndex()
+    results.append({"op": "library_index_build", "variant": "current", **timed(lambda: lib_index.sync(library), 1)})
+    results.append({"op": "library_filter", "variant": "current", "query": query,
+                    **timed(lambda: lib_index.search(query, 0, 25), repeat)})
+    results.append({"op": "library_filter_typo", "variant": "current",
+                    **timed(lambda: lib_index.search(query[:-1] + "x", 0, 25), repeat)})
+
+    # Mod Studio: add one mod to an editor holding n/10 mods
+    text = synth.editor_text(max(10, n // 10))
+    mod = {"modId": "FFFFFFFFFFFFFFFF", "name": "Bench", "version": ""}
+    results.append({"op": "inject_mod", "variant": "legacy", **timed(lambda: legacy_inject(text, mod), repeat)})
+    results.append({"op": "editor_parse", "variant": "current", **timed(lambda: editor_model.EditorModel.from_text(text), repeat)})
+    model = editor_model.EditorModel.from_text(text)
+
+    def add_and_render():
+        model.add(dict(mod, modId=f"{rng.getrandbits(64):016X}"))
+        return model.text
+    results.append({"op": "inject_mod", "variant": "current", **timed(add_and_render, repeat)})
+
+    # Presets: 20 near-identical server configs, stored as full text vs. pooled
+    base = json.loads(text)
+    legacy_doc = {"server_configs": []}
+    for i in range(20):
+        base["game"]["mods"][i % len(base["game"]["mods"])]["version"] = f"2.{i}"
+        legacy_doc["server_configs"].append({"name": f"preset {i}", "content": json.dumps(base, indent=4)})
+    pooled_doc = json.loads(json.dumps(legacy_doc))
+    presets.migrate(pooled_doc)
+    for variant, doc in (("legacy", legacy_doc), ("current", pooled_doc)):
+        raw = json.dumps(doc)
+        results.append({"op": "presets_parse_x20", "variant": variant, "bytes": len(raw), **timed(lambda: json.loads(raw), repeat)})
+    results.append({"op": "preset_expand", "variant": "current",
+                    **timed(lambda: presets.expand(pooled_doc, pooled_doc["server_configs"][-1]), repeat)})
+    cfgs = pooled_doc["server_configs"]
+    results.append({"op": "preset_diff", "variant": "current", **timed(lambda: presets.diff(pooled_doc, cfgs[0], cfgs[-1]), repeat)})
+
+    # Import tab
+    config = synth.editor_text(n, seed=1)
+    results.append({"op": "batch_import", "variant": "current",
+                    **timed(lambda: mod_import.import_mods(list(library), config), max(1, repeat // 3))})
+    if n <= 10000:  # quadratic beyond this
+        results.append({"op": "batch_import", "variant": "legacy",
+                        **timed(lambda: legacy_import(list(library), config), 1)})
+    return results
+
+
+def bench_files(data, n, repeat, workdir):
+    results = []
+    # Rich text: first render processes the HTML, later ones are cache hits
+    bodies = [a["content"] for a in data["announcements"][:100]]
+    cache = rich_text.RenderCache(os.path.join(workdir, "rich"), "app/static/rich/")
+    results.append({"op": "rich_text_x100", "variant": "cold", **timed(lambda: [cache.render(b) for b in bodies], 1)})
+    results.append({"op": "rich_text_x100", "variant": "warm", **timed(lambda: [cache.render(b) for b in bodies], repeat)})
+
+    # Discussion: open a 500-message thread (newest 30)
+    threads = discussions.Discussions(os.path.join(workdir, f"threads-{n}"))
+    messages = [{"user": "u", "text": f"message {i} " + "x" * 80, "time": ""} for i in range(500)]
+    for m in messages: threads.post("mods", 0, m)
+    results.append({"op": "thread_open_500", "variant": "legacy",
+                    **timed(lambda: json.loads(json.dumps(messages)), repeat)})
+    results.append({"op": "thread_open_500", "variant": "current", **timed(lambda: threads.tail("mods", 0, 30), repeat)})
+    # ...and one live poll of it with nothing new: re-read the newest 30 vs compare the size to what is shown
+    end = threads.size("mods", 0)
+    results.append({"op": "thread_poll", "variant": "legacy", **timed(lambda: threads.tail("mods", 0, 30), repeat)})
+    results.append({"op": "thread_poll", "variant": "current",
+                    **timed(lambda: threads.size("mods", 0) != end and threads.since("mods", 0, end), repeat)})
+
+    # Search: full build, re-sync after one new post, and queries for common and rare words. "scan" is
+    # a substring test over every item's plain text, extracted beforehand (no ranking, no HTML parsing).
+    posts = list(data["announcements"])
+    doc = dict(data, announcements=posts, _version=1)
+    index = search_index.SearchIndex(os.path.join(workdir, f"search-{n}.sqlite"))
+    results.append({"op": "search_build", "variant": "current", **timed(lambda: index.sync(doc), 1)})
+
+    def post():
+        doc["_version"] += 1
+        posts.insert(0, {"title": f"Post {doc['_version']}", "content": "<p>server restart tonight</p>", "author": "bench", "date": ""})
+        index.sync(doc)
+    results.append({"op": "search_sync_one", "variant": "current", **timed(post, repeat)})
+    texts = [" ".join(rich_text.plain_text(str(item.get(f) or "")) for f in (title,) + fields).lower()
+             for c, (title, fields) in search_index.SOURCES.items() for item in doc.get(c, [])]
+    for op, words in (("search_common", ("crash", "vehicle")), ("search_rare", ("user42",))):
+        results.append({"op": op, "variant": "scan",
+                        **timed(lambda: [t for t in texts if all(w in t for w in words)][:20], repeat)})
+        results.append({"op": op, "variant": "current", **timed(lambda: index.search(" ".join(words)), repeat)})
+    return results
+
+
+def run(scales, backends, repeat):
+    results = []
+    workdir = tempfile.mkdtemp(prefix="bench_portal_")
+    try:
+        for n in scales:
+            t = time.perf_counter()
+            data = synth.make_db(n)
+            size = len(json.dumps(data))
+            print(f"scale {n}: {size / 1e6:.1f} MB database generated in {time.perf_counter() - t:.1f} s", file=sys.stderr)
+            for group in (bench_storage(data, n, backends, max(1, repeat // 2), workdir),
+                          bench_formats(data, n, max(1, repeat // 2), workdir),
+                          bench_memory(data, n, repeat),
+                          bench_files(data, n, repeat, workdir)):
+                for r in group:
+                    r["scale"] = n
+                    results.append(r)
+                    size = f"  {r['bytes'] / 1e6:8.2f} MB" if "bytes" in r else ""
+                    print(f"  {r['op']:<22} {r['variant']:<8} {r['median_s'] * 1000:10.3f} ms{size}", file=sys.stderr)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def compare(old_path, new_path, noise_s=1e-4):
+    """Prints new/old median ratios, slowest first. Ops under `noise_s` in both runs are never flagged."""
+    load = lambda p: {(r["op"], r["variant"], r["scale"]): r for r in json.load(open(p))["results"]}
+    old, new = load(old_path), load(new_path)
+    rows = [(new[k]["median_s"] / old[k]["median_s"] if old[k]["median_s"] else float("inf"), k)
+            for k in old.keys() & new.keys()]
+    for ratio, (op, variant, scale) in sorted(rows, reverse=True):
+        slow = ratio > 1.2 and max(old[(op, variant, scale)]["median_s"], new[(op, variant, scale)]["median_s"]) >= noise_s
+        flag = "  <-- slower" if slow else ""
+        print(f"{op:<22} {variant:<8} {scale:>7}  {old[(op, variant, scale)]['median_s'] * 1000:10.3f} ms -> "
+              f"{new[(op, variant, scale)]['median_s'] * 1000:10.3f} ms  x{ratio:.2f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the portal's hot paths on synthetic data.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--backends", nargs="+", default=["json", "journal", "sqlite"])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--out", help="write results JSON here (default: stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files instead")
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+    report = {
+        "started": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": run(args.scales, args.backends, args.repeat),
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f: f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Import-time report: what each page costs a fresh worker before it can paint.
+
+    python bench/bench_startup.py              # median of 5 cold interpreters per scenario
+    python bench/bench_startup.py --runs 9 --top 8
+
+Every scenario runs `python -X importtime -c "<imports>"` in a new process.
+"login" is exactly the import block at the top of app.py (parsed from the file,
+so it stays current). Each page scenario adds the views/ module that page
+routes to. "eager" imports everything up front, the way app.py did before
+pages were split out. The table lists the median total and the heaviest
+top-level imports.
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+import views  # noqa: E402
+
+
+def app_imports():
+    """The import statements at the top level of app.py, as source lines."""
+    with open(os.path.join(ROOT, "app.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def scenarios():
+    base = app_imports()
+    out = {"login": base}
+    for page in ("view_announcements", "view_broken_mods", "roles", "json_editor"):
+        out[page] = base + [f"import views.{views.PAGES[page]}"]
+    out["eager (all pages)"] = base + [f"import views.{m}" for m in sorted(set(views.PAGES.values()))]
+    return out
+
+
+def importtime(lines, skip=()):
+    """
+    (total seconds, {top-level module: cumulative seconds}) for one cold
+    interpreter, leaving out the modules in `skip`.
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "\n".join(lines)],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode:
+        sys.exit(proc.stderr)
+    top = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line: continue
+        _, cumulative, name = line.split("|")
+        if name.startswith("   ") or name.strip() in skip: continue  # nested: counted in its parent
+        top[name.strip()] = int(cumulative) / 1e6
+    return sum(top.values()), top
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time per page for a fresh worker.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="heaviest imports listed per scenario")
+    args = parser.parse_args()
+    interpreter = importtime([])[1].keys()  # site, encodings, ...: paid before app.py runs
+    results = {}
+    for name, lines in scenarios().items():
+        runs = sorted((importtime(lines, interpreter) for _ in range(args.runs)), key=lambda r: r[0])
+        total, modules = runs[len(runs) // 2]
+        results[name] = (total, sorted(modules.items(), key=lambda kv: -kv[1])[:args.top])
+    eager = results["eager (all pages)"][0]
+    print(f"{'scenario':<20} {'imports':>10} {'vs eager':>9}   heaviest top-level imports")
+    for name, (total, heaviest) in results.items():
+        top = ", ".join(f"{mod} {t * 1000:.0f}" for mod, t in heaviest)
+        print(f"{name:<20} {total * 1000:8.0f} ms {total / eager:8.0%}   {top}")
+
+
+if __name__ == "__main__":
+    main()
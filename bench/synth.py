@@ -0,0 +1,109 @@
+"""
+Synthetic portal databases for benchmarks and manual load testing.
+
+    python bench/synth.py 10000 portal_data.json     # write a database at that scale
+
+make_db(n) follows the shape app.py writes today: n mods (tickets), n/4
+projects, n/10 users and announcements, n/20 events and tutorials and n
+library entries. Tickets get Quill-style HTML descriptions; a share of them
+are resolved. make_threads() produces matching discussion messages.
+Everything is seeded, so the same n always gives the same data.
+"""
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+WORDS = ("arma reforger server mod crash fix vehicle weapon map sound medic core pack status quo rhs "
+         "texture loading desync spawn script error update version patch config ui hud night ai").split()
+BASE_TIME = datetime(2024, 1, 1)
+
+
+def _words(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def quill_html(rng, paragraphs=3):
+    parts = []
+    for _ in range(paragraphs):
+        text = _words(rng, rng.randint(15, 40))
+        if rng.random() < 0.3: text = f"<strong>{_words(rng, 2)}</strong> {text}"
+        if rng.random() < 0.2: text += f' <a href="https://example.com/{rng.randint(1, 999)}">link</a>'
+        parts.append(f"<p>{text}</p>")
+    if rng.random() < 0.3:
+        parts.append("<ul>" + "".join(f"<li>{_words(rng, 5)}</li>" for _ in range(3)) + "</ul>")
+    return "".join(parts)
+
+
+def _stamp(rng, days=365):
+    return (BASE_TIME + timedelta(seconds=rng.randint(0, days * 86400))).isoformat(timespec="seconds")
+
+
+def make_db(n, seed=0):
+    rng = random.Random(seed)
+    users = [f"user{i}@example.com" for i in range(max(1, n // 10))]
+    roles = ["staff", "admin", "CLP", "CLPLEAD"]
+    data = {
+        "role_db": {u: rng.choice(roles) for u in users},
+        "usernames": {u: u.split("@")[0] for u in users},
+        "passwords": {u: "x" for u in users},
+        "mods": [], "projects": [], "events": [], "tutorials": [], "announcements": [],
+        "mod_library": [], "server_configs": [],
+    }
+    data["role_db"][users[0]] = "SUPER_ADMIN"
+    for i in range(n):
+        complete = rng.random() < 0.7
+        mod = {"id": i, "name": f"{_words(rng, 3).title()} #{i}", "json_data": json.dumps({"modId": f"{rng.getrandbits(64):016X}"}),
+               "severity": rng.randint(1, 10), "assignment": rng.choice(users).split("@")[0],
+               "description": quill_html(rng, 2), "complete": complete, "read": rng.random() < 0.9,
+               "created_at": _stamp(rng)}
+        if complete: mod["completed_at"] = _stamp(rng)
+        data["mods"].append(mod)
+    for i in range(max(1, n // 4)):
+        data["projects"].append({"id": i, "name": _words(rng, 4).title(), "assigned": rng.choice(users).split("@")[0],
+                                 "severity": rng.randint(1, 10), "description": quill_html(rng, 2),
+                                 "complete": rng.random() < 0.5, "read": rng.random() < 0.9, "created_at": _stamp(rng)})
+    for i in range(max(1, n // 10)):
+        data["announcements"].append({"date": _stamp(rng)[:10], "title": _words(rng, 5).title(),
+                                      "content": quill_html(rng, 4), "author": rng.choice(users).split("@")[0]})
+    for i in range(max(1, n // 20)):
+        when = _stamp(rng)
+        data["events"].append({"name": _words(rng, 3).title(), "date": when[:10], "time": when[11:], "tz": "UTC",
+                               "loc": _words(rng, 2), "desc": quill_html(rng, 2)})
+        data["tutorials"].append({"title": _words(rng, 4).title(), "content": quill_html(rng, 6)})
+    for i in range(n):
+        data["mod_library"].append({"modId": f"{rng.getrandbits(64):016X}", "name": f"{_words(rng, 3).title()} {i}",
+                                    "version": f"1.{rng.randint(0, 9)}.{rng.randint(0, 99)}"})
+    data["_seq"] = {"mods": len(data["mods"]), "projects": len(data["projects"])}
+    return data
+
+
+def make_threads(data, per_ticket=5, seed=0):
+    """{(collection, id): [messages]} for every ticket."""
+    rng = random.Random(seed + 1)
+    users = list(data["usernames"].values())
+    threads = {}
+    for name in ("mods", "projects"):
+        for t in data[name]:
+            threads[(name, t["id"])] = [{"user": rng.choice(users), "text": _words(rng, rng.randint(3, 30)),
+                                         "time": _stamp(rng)} for _ in range(rng.randint(0, per_ticket * 2))]
+    return threads
+
+
+def editor_text(n, seed=0):
+    """A Mod Studio server config holding n mods."""
+    rng = random.Random(seed + 2)
+    mods = [{"modId": f"{rng.getrandbits(64):016X}", "name": f"Mod {i}", "version": ""} for i in range(n)]
+    return json.dumps({"bindAddress": "", "game": {"name": "Server", "mods": mods}}, indent=4)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit(__doc__)
+    size, out = int(sys.argv[1]), sys.argv[2]
+    if os.path.exists(out):
+        sys.exit(f"{out} already exists; not overwriting it.")
+    with open(out, "w") as f:
+        json.dump(make_db(size), f, indent=4)
+    print(f"wrote {out} ({os.path.getsize(out) / 1e6:.1f} MB)")
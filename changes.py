@@ -0,0 +1,91 @@
+"""
+Live updates for open sessions: an in-process change feed and presence.
+
+ChangeFeed is a monotonically versioned log of which top-level database keys
+changed ("mods", "role_db", ...). SharedDB publishes to it on every save, and
+on every reload caused by another process. Each session remembers the last
+version it has seen. A polling fragment asks for what happened since (a few
+comparisons, no I/O) and reruns the page only when something the page shows
+has changed.
+
+Presence keeps heartbeats from those same fragments as file modification
+times in a directory next to the database, so every replica sees the same
+roster.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import deque
+
+
+class ChangeFeed:
+    def __init__(self, keep=1000):
+        self.version = 0
+        self._events = deque(maxlen=keep)  # (version, frozenset of keys, or None for "anything")
+        self._lock = threading.Lock()
+
+    def publish(self, keys=None):
+        """Records that `keys` changed (None: unknown, treat as everything). Returns the new version."""
+        with self._lock:
+            self.version += 1
+            self._events.append((self.version, None if keys is None else frozenset(keys)))
+            return self.version
+
+    def since(self, version):
+        """
+        (keys changed after `version`, current version). keys is None when
+        anything may have changed: an event said so, or `version` is older
+        than the oldest event still kept.
+        """
+        with self._lock:
+            if version >= self.version: return set(), self.version
+            if not self._events or self._events[0][0] > version + 1: return None, self.version
+            changed = set()
+            for v, keys in reversed(self._events):
+                if v <= version: break
+                if keys is None: return None, self.version
+                changed |= keys
+            return changed, self.version
+
+
+class Presence:
+    """Who has a session open: one heartbeat file per user, online while touched within `ttl` seconds."""
+
+    def __init__(self, path, ttl=60, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self.clock = clock
+        self._touched = {}  # user -> when this process last touched their file
+
+    def _file(self, user):
+        return os.path.join(self.path, hashlib.sha256(user.encode()).hexdigest()[:16])
+
+    def beat(self, user):
+        """Marks `user` online. The file is touched at most every ttl/4 seconds per process."""
+        now = self.clock()
+        if now - self._touched.get(user, 0) < self.ttl / 4: return
+        self._touched[user] = now
+        os.makedirs(self.path, exist_ok=True)
+        path = self._file(user)
+        with open(path, 'a'):
+            pass
+        os.utime(path, (now, now))
+
+    def leave(self, user):
+        self._touched.pop(user, None)
+        try:
+            os.remove(self._file(user))
+        except FileNotFoundError:
+            pass
+
+    def online(self, users):
+        """The subset of `users` with a fresh heartbeat (one stat() each)."""
+        cutoff = self.clock() - self.ttl
+        out = set()
+        for user in users:
+            try:
+                if os.stat(self._file(user)).st_mtime >= cutoff: out.add(user)
+            except FileNotFoundError:
+                pass
+        return out
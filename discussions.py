@@ -0,0 +1,118 @@
+"""
+Ticket discussions, one append-only JSON-lines file per thread.
+
+Messages used to live inside each ticket in the main database, so every chat
+message rewrote the whole document and every detail view rendered the whole
+history. Now posting appends one line to <dir>/<collection>-<id>.jsonl and
+the detail page reads only the last N lines (tail() seeks backwards from the
+end), asking for more when the user clicks "Load older". While the page is
+open it polls size() and reads only what was appended since (since()).
+"""
+import json
+import os
+from collections import Counter
+
+import storage
+
+BLOCK = 8192
+
+
+class Discussions:
+    def __init__(self, path):
+        self.path = path
+        self._lock_path = os.path.join(path, "lock")
+
+    def _file(self, collection, ticket_id):
+        return os.path.join(self.path, f"{collection}-{ticket_id}.jsonl")
+
+    def post(self, collection, ticket_id, message):
+        """Appends one message. A single O_APPEND write, so concurrent posters don't interleave."""
+        os.makedirs(self.path, exist_ok=True)
+        line = (json.dumps(message) + "\n").encode()
+        fd = os.open(self._file(collection, ticket_id), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+    def tail(self, collection, ticket_id, limit, before=None):
+        """
+        Up to `limit` messages that end before byte offset `before` (end of the
+        thread when None), oldest first. Returns (messages, start) where start is
+        the offset of the first one: pass it back as `before` for the page
+        before, and there is nothing older once it is 0.
+        """
+        try:
+            f = open(self._file(collection, ticket_id), 'rb')
+        except FileNotFoundError:
+            return [], 0
+        with f:
+            end = f.seek(0, os.SEEK_END) if before is None else before
+            pos, buf = end, b""
+            while pos > 0 and buf.count(b"\n") <= limit:
+                step = min(BLOCK, pos)
+                pos -= step
+                f.seek(pos)
+                buf = f.read(step) + buf
+        lines = buf.split(b"\n")
+        lines.pop()  # after the last newline: empty, or a line still being written
+        start = pos
+        if pos > 0:
+            start += len(lines.pop(0)) + 1  # may be cut off; the next page starts with it
+        if len(lines) > limit:
+            start += sum(len(line) + 1 for line in lines[:-limit])
+            lines = lines[-limit:]
+        return [json.loads(line) for line in lines], start
+
+    def size(self, collection, ticket_id):
+        """Bytes in the thread so far. It only grows, so it doubles as the thread's version."""
+        try:
+            return os.path.getsize(self._file(collection, ticket_id))
+        except FileNotFoundError:
+            return 0
+
+    def since(self, collection, ticket_id, offset):
+        """
+        Messages appended after byte `offset`. Returns (messages, end); pass
+        `end` back next time. A line still being written is left for later.
+        """
+        try:
+            f = open(self._file(collection, ticket_id), 'rb')
+        except FileNotFoundError:
+            return [], offset
+        with f:
+            f.seek(offset)
+            buf = f.read()
+        buf = buf[:buf.rfind(b"\n") + 1]
+        return [json.loads(line) for line in buf.splitlines() if line], offset + len(buf)
+
+    def import_inline(self, collection, ticket):
+        """
+        Migration: moves a ticket's inline "discussion" list into its thread
+        file. If the file exists already (another replica imported first, or
+        messages were posted since), the messages it does not hold yet are
+        appended after it, so none are lost and none are written twice.
+        Appending keeps the byte offsets open pages poll from valid.
+        """
+        messages = ticket.get('discussion')
+        if messages:
+            os.makedirs(self.path, exist_ok=True)
+            path = self._file(collection, ticket['id'])
+            with storage.file_lock(self._lock_path):
+                try:
+                    with open(path, 'rb') as f:
+                        held = Counter(f.read().splitlines())
+                except FileNotFoundError:
+                    held = Counter()
+                missing = []
+                for m in messages:
+                    line = json.dumps(m).encode()
+                    if held[line]: held[line] -= 1
+                    else: missing.append(line + b"\n")
+                if missing:
+                    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                    try:
+                        os.write(fd, b"".join(missing))
+                    finally:
+                        os.close(fd)
+        ticket.pop('discussion', None)
@@ -0,0 +1,136 @@
+"""
+Parsed model of the Mod Studio editor text.
+
+The editor holds either a bare list of mods or a full server config with the
+list under "game" -> "mods". EditorModel keeps that list as written
+(duplicates included) with a set of its modIds for the O(1) duplicate check,
+together with the untouched text before and after the array. Text is rebuilt lazily, and only
+the mods array is re-serialized; the rest of the user's document is kept
+byte for byte.
+"""
+import json
+import re
+
+_STRUCT = re.compile(r'"(?:[^"\\]|\\.)*"|[{}\[\]:]')
+_DECODER = json.JSONDecoder()
+MODS_PATHS = (("game", "mods"), ("mods",))
+
+
+def _array_span(text, path):
+    """(start, end) offsets of the JSON array at key `path`, end exclusive; None if absent."""
+    stack = []  # per open container: [is_dict, pending_key, path_to_it]
+    last_string = None
+    for m in _STRUCT.finditer(text):
+        tok = m.group()
+        if tok[0] == '"':
+            last_string = json.loads(tok)
+            continue
+        if tok == ":":
+            if stack and stack[-1][0]: stack[-1][1] = last_string
+        elif tok in "{[":
+            cpath = ()
+            if stack:
+                parent = stack[-1]
+                cpath = parent[2] + (parent[1] if parent[0] else None,)
+                parent[1] = None
+            if tok == "[" and cpath == path:
+                # Found it: let the C decoder skip over the array instead of tokenizing every mod.
+                return m.start(), _DECODER.raw_decode(text, m.start())[1]
+            stack.append([tok == "{", None, cpath])
+        else:
+            if stack: stack.pop()
+        last_string = None
+    return None
+
+
+def _line_indent(text, pos):
+    line_start = text.rfind("\n", 0, pos) + 1
+    line = text[line_start:pos]
+    return line[:len(line) - len(line.lstrip())]
+
+
+def _mod_id(mod):
+    return mod.get("modId") if isinstance(mod, dict) else None
+
+
+def render(mods, prefix="", suffix="", indent=""):
+    """Editor text for `mods` between `prefix` and `suffix`, the array indented by `indent`."""
+    body = json.dumps(mods, indent=4)
+    if indent:
+        body = body.replace("\n", "\n" + indent)
+    return prefix + body + suffix
+
+
+class EditorModel:
+    def __init__(self, mods, prefix="", suffix="", indent=""):
+        self.prefix = prefix
+        self.suffix = suffix
+        self.indent = indent
+        self._mods = list(mods)
+        self._ids = {mid for mid in map(_mod_id, self._mods) if mid is not None}
+        self._text = None
+
+    @classmethod
+    def from_text(cls, text):
+        """Parses editor text; returns None when it is not valid JSON right now (mid-edit)."""
+        try:
+            doc = json.loads(text)
+        except (ValueError, TypeError):
+            return None
+        if isinstance(doc, list):
+            model = cls(doc)
+            model._text = text
+            return model
+        if not isinstance(doc, dict):
+            return None
+        for path in MODS_PATHS:
+            node = doc
+            for key in path:
+                node = node.get(key) if isinstance(node, dict) else None
+            if isinstance(node, list):
+                span = _array_span(text, path)
+                if span:
+                    model = cls(node, text[:span[0]], text[span[1]:], _line_indent(text, span[0]))
+                    model._text = text
+                    return model
+        # A config without a mods array yet: give it one under "game".
+        game = doc.setdefault("game", {})
+        if not isinstance(game, dict):
+            return None
+        game["mods"] = []
+        rebuilt = json.dumps(doc, indent=4)
+        return cls.from_text(rebuilt)
+
+    def __contains__(self, mod_id):
+        return mod_id in self._ids
+
+    def __len__(self):
+        return len(self._mods)
+
+    @property
+    def mods(self):
+        return list(self._mods)
+
+    def add(self, mod):
+        """Appends a mod; returns False (and changes nothing) if its modId is already there."""
+        mid = _mod_id(mod)
+        if mid is not None:
+            if mid in self._ids: return False
+            self._ids.add(mid)
+        self._mods.append(mod)
+        self._text = None
+        return True
+
+    def remove(self, mod_id):
+        """Removes every entry with `mod_id`."""
+        if mod_id not in self._ids: return False
+        self._ids.discard(mod_id)
+        self._mods = [m for m in self._mods if _mod_id(m) != mod_id]
+        self._text = None
+        return True
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = render(self.mods, self.prefix, self.suffix, self.indent)
+        return self._text
@@ -0,0 +1,27 @@
+"""
+Paging for the portal's list pages (announcements, events, tutorials, tickets).
+
+page_of() picks one page out of a list. In list order that is a plain slice,
+so a page costs the same however long the history is; ordering by a key is
+one C-level sort of the list, with only the page handed back for rendering.
+"""
+
+
+def page_count(total, size):
+    return max(1, -(-total // size))
+
+
+def page_of(items, key=None, reverse=False, page=0, size=20):
+    """
+    Items on `page` when `items` is ordered by `key` (list position when None).
+    Ties keep list order (reversed along with everything else when `reverse`).
+    """
+    lo, hi = page * size, (page + 1) * size
+    if key is None:
+        if not reverse:
+            return items[lo:hi]
+        n = len(items)
+        return items[max(0, n - hi):max(0, n - lo)][::-1]
+    # sorted() is stable; sorting the reversed list keeps ties newest-first too.
+    ordered = sorted(items[::-1] if reverse else items, key=key, reverse=reverse)
+    return ordered[lo:hi]
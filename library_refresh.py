@@ -0,0 +1,149 @@
+"""
+Keeps DB['mod_library'] in step with the Workshop.
+
+Entries are re-fetched in rate-limited concurrent batches; changed names,
+versions and images are written back in a single save, and entries whose
+workshop page is gone (404) are flagged with "missing": True.
+
+Runs either as a thread inside the app (LIBRARY_REFRESH_INTERVAL) or on its own:
+    python library_refresh.py                     # one pass over portal_data.json
+    python library_refresh.py --every 3600        # keep going, once an hour
+
+--backend and --format default to DB_BACKEND and DB_FORMAT from
+.streamlit/secrets.toml, so the file is written the way the app writes it.
+"""
+import argparse
+import contextlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import serializers
+import storage
+import workshop
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+SECRETS_FILE = os.path.join(".streamlit", "secrets.toml")
+
+TRACKED_FIELDS = (("name", "name"), ("version", "version"), ("image_url", "image_url"))
+
+
+def check_library(library, cache, max_workers=8, batch_size=50):
+    """
+    Fetches every library entry. Returns {modId: changes} where changes holds
+    only the fields that differ (plus "missing" when that flag flips).
+    """
+    mod_ids = list(dict.fromkeys(m['modId'] for m in library if m.get('modId')))
+    current = {m['modId']: m for m in library if m.get('modId')}
+    updates = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for start in range(0, len(mod_ids), batch_size):
+            batch = mod_ids[start:start + batch_size]
+            for mod_id, (meta, status) in zip(batch, pool.map(cache.refresh, batch)):
+                entry, changes = current[mod_id], {}
+                if status == 404:
+                    if not entry.get('missing'): changes['missing'] = True
+                elif meta is not None:
+                    if entry.get('missing'): changes['missing'] = False
+                    for field, key in TRACKED_FIELDS:
+                        if meta.get(key) and meta[key] != entry.get(field):
+                            changes[field] = meta[key]
+                if changes:
+                    updates[mod_id] = changes
+    return updates
+
+
+def apply_updates(library, updates):
+    """Applies check_library() results in place. Returns the number of entries touched."""
+    touched = 0
+    for entry in library:
+        changes = updates.get(entry.get('modId'))
+        if changes:
+            entry.update(changes)
+            if changes.get('missing') is False: del entry['missing']
+            touched += 1
+    return touched
+
+
+def refresh_once(load, save, cache, max_workers=8, batch_size=50, lock=None):
+    """
+    One full pass: load() the DB, fetch everything, save() once if anything changed.
+    `lock`, if given, is held from the re-read until the save (see storage.SharedDB).
+    """
+    library = list(load().get('mod_library', []))
+    updates = check_library(library, cache, max_workers, batch_size)
+    if not updates:
+        return 0
+    with lock or contextlib.nullcontext():
+        data = load()  # re-read: the fetch pass can take minutes
+        touched = apply_updates(data.get('mod_library', []), updates)
+        if touched:
+            save(data)
+    return touched
+
+
+def app_setting(key, default):
+    """`key` from the app's secrets.toml, or `default` when it (or tomllib) isn't there."""
+    if tomllib is None or not os.path.exists(SECRETS_FILE): return default
+    with open(SECRETS_FILE, 'rb') as f:
+        return tomllib.load(f).get(key, default)
+
+
+class LibraryRefresher:
+    """
+    Background thread that calls refresh_once() every `interval` seconds.
+    `load` must not use Streamlit: the thread runs outside any script run.
+    """
+
+    def __init__(self, load, save, cache, interval, max_workers=8, batch_size=50, lock=None):
+        self.load, self.save, self.cache, self.lock = load, save, cache, lock
+        self.interval = interval
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.last_run = None
+        self.last_touched = 0
+        self.last_error = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, daemon=True, name="library-refresh")
+            self._thread.start()
+        return self
+
+    def _loop(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.last_touched = refresh_once(self.load, self.save, self.cache, self.max_workers, self.batch_size, self.lock)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+            self.last_run = time.time()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh mod_library metadata from the Workshop.")
+    parser.add_argument("--db", default="portal_data.json")
+    parser.add_argument("--backend", default=app_setting("DB_BACKEND", "json"), choices=["json", "journal", "sqlite"])
+    parser.add_argument("--format", default=app_setting("DB_FORMAT", "json"), choices=serializers.FORMATS,
+                        help="snapshot format for the json and journal backends")
+    parser.add_argument("--cache", default="workshop_cache.sqlite")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=4.0, help="requests per second")
+    parser.add_argument("--every", type=float, default=0, help="repeat every N seconds (0 = run once)")
+    args = parser.parse_args()
+
+    store = storage.open_store(args.backend, args.db, fmt=args.format)
+    cache = workshop.MetadataCache(args.cache, get=workshop.make_session_get(args.workers, args.rate))
+    while True:
+        touched = refresh_once(store.load, store.save, cache, max_workers=args.workers)
+        print(f"{time.strftime('%Y-%m-%d %H:%M:%S')} updated {touched} library entries")
+        if not args.every:
+            break
+        time.sleep(args.every)
@@ -0,0 +1,213 @@
+"""
+Search index over DB['mod_library'] for the Mod Studio "Library" tab.
+
+Names are normalized to lower-case words and kept in three structures:
+a sorted name list (the unfiltered, alphabetical view), a sorted word list
+(prefix matches via bisect) and trigram postings (typo-tolerant matches).
+Substrings are found like the old `query in name.lower()` filter did, through
+postings of the plain lower-cased name's trigrams (a scan for queries shorter
+than three characters), so the index never finds less than that filter.
+Everything is updated per entry, so an add, delete or import only touches the
+mods that changed.
+"""
+import bisect
+import heapq
+import re
+import threading
+from collections import defaultdict
+
+_WORD = re.compile(r"[a-z0-9]+")
+MIN_FUZZY_SCORE = 0.45
+BULK_THRESHOLD = 64  # beyond this many changes, rebuild the sorted lists in one sort
+
+
+def normalize(text):
+    return " ".join(_WORD.findall((text or "").lower()))
+
+
+def _lower(entry):
+    return (entry.get('name') or "").lower()
+
+
+def _substrings(lower):
+    """Unpadded trigrams of a lower-cased name, punctuation and spaces included."""
+    return {lower[i:i + 3] for i in range(len(lower) - 2)}
+
+
+def _trigrams(norm):
+    grams = set()
+    for word in norm.split():
+        padded = "  " + word + " "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class LibraryIndex:
+    def __init__(self):
+        self._entries = {}             # modId -> library entry
+        self._norm = {}                # modId -> normalized name
+        self._lower = {}               # modId -> lower-cased name, as written
+        self._sorted = []              # [(normalized name, modId)], alphabetical
+        self._words = []               # [(word, modId)], sorted
+        self._grams = defaultdict(set) # trigram -> {modId}
+        self._subs = defaultdict(set)  # trigram of the lower-cased name -> {modId}
+        self._synced = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._norm)
+
+    # --- UPDATES ---
+    def add(self, entry):
+        """Indexes (or re-indexes) one library entry."""
+        with self._lock:
+            self._add(entry)
+
+    def remove(self, mod_id):
+        with self._lock:
+            self._remove(mod_id)
+
+    def sync(self, library, version=None):
+        """
+        Brings the index in line with `library`, re-indexing only entries whose
+        name changed. Skipped outright when called again with the same list and
+        DB version.
+        """
+        key = (id(library), version)
+        if version is not None and key == self._synced:
+            return
+        with self._lock:
+            seen, changed = set(), {}
+            for entry in library:
+                mid = entry.get('modId')
+                if not mid: continue
+                seen.add(mid)
+                if self._lower.get(mid) != _lower(entry):
+                    changed[mid] = entry
+                else:
+                    self._entries[mid] = entry
+            gone = [m for m in self._norm if m not in seen]
+            if len(changed) + len(gone) > BULK_THRESHOLD:
+                self._bulk_update(changed.values(), gone)
+            else:
+                for entry in changed.values(): self._add(entry)
+                for mid in gone: self._remove(mid)
+            self._synced = key
+
+    def _bulk_update(self, changed, gone):
+        """Same result as _add/_remove one by one, without an O(n) list insert per entry."""
+        changed = list(changed)
+        stale = {e['modId'] for e in changed if e['modId'] in self._norm} | set(gone)
+        for mid in stale:
+            self._drop_grams(mid, self._norm.pop(mid), self._lower.pop(mid))
+            self._entries.pop(mid, None)
+        if stale:
+            self._sorted = [row for row in self._sorted if row[1] not in stale]
+            self._words = [row for row in self._words if row[1] not in stale]
+        for entry in changed:
+            mid = entry['modId']
+            norm = normalize(entry.get('name'))
+            self._norm[mid], self._lower[mid] = norm, _lower(entry)
+            self._entries[mid] = entry
+            self._sorted.append((norm, mid))
+            self._words.extend((word, mid) for word in set(norm.split()))
+            self._add_grams(mid, norm)
+        self._sorted.sort()
+        self._words.sort()
+
+    def _add(self, entry):
+        mid = entry['modId']
+        lower = _lower(entry)
+        if self._lower.get(mid) != lower:
+            self._remove(mid)
+            norm = normalize(lower)
+            self._norm[mid], self._lower[mid] = norm, lower
+            bisect.insort(self._sorted, (norm, mid))
+            for word in set(norm.split()):
+                bisect.insort(self._words, (word, mid))
+            self._add_grams(mid, norm)
+        self._entries[mid] = entry
+
+    def _remove(self, mid):
+        norm = self._norm.pop(mid, None)
+        self._entries.pop(mid, None)
+        if norm is None: return
+        _discard_sorted(self._sorted, (norm, mid))
+        for word in set(norm.split()):
+            _discard_sorted(self._words, (word, mid))
+        self._drop_grams(mid, norm, self._lower.pop(mid))
+
+    def _add_grams(self, mid, norm):
+        for gram in _trigrams(norm):
+            self._grams[gram].add(mid)
+        for gram in _substrings(self._lower[mid]):
+            self._subs[gram].add(mid)
+
+    def _drop_grams(self, mid, norm, lower):
+        for postings, grams in ((self._grams, _trigrams(norm)), (self._subs, _substrings(lower))):
+            for gram in grams:
+                ids = postings.get(gram)
+                if ids is not None:
+                    ids.discard(mid)
+                    if not ids: del postings[gram]
+
+    # --- QUERIES ---
+    def search(self, query, page=0, per_page=25):
+        """
+        Returns (entries on this page, total matches). Ranking: exact name,
+        name prefix, word prefix, substring, then fuzzy (trigram overlap);
+        alphabetical within each group. Every name containing the query as
+        typed (ignoring case) is a match.
+        """
+        raw = (query or "").lower()
+        with self._lock:
+            if not raw:
+                rows = self._sorted[page * per_page:(page + 1) * per_page]
+                return [self._entries[mid] for _, mid in rows], len(self._sorted)
+            ranks = self._match(normalize(raw), raw)
+            rows = heapq.nsmallest((page + 1) * per_page, ((rank, self._norm[mid], mid) for mid, rank in ranks.items()))
+            return [self._entries[mid] for _, _, mid in rows[page * per_page:]], len(ranks)
+
+    def _match(self, q, raw):
+        """{modId: rank} for every entry matching `q` (normalized) or containing `raw`; lower rank sorts first."""
+        ranks = {mid: 3 for mid in self._containing(raw)}
+        if not q: return ranks  # e.g. "_": plain substring matches only
+        if " " not in q:
+            # Word prefix: covers short queries that trigrams can't.
+            i = bisect.bisect_left(self._words, (q,))
+            while i < len(self._words) and self._words[i][0].startswith(q):
+                ranks[self._words[i][1]] = min(ranks.get(self._words[i][1], 2), 2)
+                i += 1
+        grams = _trigrams(q)
+        counts = defaultdict(int)
+        for gram in grams:
+            for mid in self._grams.get(gram, ()):
+                counts[mid] += 1
+        for mid, hits in counts.items():
+            if hits / len(grams) >= MIN_FUZZY_SCORE:
+                ranks.setdefault(mid, 4 + (1 - hits / len(grams)))
+        for mid in list(ranks):
+            norm = self._norm[mid]
+            if norm == q:
+                ranks[mid] = 0
+            elif norm.startswith(q):
+                ranks[mid] = 1
+            elif q in norm:
+                ranks[mid] = min(ranks[mid], 3)
+        return ranks
+
+    def _containing(self, raw):
+        """modIds whose lower-cased name contains `raw`, verified against the name itself."""
+        grams = _substrings(raw)
+        if grams:
+            postings = sorted((self._subs.get(g, set()) for g in grams), key=len)
+            candidates = set.intersection(*postings)
+        else:
+            candidates = self._lower  # shorter than a trigram: scan
+        return [mid for mid in candidates if raw in self._lower[mid]]
+
+
+def _discard_sorted(rows, item):
+    i = bisect.bisect_left(rows, item)
+    if i < len(rows) and rows[i] == item:
+        del rows[i]
@@ -0,0 +1,171 @@
+"""
+Request counters and latency histograms for the portal.
+
+app.py wraps load_db, save_db, Workshop lookups and every page render in
+`with METRICS.time(name, **labels)`. While METRICS_ENABLED is off, time()
+returns one shared no-op context manager, so instrumented code pays for a
+method call and nothing else. When it is on, each timing lands in a fixed-bucket
+histogram (one per name + label set). exposition() renders everything in the
+Prometheus text format. start_writer() rewrites that to a file every few
+seconds, for node_exporter's textfile collector or anything else that scrapes
+files.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+
+import storage
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_NOOP = nullcontext()
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last slot: above the largest bucket
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimate from the buckets (linear within a bucket, like Prometheus' histogram_quantile)."""
+        if not self.count: return 0.0
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lo = BUCKETS[i - 1] if i else 0.0
+                if i == len(BUCKETS): return lo
+                return lo + (BUCKETS[i] - lo) * (rank - seen) / n
+            seen += n
+        return BUCKETS[-1]
+
+
+class _Timer:
+    __slots__ = ("_metrics", "_key", "_start")
+
+    def __init__(self, metrics, key):
+        self._metrics, self._key = metrics, key
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._metrics._observe(self._key, time.perf_counter() - self._start)
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs, extra=()):
+    pairs = tuple(pairs) + tuple(extra)
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}" if pairs else ""
+
+
+class Metrics:
+    def __init__(self, enabled=False, prefix="portal"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self._histograms = {}
+        self._counters = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    # --- RECORDING ---
+    def time(self, name, **labels):
+        """Context manager that records its duration under `name` (seconds)."""
+        if not self.enabled: return _NOOP
+        return _Timer(self, _key(name, labels))
+
+    def observe(self, name, seconds, **labels):
+        if self.enabled: self._observe(_key(name, labels), seconds)
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled: return
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def add_collector(self, collect):
+        """`collect()` returns [(name, labels_dict, value)] counter samples, read at export time."""
+        self._collectors.append(collect)
+
+    def _observe(self, key, seconds):
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None: hist = self._histograms[key] = Histogram()
+            hist.observe(seconds)
+
+    # --- READING ---
+    def histograms(self):
+        """[(name, labels_dict, Histogram)] sorted by name and labels; the histograms are copies."""
+        with self._lock:
+            items = sorted(self._histograms.items())
+            out = []
+            for (name, labels), h in items:
+                copy = Histogram()
+                copy.counts, copy.sum, copy.count = list(h.counts), h.sum, h.count
+                out.append((name, dict(labels), copy))
+        return out
+
+    def counters(self):
+        """[(name, labels_dict, value)]: counters bumped with inc() plus every collector's samples."""
+        with self._lock:
+            out = [(name, dict(labels), v) for (name, labels), v in sorted(self._counters.items())]
+        for collect in self._collectors:
+            out.extend(collect())
+        return out
+
+    def exposition(self):
+        """Everything, in the Prometheus text exposition format (0.0.4)."""
+        lines, typed = [], set()
+
+        def header(metric, kind):
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} {kind}")
+
+        for name, labels, value in self.counters():
+            metric = f"{self.prefix}_{name}_total"
+            header(metric, "counter")
+            lines.append(f"{metric}{_labels(sorted(labels.items()))} {value}")
+        for name, labels, h in self.histograms():
+            metric = f"{self.prefix}_{name}_seconds"
+            header(metric, "histogram")
+            pairs, cumulative = sorted(labels.items()), 0
+            for bound, n in zip(BUCKETS + ("+Inf",), h.counts):
+                cumulative += n
+                lines.append(f"{metric}_bucket{_labels(pairs, [('le', bound)])} {cumulative}")
+            lines.append(f"{metric}_sum{_labels(pairs)} {h.sum:.6f}")
+            lines.append(f"{metric}_count{_labels(pairs)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    # --- EXPORT ---
+    def write(self, path):
+        """Atomically replaces `path` ("{pid}" is filled in, so replicas can share a directory)."""
+        storage.atomic_write(path.format(pid=os.getpid()), self.exposition())
+
+    def start_writer(self, path, interval=15):
+        """Rewrites the exposition file every `interval` seconds from a daemon thread."""
+        def run():
+            while True:
+                try:
+                    self.write(path)
+                except OSError:
+                    pass  # unwritable target: keep serving, try again next round
+                time.sleep(interval)
+        threading.Thread(target=run, daemon=True, name="metrics-writer").start()
+        return self
@@ -0,0 +1,115 @@
+"""
+Batch importer for the Mod Studio "Import" tab.
+
+Walks a pasted or uploaded server config of any shape with a small
+incremental JSON tokenizer and picks out every object that has a "modId",
+however deeply it is nested (mods inside "game" -> "mods", dependencies
+inside a mod, ...). Input is read a chunk at a time, so large uploads are
+never held as one string, and it is forgiving about the half-edited text
+people paste (trailing commas, missing brackets).
+"""
+import codecs
+import json
+import re
+
+# Skips separators/whitespace, then captures one string, bracket, number or literal.
+_TOKEN = re.compile(r'[^"{}\[\]\-\dtfn]*("[^"\\\n]*(?:\\.[^"\\\n]*)*"|[{}\[\]]|[-\d][-+\d.eE]*|true|false|null)')
+_LITERALS = {"true": True, "false": False, "null": None}
+CHUNK_SIZE = 1 << 20
+
+
+def _chunks(source):
+    """Text chunks from a str or a file-like object (text or binary)."""
+    if isinstance(source, str):
+        yield source
+        return
+    # Incremental: a multi-byte character split across two reads is decoded whole.
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+        chunk = source.read(CHUNK_SIZE)
+        if not chunk:
+            tail = decoder.decode(b"", final=True)
+            if tail: yield tail
+            return
+        yield decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+
+
+def iter_mod_objects(source):
+    """Yields every JSON object in `source` that carries a "modId" key."""
+    # Each frame is [container, pending_key]; pending_key only matters for dicts.
+    stack = []
+
+    def feed(text):
+        # The hot loop: "add value to the innermost container" is inlined in each branch.
+        for tok in _TOKEN.findall(text):
+            c = tok[0]
+            if c == "{" or c == "[":
+                stack.append([{} if c == "{" else [], None])
+                continue
+            if c == '"':
+                value = json.loads(tok) if "\\" in tok else tok[1:-1]
+            elif c == "}" or c == "]":
+                if not stack: continue
+                value = stack.pop()[0]
+                if value.__class__ is dict and "modId" in value:
+                    yield value
+                    value = None  # parents never need it again; keeps memory flat
+            elif tok in _LITERALS:
+                value = _LITERALS[tok]
+            else:
+                try:
+                    value = int(tok)
+                except ValueError:
+                    try: value = float(tok)
+                    except ValueError: continue
+            if not stack: continue
+            frame = stack[-1]
+            container = frame[0]
+            if container.__class__ is list:
+                container.append(value)
+            elif frame[1] is None:
+                if value.__class__ is str: frame[1] = value
+            else:
+                container[frame[1]] = value
+                frame[1] = None
+
+    carry = ""
+    for chunk in _chunks(source):
+        text = carry + chunk
+        # JSON strings cannot contain raw newlines, so a newline is always a safe place to cut.
+        cut = text.rfind("\n") + 1
+        carry = text[cut:]
+        yield from feed(text[:cut])
+    yield from feed(carry)
+    # Unclosed objects at EOF (truncated paste): still take any finished mod blocks.
+    while stack:
+        value = stack.pop()[0]
+        if isinstance(value, dict) and "modId" in value:
+            yield value
+
+
+def import_mods(library, source, update_existing=False):
+    """
+    Adds every mod found in `source` to `library` (list of library entries).
+    Dedupes on modId through a dict index. Returns {"added", "updated", "skipped"}.
+    """
+    index = {m.get('modId'): m for m in library}
+    counts = {"added": 0, "updated": 0, "skipped": 0}
+    for obj in iter_mod_objects(source):
+        mid = obj.get("modId")
+        if not isinstance(mid, str) or not mid:
+            continue
+        name = obj.get("name", "Unknown Imported Mod")
+        version = obj.get("version", "")
+        existing = index.get(mid)
+        if existing is None:
+            entry = {"modId": mid, "name": name, "version": version}
+            library.append(entry)
+            index[mid] = entry
+            counts["added"] += 1
+        elif update_existing and (existing.get('name'), existing.get('version')) != (name, version):
+            existing['name'], existing['version'] = name, version
+            counts["updated"] += 1
+        else:
+            counts["skipped"] += 1
+    return counts
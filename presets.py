@@ -0,0 +1,158 @@
+"""
+Mod Studio presets, stored against a shared pool of mod entries.
+
+A preset used to be a copy of the whole editor text, so ten presets of the
+same 100 mods carried a thousand mod blocks. Now save() splits the text
+around its mods array. Every mod entry goes into data["mod_pool"] under a hash
+of its JSON, and the preset keeps the list of hashes, in order and duplicates
+included, plus the text around the array. Identical entries are stored once
+however many presets use them. expand() rebuilds the text when a preset is
+loaded. diff() compares presets hash by hash, so it only looks closer at
+entries that differ.
+
+Presets whose text is not valid JSON, holds no mods, or would not come back
+the same from expand(), keep their raw "content" as before.
+
+Saving and deleting never drop pool entries: another replica may be saving a
+preset that uses them. collect() runs when the database is loaded, under the
+store lock, and restore() puts back entries a concurrent collect() took from
+under a preset being saved.
+"""
+import hashlib
+import json
+
+from editor_model import EditorModel, render
+
+POOL = "mod_pool"
+
+
+def entry_hash(mod):
+    raw = json.dumps(mod, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def pack(data, name, text):
+    """The preset record for `text`. Its mod entries are added to the pool."""
+    model = EditorModel.from_text(text)
+    raw = {"name": name, "content": text}
+    if model is None or not text.startswith(model.prefix) or not text.endswith(model.suffix):
+        return raw  # unparseable, or a config the model had to give a mods array
+    # The array as written, positionally: the model would collapse entries sharing a modId.
+    mods = json.loads(text[len(model.prefix):len(text) - len(model.suffix)])
+    if not mods or json.loads(render(mods, model.prefix, model.suffix, model.indent)) != json.loads(text):
+        return raw
+    pool = data.setdefault(POOL, {})
+    refs = []
+    for mod in mods:
+        h = entry_hash(mod)
+        if h not in pool: pool[h] = mod
+        refs.append(h)
+    return {"name": name, "prefix": model.prefix, "suffix": model.suffix, "indent": model.indent, "mods": refs}
+
+
+def get(data, name):
+    return next((c for c in data.get("server_configs", []) if c['name'] == name), None)
+
+
+def save(data, name, text):
+    """Adds preset `name`, replacing any preset with that name."""
+    preset = pack(data, name, text)
+    data["server_configs"] = [c for c in data.get("server_configs", []) if c['name'] != name] + [preset]
+    return preset
+
+
+def delete(data, name):
+    data["server_configs"] = [c for c in data.get("server_configs", []) if c['name'] != name]
+
+
+def expand(data, preset):
+    """
+    The editor text for `preset`. Entries missing from the pool (a damaged
+    database) are left out; missing() reports how many.
+    """
+    if "content" in preset: return preset["content"]
+    pool = data.get(POOL, {})
+    mods = [pool[h] for h in preset["mods"] if h in pool]
+    return render(mods, preset["prefix"], preset["suffix"], preset["indent"])
+
+
+def missing(data, preset):
+    pool = data.get(POOL, {})
+    return sum(1 for h in preset.get("mods", ()) if h not in pool)
+
+
+def unused(data):
+    """Hashes in the pool that no preset refers to."""
+    used = set()
+    for c in data.get("server_configs", []):
+        used.update(c.get("mods", ()))
+    return [h for h in data.get(POOL, {}) if h not in used]
+
+
+def collect(data):
+    """
+    Drops pool entries that no preset refers to. Returns how many were dropped.
+    Only safe on the document a save is about to write, under the store lock.
+    """
+    gone = unused(data)
+    for h in gone:
+        del data[POOL][h]
+    return len(gone)
+
+
+def restore(target, ours):
+    """
+    Puts back pool entries that presets in `target` refer to but a collect()
+    by another replica removed, taking them from `ours` (the document being
+    saved). For _DocumentStore.save(prepare=...).
+    """
+    pool, mine = target.get(POOL, {}), ours.get(POOL, {})
+    for c in target.get("server_configs", []):
+        for h in c.get("mods", ()):
+            if h not in pool and h in mine:
+                pool[h] = mine[h]
+    if pool and POOL not in target: target[POOL] = pool
+
+
+def migrate(data):
+    """Converts presets still stored as full text. Returns how many were converted."""
+    configs = data.get("server_configs", [])
+    converted = 0
+    for i, c in enumerate(configs):
+        if "content" in c:
+            packed = pack(data, c['name'], c['content'])
+            if "mods" in packed:
+                configs[i] = packed
+                converted += 1
+    return converted
+
+
+def _unpack(data, preset):
+    """(text around the mods array, [(hash, mod)]) for either preset format."""
+    if "content" not in preset:
+        pool = data.get(POOL, {})
+        return (preset["prefix"], preset["suffix"]), [(h, pool.get(h)) for h in preset["mods"]]
+    model = EditorModel.from_text(preset["content"])
+    if model is None: return (preset["content"],), []
+    return (model.prefix, model.suffix), [(entry_hash(m), m) for m in model.mods]
+
+
+def diff(data, a, b):
+    """
+    What changes going from preset `a` to `b`:
+    {"added": [mod], "removed": [mod], "changed": [(old, new)], "settings": bool}.
+    "changed" pairs entries with the same modId and different contents, e.g. a
+    version bump. "settings" is True when the text around the mods differs.
+    """
+    settings_a, refs_a = _unpack(data, a)
+    settings_b, refs_b = _unpack(data, b)
+    same = {h for h, _ in refs_a} & {h for h, _ in refs_b}
+    key = lambda h, m: m.get("modId", h) if isinstance(m, dict) else h
+    old = {key(h, m): m for h, m in refs_a if h not in same}
+    new = {key(h, m): m for h, m in refs_b if h not in same}
+    return {
+        "added": [m for k, m in new.items() if k not in old],
+        "removed": [m for k, m in old.items() if k not in new],
+        "changed": [(old[k], m) for k, m in new.items() if k in old],
+        "settings": settings_a != settings_b,
+    }
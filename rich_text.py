@@ -0,0 +1,231 @@
+"""
+Render cache for the Quill HTML stored in announcements, tutorials, events and
+ticket descriptions.
+
+Each body is processed once per distinct content (keyed by its SHA-256, so an
+edit is simply a new key): tags and attributes are reduced to what Quill
+produces, inline base64 images are written out as files under Streamlit's
+static folder and referenced by URL, and the result is capped in size. The
+processed HTML is kept in an LRU bounded by total bytes.
+"""
+import base64
+import binascii
+import hashlib
+import html
+import os
+import re
+import threading
+from collections import OrderedDict
+from html.parser import HTMLParser
+
+ALLOWED_TAGS = {
+    "p", "br", "strong", "b", "em", "i", "u", "s", "strike", "a", "ol", "ul", "li",
+    "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "code", "span", "img", "sub", "sup",
+}
+VOID_TAGS = {"br", "img"}
+# Tags whose text content is dropped along with the tag.
+DROP_CONTENT = {"script", "style", "iframe", "object", "embed", "template", "noscript", "svg", "math"}
+ALLOWED_STYLES = {"color", "background-color", "text-align"}
+SAFE_URL = re.compile(r"^(?:https?:|mailto:|/|app/static/|#)", re.I)
+DATA_IMAGE = re.compile(r"^data:image/(png|jpe?g|gif|webp);base64,(.*)$", re.I | re.S)
+SAFE_STYLE_VALUE = re.compile(r"^[#\w\s,.%()-]*$")
+STYLE_FUNCTION = re.compile(r"([\w-]*)\s*\(")
+STYLE_FUNCTIONS = {"rgb", "rgba", "hsl", "hsla"}  # Quill writes rgb(); url(), expression() etc. are dropped
+
+
+def content_key(text):
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class _Sanitizer(HTMLParser):
+    """Re-emits only allowed tags/attributes; hands data: images to `save_image`."""
+
+    def __init__(self, save_image, max_bytes):
+        super().__init__(convert_charrefs=True)
+        self.save_image = save_image
+        self.max_bytes = max_bytes
+        self.out = []
+        self.size = 0
+        self.open = []
+        self.skip = 0
+        self.truncated = False
+
+    def _emit(self, piece):
+        if self.truncated: return
+        if self.size + len(piece) > self.max_bytes:
+            self.truncated = True
+            return
+        self.out.append(piece)
+        self.size += len(piece)
+
+    def _attrs(self, tag, attrs):
+        kept = []
+        for name, value in attrs:
+            value = value or ""
+            if name == "href" and tag == "a" and SAFE_URL.match(value.strip()):
+                kept.append((name, value.strip()))
+            elif name == "src" and tag == "img":
+                m = DATA_IMAGE.match(value.strip())
+                url = self.save_image(m.group(1), m.group(2)) if m else value.strip()
+                if url and (m or SAFE_URL.match(url)): kept.append((name, url))
+            elif name in ("alt", "title", "width", "height"):
+                kept.append((name, value))
+            elif name == "class":
+                classes = [c for c in value.split() if c.startswith("ql-")]
+                if classes: kept.append((name, " ".join(classes)))
+            elif name == "style":
+                rules = []
+                for rule in value.split(";"):
+                    prop, _, val = rule.partition(":")
+                    prop, val = prop.strip().lower(), val.strip()
+                    functions = STYLE_FUNCTION.findall(val)
+                    if prop in ALLOWED_STYLES and SAFE_STYLE_VALUE.match(val) and all(f.lower() in STYLE_FUNCTIONS for f in functions):
+                        rules.append(f"{prop}: {val}")
+                if rules: kept.append((name, "; ".join(rules)))
+        if tag == "a" and any(n == "href" for n, _ in kept):
+            kept.append(("rel", "noopener noreferrer"))
+            kept.append(("target", "_blank"))
+        return "".join(f' {n}="{html.escape(v, quote=True)}"' for n, v in kept)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT:
+            self.skip += 1
+            return
+        if self.skip or tag not in ALLOWED_TAGS: return
+        if tag == "img" and not any(n == "src" for n, _ in attrs): return
+        attr_text = self._attrs(tag, attrs)
+        if tag == "img" and " src=" not in attr_text: return
+        self._emit(f"<{tag}{attr_text}>")
+        if tag not in VOID_TAGS and not self.truncated:
+            self.open.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and self.open and self.open[-1] == tag:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT:
+            self.skip = max(0, self.skip - 1)
+            return
+        if self.skip or self.truncated or tag not in self.open: return
+        while self.open:
+            top = self.open.pop()
+            self._emit(f"</{top}>")
+            if top == tag: break
+
+    def handle_data(self, data):
+        if not self.skip:
+            self._emit(html.escape(data, quote=False))
+
+    def result(self):
+        # Closing tags are always written, even past the cap, so the output stays well-formed.
+        tail = "".join(f"</{tag}>" for tag in reversed(self.open))
+        note = '<p><em>(content truncated)</em></p>' if self.truncated else ""
+        return "".join(self.out) + tail + note
+
+
+BLOCK_TAGS = {"p", "br", "li", "div", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre"}
+
+
+class _TextExtractor(HTMLParser):
+    """Collects text content only; block boundaries become spaces so words don't run together."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        self.skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT: self.skip += 1
+        elif tag in BLOCK_TAGS: self.out.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT: self.skip = max(0, self.skip - 1)
+        elif tag in BLOCK_TAGS: self.out.append(" ")
+
+    def handle_data(self, data):
+        if not self.skip: self.out.append(data)
+
+
+def plain_text(text):
+    """The readable text of a Quill body, whitespace collapsed. Markup, images and scripts are dropped."""
+    if not text: return ""
+    parser = _TextExtractor()
+    parser.feed(text)
+    parser.close()
+    return " ".join("".join(parser.out).split())
+
+
+class RenderCache:
+    """
+    render(html) -> processed HTML, cached per distinct content.
+
+    Images land in `image_dir` as <sha256>.<ext> (identical images are stored
+    once) and are referenced as `image_url` + file name. Images larger than
+    `max_image_bytes` are dropped; the processed HTML is cut at `max_html_bytes`.
+    """
+
+    def __init__(self, image_dir, image_url, max_bytes=16 << 20, max_html_bytes=256 << 10,
+                 max_image_bytes=5 << 20):
+        self.image_dir = image_dir
+        self.image_url = image_url
+        self.max_bytes = max_bytes
+        self.max_html_bytes = max_html_bytes
+        self.max_image_bytes = max_image_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def render(self, text):
+        if not text: return ""
+        key = content_key(text)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        out = self.process(text)
+        with self._lock:
+            self.misses += 1
+            if key not in self._entries:
+                self._entries[key] = out
+                self._size += len(out)
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                _, old = self._entries.popitem(last=False)
+                self._size -= len(old)
+        return out
+
+    def invalidate(self, text):
+        with self._lock:
+            out = self._entries.pop(content_key(text), None)
+            if out is not None: self._size -= len(out)
+
+    def process(self, text):
+        parser = _Sanitizer(self._save_image, self.max_html_bytes)
+        parser.feed(text)
+        parser.close()
+        return parser.result()
+
+    def _save_image(self, kind, payload):
+        try:
+            data = base64.b64decode(payload, validate=False)
+        except (binascii.Error, ValueError):
+            return None
+        if not data or len(data) > self.max_image_bytes:
+            return None
+        ext = {"jpeg": "jpg"}.get(kind.lower(), kind.lower())
+        name = f"{hashlib.sha256(data).hexdigest()}.{ext}"
+        path = os.path.join(self.image_dir, name)
+        if not os.path.exists(path):
+            os.makedirs(self.image_dir, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return self.image_url + name
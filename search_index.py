@@ -0,0 +1,269 @@
+"""
+Full-text search over tickets, ticket discussions, announcements, tutorials
+and events.
+
+The index is an SQLite FTS5 table in its own file next to the database. It
+survives restarts and every process shares it. sync() runs once per loaded
+document and after every save_db. It fingerprints the indexed fields of each
+item, compares them with the fingerprints stored in the index and re-indexes
+only what differs, so a new ticket costs one row however long the history
+is. Quill HTML is indexed as plain text.
+
+Archived tickets stay in the index after they leave the database.
+Discussion threads are read from their files, starting at the byte offset
+indexed last time. search() ranks hits with BM25, where title words weigh
+more than body words, and returns highlighted snippets. The last word of a
+query also matches as a prefix, so results appear while typing.
+"""
+import contextlib
+import hashlib
+import html
+import json
+import os
+import re
+import sqlite3
+import threading
+
+import serializers
+from rich_text import plain_text
+from tickets import COLLECTIONS
+
+# collection -> (title field, other indexed fields)
+SOURCES = {
+    "mods": ("name", ("assignment", "description", "json_data")),
+    "projects": ("name", ("assigned", "description")),
+    "announcements": ("title", ("author", "date", "content")),
+    "tutorials": ("title", ("content",)),
+    "events": ("name", ("date", "loc", "desc")),
+}
+HTML_FIELDS = {"description", "content", "desc"}
+TITLE_WEIGHT = 10.0
+_WORD = re.compile(r"\w+")
+_OPEN, _CLOSE = "\x02", "\x03"  # highlight markers, swapped for <mark> after escaping
+
+
+def fingerprint(item, fields):
+    return hashlib.blake2b(serializers.encode([item.get(f) for f in fields]), digest_size=8).hexdigest()
+
+
+def match_expression(query):
+    """FTS5 query for what the user typed: every word must occur, the last one as a prefix."""
+    words = _WORD.findall(query.lower())
+    if not words: return ""
+    return " ".join(f'"{w}"' for w in words) + "*"
+
+
+def _marked(text):
+    return html.escape(text or "").replace(_OPEN, "<mark>").replace(_CLOSE, "</mark>")
+
+
+class SearchIndex:
+    def __init__(self, path):
+        self.path = path
+        self._synced = None
+        self._fps = {}        # id(item) -> (item, key, (collection, ref, fingerprint, item)) as of the last sync
+        self._stored = None   # key -> fingerprint of the item documents in the index, as of _stored_at
+        self._stored_at = None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        c = self._conn
+        # docs.rowid is the fts rowid. thread is set on discussion messages only.
+        c.execute("CREATE TABLE IF NOT EXISTS docs (rowid INTEGER PRIMARY KEY, key TEXT UNIQUE NOT NULL, "
+                  "collection TEXT NOT NULL, ref INTEGER, thread TEXT, label TEXT, fp TEXT)")
+        c.execute("CREATE INDEX IF NOT EXISTS docs_thread ON docs (thread)")
+        c.execute("CREATE VIRTUAL TABLE IF NOT EXISTS fts USING fts5("
+                  "title, body, collection UNINDEXED, tokenize='unicode61 remove_diacritics 2', prefix='2 3')")
+        c.execute("CREATE TABLE IF NOT EXISTS threads (name TEXT PRIMARY KEY, offset INTEGER NOT NULL)")
+        c.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value)")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM docs").fetchone()[0]
+
+    # --- UPDATES ---
+    def sync(self, data, archive=None):
+        """
+        Brings the index in line with `data`. Tickets missing from `data` are
+        kept while `archive` holds them. On first sight, archived tickets are
+        read from the archive and indexed. Returns the number of documents
+        written or removed.
+        """
+        version = data.get("_version")
+        key = (id(data), version)
+        if version is not None:
+            if key == self._synced: return 0
+            with self._lock:
+                if self._state("version") == version:  # another process already indexed this version
+                    self._synced = key
+                    return 0
+        # Items are hashed once per loaded document: after a save, only objects the sync has not seen yet
+        # (new tickets, posts) are. The app replaces indexed fields rather than editing them in place.
+        wanted, fps = {}, {}
+        for collection, (title, fields) in SOURCES.items():
+            fields = (title,) + fields
+            for item in data.get(collection, []):
+                seen = self._fps.get(id(item))
+                if seen is None or seen[0] is not item:
+                    fp = fingerprint(item, fields)
+                    ref = item.get('id') if collection in COLLECTIONS else None
+                    seen = (item, f"{collection}:{fp if ref is None else ref}", (collection, ref, fp, item))
+                fps[id(item)] = seen
+                wanted[seen[1]] = seen[2]
+        archived = {}
+        if archive is not None:
+            for collection in COLLECTIONS:
+                for rec in archive.summaries(collection):
+                    archived[f"{collection}:{rec['id']}"] = collection
+        with self._lock:
+            with self._write():
+                if self._stored is None or version is None or self._state("version") != self._stored_at:
+                    self._stored = dict(self._conn.execute("SELECT key, fp FROM docs WHERE thread IS NULL"))
+                stored = dict(self._stored)  # swapped in after the commit; a rollback leaves the old map
+                changed = [w for k, w in wanted.items() if stored.get(k) != w[2]]
+                gone = [k for k in stored if k not in wanted and k not in archived]
+                unseen = {c for k, c in archived.items() if k not in stored and k not in wanted}
+                for collection, ref, fp, item in changed:
+                    stored[self._put_item(collection, ref, fp, item)] = fp
+                written = len(changed)
+                for collection in unseen:
+                    fields = (SOURCES[collection][0],) + SOURCES[collection][1]
+                    for item in archive.tickets(collection):
+                        if f"{collection}:{item['id']}" not in stored:
+                            fp = fingerprint(item, fields)
+                            stored[self._put_item(collection, item['id'], fp, item)] = fp
+                            written += 1
+                for k in gone:
+                    self._delete(k)
+                    del stored[k]
+                self._conn.execute("INSERT OR REPLACE INTO state VALUES ('version', ?)", (version,))
+            self._stored, self._stored_at = stored, version
+            self._synced, self._fps = key, fps
+        return written + len(gone)
+
+    def sync_threads(self, path):
+        """Indexes discussion messages appended to the thread files in `path` since the last call."""
+        try:
+            entries = [e for e in os.scandir(path) if e.name.endswith(".jsonl")]
+        except FileNotFoundError:
+            return 0
+        with self._lock:
+            offsets = dict(self._conn.execute("SELECT name, offset FROM threads"))
+            stale = [e for e in entries if e.stat().st_size != offsets.get(e.name, 0)]
+            if not stale: return 0
+            with self._write():
+                return sum(self._index_thread(entry) for entry in stale)
+
+    def _index_thread(self, entry):
+        collection, _, ticket_id = entry.name[:-len(".jsonl")].rpartition("-")
+        if collection not in COLLECTIONS or not ticket_id.isdigit(): return 0
+        # Read the offset again under the write lock: another process may have indexed these lines meanwhile.
+        row = self._conn.execute("SELECT offset FROM threads WHERE name = ?", (entry.name,)).fetchone()
+        offset = row[0] if row else 0
+        size = entry.stat().st_size
+        if size < offset:  # the thread was re-created: index it from the start
+            for (k,) in self._conn.execute("SELECT key FROM docs WHERE thread = ?", (entry.name,)).fetchall():
+                self._delete(k)
+            offset = 0
+        with open(entry.path, 'rb') as f:
+            f.seek(offset)
+            chunk = f.read(size - offset)
+        chunk = chunk[:chunk.rfind(b"\n") + 1]  # leave a line still being written for next time
+        pos, added = offset, 0
+        for line in chunk.splitlines(keepends=True):
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                msg = None
+            if isinstance(msg, dict) and msg.get("text"):
+                self._put(f"{collection}:{ticket_id}@{pos}", collection, int(ticket_id), entry.name,
+                          msg.get("user"), None, "", msg["text"])
+                added += 1
+            pos += len(line)
+        self._conn.execute("INSERT OR REPLACE INTO threads VALUES (?, ?)", (entry.name, pos))
+        return added
+
+    def _put_item(self, collection, ref, fp, item):
+        title, fields = SOURCES[collection]
+        body = " ".join(plain_text(item.get(f)) if f in HTML_FIELDS else str(item.get(f) or "") for f in fields)
+        key = f"{collection}:{ref}" if ref is not None else f"{collection}:{fp}"
+        self._put(key, collection, ref, None, item.get(title), fp, item.get(title) or "", body)
+        return key
+
+    def _put(self, key, collection, ref, thread, label, fp, title, body):
+        c = self._conn
+        row = c.execute("SELECT rowid FROM docs WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            rowid = c.execute("INSERT INTO docs (key, collection, ref, thread, label, fp) VALUES (?, ?, ?, ?, ?, ?)",
+                              (key, collection, ref, thread, label, fp)).lastrowid
+        else:
+            rowid = row[0]
+            c.execute("DELETE FROM fts WHERE rowid = ?", (rowid,))
+            c.execute("UPDATE docs SET label = ?, fp = ? WHERE rowid = ?", (label, fp, rowid))
+        c.execute("INSERT INTO fts (rowid, title, body, collection) VALUES (?, ?, ?, ?)", (rowid, title, body, collection))
+
+    def _delete(self, key):
+        c = self._conn
+        row = c.execute("SELECT rowid FROM docs WHERE key = ?", (key,)).fetchone()
+        if row is None: return
+        c.execute("DELETE FROM fts WHERE rowid = ?", (row[0],))
+        c.execute("DELETE FROM docs WHERE rowid = ?", (row[0],))
+
+    def _state(self, key):
+        row = self._conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @contextlib.contextmanager
+    def _write(self):
+        """BEGIN IMMEDIATE takes SQLite's write lock, serializing writers across processes."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    # --- QUERIES ---
+    def search(self, query, limit=20, collections=None):
+        """
+        Returns (hits, total matches), best first. A hit is {"collection",
+        "ref" (ticket id, None for feed items), "message" (True for a
+        discussion message), "title", "snippet"}. "title" and "snippet" are
+        HTML with the matched words in <mark>. For messages, "title" is the
+        ticket's name and "author" (HTML too) who wrote it.
+        """
+        match = match_expression(query)
+        if not match: return [], 0
+        where, args = "fts MATCH ?", (match,)
+        if collections is not None:
+            where += f" AND collection IN ({','.join('?' * len(collections))})"
+            args += tuple(collections)
+        c = self._conn
+        with self._lock:
+            try:
+                total = c.execute(f"SELECT count(*) FROM fts WHERE {where}", args).fetchone()[0]
+                # Rank first, then highlight only the hits returned: snippet() on every match is what costs.
+                ranked = [r for (r,) in c.execute(
+                    f"SELECT rowid FROM fts WHERE {where} ORDER BY bm25(fts, {TITLE_WEIGHT}, 1.0) LIMIT ?", args + (limit,))]
+                rows = {r[0]: r[1:] for r in c.execute(
+                    f"SELECT fts.rowid, d.collection, d.ref, d.thread, d.label, t.label, "
+                    f"highlight(fts, 0, ?, ?), snippet(fts, 1, ?, ?, '…', 16) "
+                    f"FROM fts JOIN docs d ON d.rowid = fts.rowid "
+                    f"LEFT JOIN docs t ON d.thread IS NOT NULL AND t.key = d.collection || ':' || d.ref "
+                    f"WHERE fts MATCH ? AND fts.rowid IN ({','.join('?' * len(ranked))})",
+                    (_OPEN, _CLOSE, _OPEN, _CLOSE, match) + tuple(ranked))}
+            except sqlite3.OperationalError:
+                return [], 0  # e.g. a query FTS5 can't parse
+        hits = []
+        for collection, ref, thread, label, ticket, title, snippet in (rows[r] for r in ranked):
+            message = thread is not None
+            hits.append({
+                "collection": collection, "ref": ref, "message": message,
+                "title": html.escape(ticket or f"#{ref}") if message else _marked(title),
+                "author": html.escape(label or "") if message else None,
+                "snippet": _marked(snippet),
+            })
+        return hits, total
+
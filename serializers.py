@@ -0,0 +1,143 @@
+"""
+Snapshot encoding for the json and journal backends.
+
+The database used to be written with the stdlib encoder and indent=4. On a
+large file much of the size was whitespace, and encoding was the slowest part
+of a save. encode() / decode() now use orjson, or msgspec, when installed
+(stdlib json otherwise) and produce compact JSON. pack() can also compress a
+snapshot (gzip; zstd with the zstandard package). unpack() recognises every
+format from its first bytes, so changing DB_FORMAT needs no migration: the
+next save writes the new format.
+
+    python serializers.py info portal_data.json
+    python serializers.py convert portal_data.json --format gzip
+    python serializers.py convert portal_data.json --format pretty --out readable.json
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import zlib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+FORMATS = ("json", "pretty", "gzip", "zstd")
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+if orjson is not None:
+    ENGINE = "orjson"
+    encode = lambda obj: orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    decode = orjson.loads
+elif msgspec is not None:
+    ENGINE = "msgspec"
+    encode = msgspec.json.Encoder().encode
+    decode = msgspec.json.decode
+else:
+    ENGINE = "json"
+    encode = lambda obj: json.dumps(obj, separators=(",", ":")).encode()
+    decode = json.loads
+
+# What decode() raises on bad input (orjson's error is a json.JSONDecodeError already).
+DECODE_ERRORS = (ValueError, msgspec.DecodeError) if msgspec is not None else (ValueError,)
+
+
+def check(fmt):
+    """Raises ValueError if `fmt` is unknown or needs a package that is not installed."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown DB_FORMAT {fmt!r}; use one of {', '.join(FORMATS)}.")
+    if fmt == "zstd" and zstandard is None:
+        raise ValueError("DB_FORMAT 'zstd' needs the zstandard package (pip install zstandard).")
+
+
+def pack(data, fmt="json"):
+    """(file bytes, uncompressed JSON bytes) for `data` written as `fmt`."""
+    body = json.dumps(data, indent=4).encode() if fmt == "pretty" else encode(data)
+    if fmt == "gzip":
+        # Level 1: about half the time of level 5 for a ~20% larger file; the json backend pays it on every save.
+        return gzip.compress(body, compresslevel=1, mtime=0), body
+    if fmt == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(body), body
+    return body, body
+
+
+def detect(raw):
+    """The format that wrote `raw` ("pretty" and "json" only differ in whitespace)."""
+    if raw[:2] == GZIP_MAGIC: return "gzip"
+    if raw[:4] == ZSTD_MAGIC: return "zstd"
+    return "pretty" if b"\n" in raw[:256] else "json"
+
+
+def unpack(raw):
+    """
+    The document in `raw`, whichever format wrote it. Unreadable input raises
+    json.JSONDecodeError, like json.loads always did for the app.
+    """
+    try:
+        fmt = detect(raw)
+        if fmt == "gzip":
+            raw = gzip.decompress(raw)
+        elif fmt == "zstd":
+            if zstandard is None:
+                raise ValueError("snapshot is zstd-compressed; install the zstandard package to read it")
+            raw = zstandard.ZstdDecompressor().decompress(raw)
+        return decode(raw)
+    except json.JSONDecodeError:
+        raise
+    except DECODE_ERRORS + (OSError, EOFError, zlib.error) as e:
+        raise json.JSONDecodeError(f"unreadable snapshot ({e})", "", 0) from e
+
+
+# --- CLI ---
+def convert(src, fmt, out=None):
+    """Rewrites the snapshot at `src` (or a copy at `out`) as `fmt`. Returns (old size, new size)."""
+    import storage
+    check(fmt)
+    with storage.file_lock(src + ".lock"):
+        with open(src, 'rb') as f:
+            raw = f.read()
+        payload, _ = pack(unpack(raw), fmt)
+        storage.atomic_write(out or src, payload)
+    return len(raw), len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or convert portal database snapshots.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    i = sub.add_parser("info", help="show a snapshot's format and size")
+    i.add_argument("path")
+    c = sub.add_parser("convert", help="rewrite a snapshot in another format")
+    c.add_argument("path")
+    c.add_argument("--format", required=True, choices=FORMATS)
+    c.add_argument("--out", help="write here instead of replacing PATH")
+    args = parser.parse_args()
+    if args.command == "info":
+        with open(args.path, 'rb') as f:
+            raw = f.read()
+        data = unpack(raw)
+        print(f"{args.path}: {detect(raw)}, {len(raw):,} bytes, {len(data.get('mods', []))} mods "
+              f"(encoder here: {ENGINE}, zstd {'available' if zstandard else 'not installed'})")
+        return
+    try:
+        before, after = convert(args.path, args.format, args.out)
+    except ValueError as e:
+        sys.exit(str(e))
+    print(f"{args.out or args.path}: {args.format}, {before:,} -> {after:,} bytes")
+    if os.path.exists(args.path + ".journal") and not args.out:
+        print("The journal next to it is unchanged; it is replayed on top as before.")
+
+
+if __name__ == "__main__":
+    main()
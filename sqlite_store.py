@@ -0,0 +1,202 @@
+"""
+SQLite backend for the portal database (DB_BACKEND = "sqlite").
+
+Each collection gets its own table in WAL mode. The pages receive the whole
+document from load() and query it through the in-memory indexes every backend
+shares (tickets.TicketIndex, library_search.LibraryIndex); save() diffs
+against the last persisted state and turns the changes into single-row
+upserts/deletes.
+
+One-shot conversion:
+    python sqlite_store.py migrate portal_data.json portal_data.sqlite
+    python sqlite_store.py export portal_data.sqlite portal_data.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import sqlite3
+
+import serializers
+from storage import _clone, _DocumentStore, _fork, apply_ops
+
+# List collections: one row per item, keyed by position. A few fields are also
+# copied into columns, for ad-hoc queries with the sqlite3 shell.
+LIST_TABLES = ("mods", "projects", "events", "tutorials", "announcements", "mod_library", "server_configs")
+# Dict collections: one row per key.
+DICT_TABLES = ("role_db", "usernames", "passwords", "mod_pool")
+# PRAGMA user_version once reset() has written a document; 0 means a new, empty file.
+SCHEMA_VERSION = 1
+
+
+def _row(pos, item):
+    get = item.get if isinstance(item, dict) else (lambda k: None)
+    complete, read = get("complete"), get("read")
+    return (
+        pos, get("id"), get("name"),
+        None if complete is None else int(bool(complete)),
+        None if read is None else int(bool(read)),
+        get("modId"), json.dumps(item),
+    )
+
+
+class SqliteStore(_DocumentStore):
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self._synced = None
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        c = self._conn
+        for t in LIST_TABLES:
+            c.execute(f"CREATE TABLE IF NOT EXISTS {t} (pos INTEGER PRIMARY KEY, id INTEGER, name TEXT, "
+                      f"complete INTEGER, read INTEGER, mod_id TEXT, data TEXT NOT NULL)")
+        for t in DICT_TABLES:
+            c.execute(f"CREATE TABLE IF NOT EXISTS {t} (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        # Anything else at the top level of the document is stored whole.
+        c.execute("CREATE TABLE IF NOT EXISTS extras (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    # --- STORE API ---
+    def exists(self):
+        """True once a document was written, even if every table is empty now."""
+        with self._lock:
+            return self._conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION
+
+    def stamp(self):
+        """data_version moves when another connection (another process) commits."""
+        with self._lock:
+            return self._data_version()
+
+    def reset(self, data):
+        with self._lock:
+            with self._exclusive():
+                for t in LIST_TABLES + DICT_TABLES + ("extras",):
+                    self._conn.execute(f"DELETE FROM {t}")
+                for key, value in data.items():
+                    self._write_key(key, value)
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._sync(_clone(data))
+
+    # --- INTERNALS ---
+    @contextlib.contextmanager
+    def _exclusive(self):
+        """BEGIN IMMEDIATE takes SQLite's write lock, serializing writers across processes."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _read(self):
+        self._synced = self._data_version()
+        data = {}
+        c = self._conn
+        size = 0
+        for t in LIST_TABLES:
+            rows = c.execute(f"SELECT data FROM {t} ORDER BY pos").fetchall()
+            size += sum(len(r[0]) for r in rows)
+            data[t] = [json.loads(r[0]) for r in rows]
+        for t in DICT_TABLES:
+            rows = c.execute(f"SELECT key, value FROM {t}").fetchall()
+            size += sum(len(v) for k, v in rows)
+            data[t] = {k: json.loads(v) for k, v in rows}
+        for k, v in c.execute("SELECT key, value FROM extras"):
+            size += len(v)
+            data[k] = json.loads(v)
+        self.bytes_read += size
+        return data
+
+    def _data_version(self):
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _fetch_theirs(self):
+        return self._read() if self._data_version() != self._synced else None
+
+    def _write(self, prev, target, ops):
+        shadow = apply_ops(_fork(prev, ops), ops, copy=True)
+        for op in ops:
+            self._write_op(op, shadow)
+        return shadow
+
+    def _write_key(self, key, value):
+        c = self._conn
+        if key in LIST_TABLES and isinstance(value, list):
+            rows = [_row(i, item) for i, item in enumerate(value)]
+            c.execute(f"DELETE FROM {key}")
+            c.executemany(f"INSERT INTO {key} VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self.bytes_written += sum(len(r[-1]) for r in rows)
+        elif key in DICT_TABLES and isinstance(value, dict):
+            rows = [(k, json.dumps(v)) for k, v in value.items()]
+            c.execute(f"DELETE FROM {key}")
+            c.executemany(f"INSERT INTO {key} VALUES (?, ?)", rows)
+            self.bytes_written += sum(len(r[-1]) for r in rows)
+        else:
+            text = json.dumps(value)
+            c.execute("INSERT OR REPLACE INTO extras VALUES (?, ?)", (key, text))
+            self.bytes_written += len(text)
+
+    def _write_op(self, op, shadow):
+        kind, key = op[0], op[1]
+        c = self._conn
+        if kind == "set":
+            self._write_key(key, op[2])
+        elif kind == "del":
+            if key in LIST_TABLES or key in DICT_TABLES: c.execute(f"DELETE FROM {key}")
+            else: c.execute("DELETE FROM extras WHERE key = ?", (key,))
+        elif key in LIST_TABLES and kind == "put":
+            row = _row(op[2], op[3])
+            c.execute(f"INSERT OR REPLACE INTO {key} VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+            self.bytes_written += len(row[-1])
+        elif key in LIST_TABLES and kind == "trunc":
+            c.execute(f"DELETE FROM {key} WHERE pos >= ?", (op[2],))
+        elif key in DICT_TABLES and kind == "put":
+            text = json.dumps(op[3])
+            c.execute(f"INSERT OR REPLACE INTO {key} VALUES (?, ?)", (op[2], text))
+            self.bytes_written += len(text)
+        elif key in DICT_TABLES and kind == "pop":
+            c.execute(f"DELETE FROM {key} WHERE key = ?", (op[2],))
+        else:
+            # Partial change to an extras key: the shadow already holds the result.
+            self._write_key(key, shadow[key])
+
+
+# --- MIGRATION ---
+def migrate_json(json_path, sqlite_path):
+    """Loads an existing portal_data.json into a (new or emptied) SQLite file."""
+    with open(json_path, 'rb') as f:
+        data = serializers.unpack(f.read())  # any DB_FORMAT the json backend wrote
+    SqliteStore(sqlite_path).reset(data)
+    return data
+
+
+def export_json(sqlite_path, json_path):
+    """Writes the SQLite contents back out as a portal_data.json document."""
+    if not os.path.exists(sqlite_path):
+        raise FileNotFoundError(sqlite_path)
+    data = SqliteStore(sqlite_path).load()
+    with open(json_path, 'w') as f:
+        json.dump(data, f, indent=4)
+    return data
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert the portal database between JSON and SQLite.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    m = sub.add_parser("migrate", help="portal_data.json -> SQLite")
+    m.add_argument("json_path")
+    m.add_argument("sqlite_path")
+    e = sub.add_parser("export", help="SQLite -> portal_data.json")
+    e.add_argument("sqlite_path")
+    e.add_argument("json_path")
+    args = parser.parse_args()
+    if args.command == "migrate":
+        data = migrate_json(args.json_path, args.sqlite_path)
+    else:
+        data = export_json(args.sqlite_path, args.json_path)
+    print(f"{args.command}: {sum(len(v) for v in data.values() if isinstance(v, (list, dict)))} records")
@@ -0,0 +1,527 @@
+"""
+Storage engines for the portal database.
+
+The pages only ever see a plain dict (load_db) and hand it back whole
+(save_db). The engines here decide how that dict reaches disk.
+
+Several app processes may share one data directory. Every save takes an
+advisory lock, checks whether another process wrote since we last synced
+(the `_version` counter in the document) and, if so, merges our change into
+the fresh copy instead of overwriting it.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+
+import serializers
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _clone(obj):
+    """Cheap deep copy for JSON-shaped data."""
+    return serializers.decode(serializers.encode(obj))
+
+
+class StaleDocument(Exception):
+    """save() got a dict loaded from a version the store no longer remembers; reload and redo the edit."""
+
+
+def atomic_write(path, text):
+    """Writes `text` (str or bytes) via a temp file + rename so readers never see a half-written file."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb' if isinstance(text, bytes) else 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    """Exclusive advisory lock on `path`, held across processes."""
+    with open(path, 'a+') as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+# --- DELTAS ---
+# An op is a small JSON list describing one change to the top-level document:
+#   ["set", key, value]        replace a whole top-level key
+#   ["del", key]               remove a top-level key
+#   ["put", key, sub, value]   set a dict entry / list index (index == len appends)
+#   ["pop", key, sub]          remove a dict entry
+#   ["trunc", key, n]          shrink a list to n items
+
+def diff_db(old, new):
+    """Returns the ops that turn `old` into `new`."""
+    ops = []
+    for key, n in new.items():
+        if key not in old:
+            ops.append(["set", key, n])
+            continue
+        o = old[key]
+        if o == n:
+            continue
+        if isinstance(o, list) and isinstance(n, list):
+            common = min(len(o), len(n))
+            changed = [i for i in range(common) if o[i] != n[i]]
+            # Inserts at the front (announcements) shift every index; rewrite the key instead.
+            if len(changed) > max(8, common // 2):
+                ops.append(["set", key, n])
+                continue
+            for i in changed:
+                ops.append(["put", key, i, n[i]])
+            for i in range(common, len(n)):
+                ops.append(["put", key, i, n[i]])
+            if len(n) < len(o):
+                ops.append(["trunc", key, len(n)])
+        elif isinstance(o, dict) and isinstance(n, dict):
+            for sub, v in n.items():
+                if sub not in o or o[sub] != v:
+                    ops.append(["put", key, sub, v])
+            for sub in o:
+                if sub not in n:
+                    ops.append(["pop", key, sub])
+        else:
+            ops.append(["set", key, n])
+    for key in old:
+        if key not in new:
+            ops.append(["del", key])
+    return ops
+
+
+def apply_ops(data, ops, copy=False):
+    """Applies ops to `data` in place. With copy=True values are cloned first."""
+    for op in ops:
+        kind, key = op[0], op[1]
+        if kind == "set":
+            data[key] = _clone(op[2]) if copy else op[2]
+        elif kind == "del":
+            data.pop(key, None)
+        elif kind == "put":
+            sub, value = op[2], _clone(op[3]) if copy else op[3]
+            target = data.setdefault(key, [] if isinstance(sub, int) else {})
+            if isinstance(target, list):
+                if sub < len(target): target[sub] = value
+                else: target.append(value)
+            else:
+                target[sub] = value
+        elif kind == "pop":
+            data.get(key, {}).pop(op[2], None)
+        elif kind == "trunc":
+            del data.get(key, [])[op[2]:]
+    return data
+
+
+def _fork(doc, ops):
+    """A copy of `doc` that apply_ops(..., copy=True) can change without touching `doc`: only the keys `ops` touch are copied."""
+    forked = dict(doc)
+    for key in {op[1] for op in ops}:
+        if isinstance(forked.get(key), (list, dict)): forked[key] = forked[key].copy()
+    return forked
+
+
+# --- MERGE ---
+def _item_key(item):
+    if isinstance(item, dict):
+        for field in ("id", "modId"):
+            if field in item: return (field, item[field])
+    return json.dumps(item, sort_keys=True)
+
+
+def _merge_list(base, ours, theirs):
+    base_map = {_item_key(x): x for x in base}
+    ours_map = {_item_key(x): x for x in ours}
+    theirs_map = {_item_key(x): x for x in theirs}
+    removed = base_map.keys() - ours_map.keys()
+    merged = []
+    for x in theirs:
+        k = _item_key(x)
+        if k in removed: continue
+        if k in base_map and ours_map.get(k, x) != base_map[k]:
+            x = ours_map[k]  # we edited it
+        merged.append(x)
+    # Our new items go where we put them: before the old ones (newest-first lists) or after.
+    added_front, added_back, seen_base = [], [], False
+    for x in ours:
+        k = _item_key(x)
+        if k in base_map: seen_base = True
+        elif theirs_map.get(k) == x: continue  # saved already
+        elif seen_base: added_back.append(x)
+        else: added_front.append(x)
+    if not base:
+        added_front, added_back = [], added_front
+    return added_front + merged + added_back
+
+
+def merge_db(base, ours, theirs):
+    """
+    Three-way merge: `ours` and `theirs` both started from `base`.
+    Keys only one side touched take that side; lists and dicts both sides
+    touched are merged per item; anything else prefers ours.
+    """
+    merged = {}
+    keys = list(theirs) + [k for k in ours if k not in theirs]
+    for key in keys:
+        b, o, t = base.get(key), ours.get(key), theirs.get(key)
+        if o == b:
+            if key in theirs: merged[key] = t
+        elif t == b:
+            if key in ours: merged[key] = o
+        elif isinstance(o, list) and isinstance(t, list):
+            merged[key] = _merge_list(b if isinstance(b, list) else [], o, t)
+        elif isinstance(o, dict) and isinstance(t, dict):
+            b = b if isinstance(b, dict) else {}
+            d = dict(t)
+            for sub in set(b) | set(o):
+                if o.get(sub) != b.get(sub):
+                    if sub in o: d[sub] = o[sub]
+                    else: d.pop(sub, None)
+            merged[key] = d
+        elif key in ours:
+            merged[key] = o
+    return merged
+
+
+# --- SHARED SAVE PROTOCOL ---
+class _DocumentStore:
+    """
+    Engines implement _exclusive (cross-process lock), _read (full document),
+    _fetch_theirs (fresh document if someone else wrote since our last sync,
+    else None) and _write (persist `target`, return the new shadow copy
+    without changing `prev`). They add what they move to bytes_read /
+    bytes_written (running totals). save() leaves the top-level keys it wrote
+    in last_changed.
+
+    The shadow is the last state synced with disk. The last KEEP_BASES
+    versions seen are kept too: a dict handed to save() is merged against the
+    version it was loaded from (its `_version`), not against the shadow.
+    """
+    KEEP_BASES = 4
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._shadow = None
+        self._bases = {}
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.last_changed = set()
+
+    def _sync(self, doc):
+        """Makes `doc` (never changed afterwards) the shadow and a merge base."""
+        self._shadow = doc
+        self._bases.pop(doc.get("_version", 0), None)
+        self._bases[doc.get("_version", 0)] = doc
+        while len(self._bases) > self.KEEP_BASES:
+            del self._bases[next(iter(self._bases))]
+
+    def load(self):
+        with self._lock, self._exclusive():
+            data = self._read()
+            self._sync(_clone(data))
+        return data
+
+    def save(self, data, prepare=None):
+        """
+        Persists `data`. Returns None normally, or the merged document when
+        `data` was loaded from an older version than the one on disk (another
+        writer got in first; `data` is then stale). Raises StaleDocument if
+        that version is too old to merge against.
+        prepare(target, data), if given, runs under the cross-process lock on
+        the document about to be written (`data`, or the merged one) and may
+        change it: the place for edits that must see every other writer's.
+        """
+        with self._lock, self._exclusive():
+            if self._shadow is None:
+                self._sync(self._read())
+            theirs = self._fetch_theirs()
+            if theirs is not None: self._sync(theirs)
+            prev, version, merged = self._shadow, data.get("_version", 0), None
+            if version != prev.get("_version", 0):
+                base = self._bases.get(version)
+                if base is None:
+                    raise StaleDocument(f"version {version} is too old to merge into {prev.get('_version', 0)}")
+                # Cloned: the caller keeps mutating what we return.
+                merged = _clone(merge_db(base, data, prev))
+            target = data if merged is None else merged
+            if prepare is not None: prepare(target, data)
+            ops = diff_db(prev, target)
+            self.last_changed = {op[1] for op in ops}
+            if not ops:
+                return merged
+            target["_version"] = prev.get("_version", 0) + 1
+            ops.append(["set", "_version", target["_version"]])
+            self._sync(self._write(prev, target, ops))
+            return merged
+
+
+# --- PLAIN JSON ---
+class JsonStore(_DocumentStore):
+    """One JSON file (compact by default, see serializers), atomically replaced on every save."""
+
+    def __init__(self, path, fmt="json"):
+        super().__init__()
+        serializers.check(fmt)
+        self.path = path
+        self.format = fmt
+        self._synced = None
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def stamp(self):
+        """Changes whenever the file on disk changes."""
+        return _file_stamp(self.path)
+
+    def reset(self, data):
+        with self._lock, self._exclusive():
+            payload, _ = serializers.pack(data, self.format)
+            atomic_write(self.path, payload)
+            self.bytes_written += len(payload)
+            self._synced = self.stamp()
+            self._sync(_clone(data))
+
+    def _exclusive(self):
+        return file_lock(self.path + ".lock")
+
+    def _read(self):
+        self._synced = self.stamp()
+        with open(self.path, 'rb') as f:
+            raw = f.read()
+        self.bytes_read += len(raw)
+        return serializers.unpack(raw)
+
+    def _fetch_theirs(self):
+        return self._read() if self.stamp() != self._synced else None
+
+    def _write(self, prev, target, ops):
+        payload, body = serializers.pack(target, self.format)
+        atomic_write(self.path, payload)
+        self.bytes_written += len(payload)
+        self._synced = self.stamp()
+        return serializers.decode(body)
+
+
+# --- JOURNAL ---
+class JournalStore(_DocumentStore):
+    """
+    Snapshot + append-only delta log.
+
+    save() diffs the document against the last persisted state and appends one
+    line of ops to `<path>.journal`. load() replays the journal over the
+    snapshot. Once the journal passes `compact_bytes` a background thread folds
+    it into a fresh snapshot.
+    """
+
+    def __init__(self, path, compact_bytes=1_000_000, fmt="json"):
+        super().__init__()
+        serializers.check(fmt)
+        self.path = path
+        self.format = fmt
+        self.journal_path = path + ".journal"
+        self.compact_bytes = compact_bytes
+        self._compacting = False
+        self._snap_stamp = None
+        self._offset = 0
+
+    def exists(self):
+        return os.path.exists(self.path) or os.path.exists(self.journal_path)
+
+    def stamp(self):
+        return (_file_stamp(self.path), _file_stamp(self.journal_path))
+
+    def reset(self, data):
+        with self._lock, self._exclusive():
+            self._write_snapshot(data)
+            self._sync(_clone(data))
+
+    def save(self, data, prepare=None):
+        merged = super().save(data, prepare)
+        if self._offset > self.compact_bytes:
+            self._schedule_compaction()
+        return merged
+
+    def _exclusive(self):
+        return file_lock(self.path + ".lock")
+
+    def _replay(self, data, offset):
+        """
+        Applies journal records from `offset`; returns the offset after the last
+        complete one. Called under the store lock, so a torn tail (a crash
+        mid-append) is cut off here: the next record is appended after the
+        good ones instead of after the garbage.
+        """
+        if not os.path.exists(self.journal_path):
+            return 0
+        start = offset
+        with open(self.journal_path, 'r+b') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = serializers.decode(line)
+                except serializers.DECODE_ERRORS:
+                    break
+                apply_ops(data, record["ops"])
+                offset += len(line)
+            if f.seek(0, os.SEEK_END) > offset:
+                f.truncate(offset)
+        self.bytes_read += offset - start
+        return offset
+
+    def _read(self):
+        data = {}
+        self._snap_stamp = _file_stamp(self.path)
+        if self._snap_stamp:
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+            self.bytes_read += len(raw)
+            data = serializers.unpack(raw)
+        self._offset = self._replay(data, 0)
+        return data
+
+    def _fetch_theirs(self):
+        size = (_file_stamp(self.journal_path) or (0, 0, 0))[2]
+        if _file_stamp(self.path) != self._snap_stamp or size < self._offset:
+            return self._read()  # another process compacted
+        if size == self._offset:
+            return None
+        theirs = _clone(self._shadow)
+        self._offset = self._replay(theirs, self._offset)
+        return theirs
+
+    def _write(self, prev, target, ops):
+        line = serializers.encode({"v": target["_version"], "ops": ops}) + b"\n"
+        with open(self.journal_path, 'ab') as f:
+            f.write(line)
+            self._offset = f.tell()
+        self.bytes_written += len(line)
+        return apply_ops(_fork(prev, ops), ops, copy=True)
+
+    def _write_snapshot(self, data):
+        payload, _ = serializers.pack(data, self.format)
+        atomic_write(self.path, payload)
+        self.bytes_written += len(payload)
+        open(self.journal_path, 'w').close()
+        self._snap_stamp = _file_stamp(self.path)
+        self._offset = 0
+
+    def _schedule_compaction(self):
+        with self._lock:
+            if self._compacting: return
+            self._compacting = True
+        threading.Thread(target=self.compact, daemon=True).start()
+
+    def compact(self):
+        """Writes the current state as the new snapshot and empties the journal."""
+        try:
+            with self._lock, self._exclusive():
+                if self._shadow is None:
+                    self._sync(self._read())
+                theirs = self._fetch_theirs()
+                if theirs is not None: self._sync(theirs)
+                self._write_snapshot(self._shadow)
+        finally:
+            self._compacting = False
+
+
+def open_store(backend, path, compact_bytes=1_000_000, fmt="json"):
+    """Picks the engine named by the DB_BACKEND setting; `fmt` (DB_FORMAT) applies to json and journal."""
+    if backend == "json":
+        return JsonStore(path, fmt=fmt)
+    if backend == "journal":
+        return JournalStore(path, compact_bytes=compact_bytes, fmt=fmt)
+    if backend == "sqlite":
+        from sqlite_store import SqliteStore
+        return SqliteStore(os.path.splitext(path)[0] + ".sqlite")
+    raise ValueError(f"Unknown DB_BACKEND '{backend}' (expected 'json', 'journal' or 'sqlite')")
+
+
+# --- SHARED IN-PROCESS COPY ---
+class SharedDB:
+    """
+    One parsed copy of the database per process, shared by every session.
+
+    get() only re-runs `loader` when the store's stamp has moved since the last
+    load or save, so a rerun normally costs one stat() instead of a full parse.
+
+    Sessions share the returned dict, so an edit must hold `lock` from its
+    first change until save() returns; that keeps a save from walking the dict
+    while another session changes it. Readers don't take the lock and may see
+    another session's edit half done. A reload or a merged save swaps in a new
+    dict; a rerun that still holds the old one can edit and save it, and the
+    store merges that change like any other writer's.
+
+    With a `feed` (changes.ChangeFeed), the top-level keys each save or reload
+    changed are published to it. `prepare` is passed to every store.save().
+    """
+
+    def __init__(self, store, loader, feed=None, prepare=None):
+        self.store = store
+        self.loader = loader
+        self.feed = feed
+        self.prepare = prepare
+        self.data = None
+        self._stamp = None
+        self.lock = threading.RLock()
+
+    def get(self, loader=None):
+        """The current document; a reload calls `loader` instead of the default one when given."""
+        with self.lock:
+            stamp = self.store.stamp()
+            if self.data is None or stamp != self._stamp:
+                old, self.data = self.data, (loader or self.loader)()
+                self._stamp = self.store.stamp()
+                if self.feed is not None and old is not None:
+                    self._publish(k for k in old.keys() | self.data.keys() if old.get(k) != self.data.get(k))
+            return self.data
+
+    def _publish(self, keys):
+        keys = set(keys) - {"_version"}
+        if keys: self.feed.publish(keys)
+
+    def save(self, data):
+        """Saves an edited document; hold `lock` around the edit and this call."""
+        with self.lock:
+            merged = self.store.save(data, self.prepare)
+            changed = set(self.store.last_changed)
+            if merged is not None:
+                # Another writer got in first: the merged document is the current one.
+                old, self.data = self.data, merged
+                if old is not None: changed |= {k for k in old.keys() | merged.keys() if old.get(k) != merged.get(k)}
+                self._stamp = self.store.stamp()
+            elif data is self.data:
+                self._stamp = self.store.stamp()
+            if self.feed is not None: self._publish(changed)
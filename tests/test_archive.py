@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+import archive
+import storage
+import tickets
+
+NOW = datetime(2026, 6, 1, 12, 0)
+
+
+def stamp(days_ago):
+    return (NOW - timedelta(days=days_ago)).isoformat(timespec="seconds")
+
+
+def ticket(i, days_ago=None):
+    done = days_ago is not None
+    return {"id": i, "name": f"t{i}", "complete": done, "read": True, **({"completed_at": stamp(days_ago)} if done else {})}
+
+
+def test_sweep_moves_only_old_completed_tickets(tmp_path):
+    arch = archive.Archive(str(tmp_path / "archive"))
+    data = {"mods": [ticket(0, 40), ticket(1, 5), ticket(2)], "projects": [ticket(0, 31)]}
+    assert archive.due(data, 30, now=NOW) == 2
+    assert archive.sweep(data, arch, 30, now=NOW) == 2
+    assert [t["id"] for t in data["mods"]] == [1, 2] and data["projects"] == []
+    assert arch.get("mods", 0)["name"] == "t0" and len(arch) == 2
+    assert archive.sweep(data, arch, 30, now=NOW) == 0
+
+
+def test_a_long_running_process_archives_on_save(tmp_path):
+    arch = archive.Archive(str(tmp_path / "archive"))
+    clock = [NOW]
+    store = storage.JsonStore(str(tmp_path / "portal_data.json"))
+    store.reset({"mods": [ticket(0, 1), ticket(1)], "projects": []})
+    db = storage.SharedDB(store, store.load, prepare=lambda target, ours: archive.sweep(target, arch, 30, now=clock[0]))
+    data = db.get()
+    indexes = tickets.IndexCache()
+    assert indexes.get(data).stats["mods"].complete == 1
+
+    clock[0] += timedelta(days=45)  # no restart, no reload: only saves
+    with db.lock:
+        data["mods"][1]["read"] = False
+        db.save(data)
+    assert [t["id"] for t in db.get()["mods"]] == [1]
+    assert [t["id"] for t in storage.JsonStore(store.path).load()["mods"]] == [1]
+    assert arch.get("mods", 0) is not None
+    assert indexes.get(db.get()).stats["mods"].complete == 0  # rebuilt: the list was swapped
@@ -0,0 +1,46 @@
+from discussions import Discussions
+
+
+def msg(i):
+    return {"user": "u", "text": f"m{i}", "time": f"2026-01-01 00:00:{i:02}"}
+
+
+def texts(threads, ticket_id=1):
+    return [m["text"] for m in threads.tail("mods", ticket_id, 100)[0]]
+
+
+def test_tail_pages_backwards_and_since_reads_forward(tmp_path):
+    threads = Discussions(str(tmp_path))
+    for i in range(25): threads.post("mods", 1, msg(i))
+    page, start = threads.tail("mods", 1, 10)
+    assert [m["text"] for m in page] == [f"m{i}" for i in range(15, 25)]
+    older, start = threads.tail("mods", 1, 10, before=start)
+    assert older[0]["text"] == "m5"
+    end = threads.size("mods", 1)
+    threads.post("mods", 1, msg(25))
+    assert threads.since("mods", 1, end)[0] == [msg(25)]
+
+
+def test_import_moves_inline_messages(tmp_path):
+    threads = Discussions(str(tmp_path))
+    ticket = {"id": 1, "discussion": [msg(0), msg(1)]}
+    threads.import_inline("mods", ticket)
+    assert "discussion" not in ticket
+    assert texts(threads) == ["m0", "m1"]
+
+
+def test_import_into_an_existing_thread_keeps_every_message(tmp_path):
+    threads = Discussions(str(tmp_path))
+    threads.post("mods", 1, msg(5))  # posted after an earlier partial import, say
+    offset = threads.size("mods", 1)
+    threads.import_inline("mods", {"id": 1, "discussion": [msg(0), msg(1)]})
+    assert texts(threads) == ["m5", "m0", "m1"]
+    assert threads.since("mods", 1, offset)[0] == [msg(0), msg(1)]  # open pages keep their offsets
+
+
+def test_a_second_replica_importing_the_same_ticket_adds_nothing(tmp_path):
+    threads = Discussions(str(tmp_path))
+    threads.import_inline("mods", {"id": 1, "discussion": [msg(0), msg(0), msg(1)]})
+    threads.post("mods", 1, msg(2))
+    threads.import_inline("mods", {"id": 1, "discussion": [msg(0), msg(0), msg(1)]})
+    assert texts(threads) == ["m0", "m0", "m1", "m2"]
@@ -0,0 +1,41 @@
+import json
+
+from editor_model import EditorModel, _array_span
+
+CONFIG = '''{
+    "bindAddress": "",
+    "game": {
+        "name": "Server [EU]",
+        "mods": [
+            {"modId": "A", "name": "has ] and \\"quotes\\"", "version": ""},
+            {"modId": "B", "name": "b", "tags": [["x"]]}
+        ],
+        "gameProperties": {"mods": []}
+    }
+}'''
+
+
+def test_array_span_finds_the_mods_array_only():
+    start, end = _array_span(CONFIG, ("game", "mods"))
+    assert [m["modId"] for m in json.loads(CONFIG[start:end])] == ["A", "B"]
+    assert _array_span(CONFIG, ("mods",)) is None
+
+
+def test_adding_keeps_the_rest_of_the_document_byte_for_byte():
+    model = EditorModel.from_text(CONFIG)
+    assert model.add({"modId": "C", "name": "c", "version": ""})
+    assert not model.add({"modId": "A", "name": "again", "version": ""})
+    text = model.text
+    assert text.startswith(CONFIG[:CONFIG.index('"mods": [') + len('"mods": ')])
+    assert text.endswith(CONFIG[CONFIG.index('\n        "gameProperties"') - 1:])
+    assert [m["modId"] for m in json.loads(text)["game"]["mods"]] == ["A", "B", "C"]
+
+
+def test_duplicates_already_in_the_text_are_kept():
+    model = EditorModel.from_text('[{"modId": "A"}, {"modId": "A"}]')
+    assert len(model) == 2 and "A" in model
+    assert model.remove("A") and len(model) == 0
+
+
+def test_invalid_text_is_not_a_model():
+    assert EditorModel.from_text('[{"modId": ') is None
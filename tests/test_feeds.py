@@ -0,0 +1,24 @@
+from feeds import page_count, page_of
+
+ITEMS = [{"n": i, "sev": i % 3} for i in range(45)]
+
+
+def test_list_order_pages():
+    assert [x["n"] for x in page_of(ITEMS, page=2, size=20)] == list(range(40, 45))
+    assert [x["n"] for x in page_of(ITEMS, reverse=True, size=5)] == [44, 43, 42, 41, 40]
+    assert [x["n"] for x in page_of(ITEMS, reverse=True, page=8, size=5)] == [4, 3, 2, 1, 0]
+    assert page_of(ITEMS, page=3, size=20) == []
+    assert page_count(45, 20) == 3
+
+
+def test_keyed_pages_keep_ties_in_list_order():
+    by_sev = page_of(ITEMS, key=lambda x: x["sev"], size=4)
+    assert [x["n"] for x in by_sev] == [0, 3, 6, 9]
+    newest_worst = page_of(ITEMS, key=lambda x: x["sev"], reverse=True, size=4)
+    assert [x["n"] for x in newest_worst] == [44, 41, 38, 35]
+
+
+def test_pages_cover_the_sorted_list():
+    key = lambda x: (x["sev"], -x["n"])
+    pages = [x for p in range(page_count(len(ITEMS), 7)) for x in page_of(ITEMS, key=key, page=p, size=7)]
+    assert pages == sorted(ITEMS, key=key)
@@ -0,0 +1,48 @@
+import storage
+
+
+def make_store(tmp_path):
+    store = storage.JournalStore(str(tmp_path / "portal_data.json"))
+    store.reset({"mods": [], "role_db": {"a@x": "staff"}})
+    return store
+
+
+def test_replays_saves_over_the_snapshot(tmp_path):
+    store = make_store(tmp_path)
+    data = store.load()
+    data["mods"].append({"id": 0, "name": "first"})
+    store.save(data)
+    data["role_db"]["b@x"] = "admin"
+    store.save(data)
+    again = storage.JournalStore(store.path).load()
+    assert again["mods"] == [{"id": 0, "name": "first"}]
+    assert again["role_db"] == {"a@x": "staff", "b@x": "admin"}
+
+
+def test_torn_tail_is_cut_before_the_next_append(tmp_path):
+    store = make_store(tmp_path)
+    data = store.load()
+    data["mods"].append({"id": 0, "name": "before"})
+    store.save(data)
+    with open(store.journal_path, "ab") as f:
+        f.write(b'{"v": 9, "ops": [["set", "mo')  # crash mid-append
+
+    # Restart: the torn record is dropped and the journal stays appendable.
+    restarted = storage.JournalStore(store.path)
+    data = restarted.load()
+    assert data["mods"] == [{"id": 0, "name": "before"}]
+    data["mods"].append({"id": 1, "name": "after"})
+    restarted.save(data)
+
+    names = [m["name"] for m in storage.JournalStore(store.path).load()["mods"]]
+    assert names == ["before", "after"]
+
+
+def test_record_missing_its_newline_counts_as_torn(tmp_path):
+    store = make_store(tmp_path)
+    with open(store.journal_path, "ab") as f:
+        f.write(b'{"v": 1, "ops": [["set", "events", []]]}')
+    data = storage.JournalStore(store.path).load()
+    assert "events" not in data
+    with open(store.journal_path, "rb") as f:
+        assert f.read() == b""
@@ -0,0 +1,46 @@
+import library_search
+from library_search import LibraryIndex
+
+
+def lib(*names):
+    return [{"modId": f"{i:016X}", "name": n} for i, n in enumerate(names)]
+
+
+def names(result):
+    return [e["name"] for e in result[0]]
+
+
+def test_ranking_and_typos():
+    index = LibraryIndex()
+    index.sync(lib("Vehicle Pack", "Better Vehicles", "Vehicle", "Weapons", "[RHS] Status Quo"))
+    assert names(index.search("vehicle")) == ["Vehicle", "Vehicle Pack", "Better Vehicles"]
+    assert "Vehicle" in names(index.search("vehicel"))
+    assert names(index.search("s] st")) == ["[RHS] Status Quo"]  # anything the old `in` filter found
+
+
+def test_paging_counts_every_match():
+    index = LibraryIndex()
+    index.sync(lib(*[f"Mod {i:03}" for i in range(60)]))
+    page, total = index.search("mod", page=2, per_page=25)
+    assert total == 60 and len(page) == 10 and page[0]["name"] == "Mod 050"
+    assert index.search("", page=0, per_page=5)[1] == 60
+
+
+def test_bulk_sync_matches_one_by_one_updates():
+    before = lib(*[f"Mod {i}" for i in range(200)])
+    final = {e["modId"]: dict(e, name=e["name"] + " v2") if i % 3 == 0 else e for i, e in enumerate(before) if i % 7}
+    step = library_search.BULK_THRESHOLD // 2
+
+    def state(k):
+        """The library with the first k entries changed (or deleted)."""
+        return [final[e["modId"]] for e in before[:k] if e["modId"] in final] + before[k:]
+
+    bulk, small = LibraryIndex(), LibraryIndex()
+    bulk.sync(before)
+    bulk.sync(state(len(before)))
+    for k in range(step, len(before) + step, step):
+        small.sync(before[:k])
+    for k in range(step, len(before) + step, step):
+        small.sync(state(k))
+    for q in ("", "mod 1", "v2", "mdo"):
+        assert bulk.search(q, per_page=500) == small.search(q, per_page=500)
@@ -0,0 +1,86 @@
+import pytest
+
+import storage
+
+BACKENDS = ["json", "journal", "sqlite"]
+
+
+def make_stores(tmp_path, backend):
+    path = str(tmp_path / "portal_data.json")
+    first = storage.open_store(backend, path)
+    first.reset({"mods": [{"id": 0, "name": "a"}], "role_db": {"a@x": "staff"}})
+    return first, storage.open_store(backend, path)
+
+
+def names(data):
+    return [m["name"] for m in data["mods"]]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_concurrent_edits_are_merged(tmp_path, backend):
+    ours, theirs = make_stores(tmp_path, backend)
+    mine, other = ours.load(), theirs.load()
+    other["mods"].append({"id": 1, "name": "theirs"})
+    theirs.save(other)
+    mine["mods"].append({"id": 2, "name": "ours"})
+    mine["role_db"]["b@x"] = "admin"
+    merged = ours.save(mine)
+    assert names(merged) == ["a", "theirs", "ours"]
+    assert merged["role_db"] == {"a@x": "staff", "b@x": "admin"}
+    assert names(storage.open_store(backend, theirs.path).load()) == ["a", "theirs", "ours"]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_stale_dict_is_merged_against_the_version_it_was_loaded_from(tmp_path, backend):
+    ours, theirs = make_stores(tmp_path, backend)
+    stale = ours.load()  # e.g. a session still holding the copy from before a reload
+    other = theirs.load()
+    other["mods"].append({"id": 1, "name": "theirs"})
+    theirs.save(other)
+    ours.load()  # the shared copy reloads: the store's latest state now includes "theirs"
+
+    stale["mods"][0]["name"] = "a2"
+    ours.save(stale)
+    # "theirs" is not in the stale dict, but it was never deleted there either.
+    assert names(storage.open_store(backend, theirs.path).load()) == ["a2", "theirs"]
+
+
+def test_saving_a_merged_dict_again_does_not_duplicate_items(tmp_path):
+    ours, theirs = make_stores(tmp_path, "json")
+    mine, other = ours.load(), theirs.load()
+    other["mods"].append({"id": 1, "name": "theirs"})
+    theirs.save(other)
+    mine["mods"].append({"id": 2, "name": "ours"})
+    ours.save(mine)
+    ours.save(mine)  # the stale copy again, unchanged
+    assert names(ours.load()) == ["a", "theirs", "ours"]
+
+
+def test_too_old_a_version_is_refused(tmp_path):
+    ours, theirs = make_stores(tmp_path, "json")
+    stale = ours.load()
+    for i in range(ours.KEEP_BASES + 1):
+        other = theirs.load()
+        other["role_db"][f"{i}@x"] = "staff"
+        theirs.save(other)
+        ours.load()
+    stale["role_db"]["late@x"] = "staff"
+    with pytest.raises(storage.StaleDocument):
+        ours.save(stale)
+
+
+def test_diff_and_apply_ops_round_trip():
+    old = {"mods": [{"id": i} for i in range(20)], "role_db": {"a": 1, "b": 2}, "gone": 1}
+    new = {"mods": [{"id": i, "x": 1} if i == 3 else {"id": i} for i in range(18)], "role_db": {"a": 1, "c": 3}, "new": [1]}
+    ops = storage.diff_db(old, new)
+    assert ["del", "gone"] in ops and ["trunc", "mods", 18] in ops
+    assert storage.apply_ops(storage._clone(old), ops) == new
+
+
+def test_apply_ops_on_a_fork_leaves_the_original_alone():
+    old = {"mods": [{"id": 0}], "role_db": {"a": 1}, "other": {"k": 1}}
+    before = storage._clone(old)
+    ops = [["put", "mods", 1, {"id": 1}], ["pop", "role_db", "a"]]
+    forked = storage.apply_ops(storage._fork(old, ops), ops, copy=True)
+    assert old == before
+    assert forked == {"mods": [{"id": 0}, {"id": 1}], "role_db": {}, "other": {"k": 1}}
@@ -0,0 +1,74 @@
+import base64
+import os
+
+import pytest
+
+from rich_text import RenderCache, plain_text
+
+PNG = base64.b64encode(b"\x89PNG\r\n\x1a\n fake image").decode()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return RenderCache(str(tmp_path / "rich"), "app/static/rich/", max_html_bytes=4096)
+
+
+@pytest.mark.parametrize("attack", [
+    '<script>alert(1)</script>',
+    '<SCRIPT SRC=//evil.example/x.js></SCRIPT>',
+    '<img src=x onerror=alert(1)>',
+    '<img src="javascript:alert(1)">',
+    '<a href="javascript:alert(1)">x</a>',
+    '<a href=" JaVaScRiPt:alert(1)">x</a>',
+    '<a href="&#106;avascript:alert(1)">x</a>',
+    '<a href="java\tscript:alert(1)">x</a>',
+    '<a href="data:text/html;base64,PHNjcmlwdD5hbGVydCgxKTwvc2NyaXB0Pg==">x</a>',
+    '<img src="data:image/svg+xml;base64,PHN2ZyBvbmxvYWQ9YWxlcnQoMSk+">',
+    '<p onclick="alert(1)" onmouseover=alert(1)>x</p>',
+    '<svg onload=alert(1)><p>hidden</p></svg>',
+    '<iframe src="https://evil.example"></iframe>',
+    '<p style="background-color: expression(alert(1))">x</p>',
+    '<p style="color: red; background-image: url(javascript:alert(1))">x</p>',
+    '<p style="color: rgb(1,2,3) url(https://evil.example)">x</p>',
+    '<!--<script>alert(1)</script>-->',
+    '<math><mi xlink:href="javascript:alert(1)">x</mi></math>',
+    '<p title="&quot;><script>alert(1)</script>">x</p>',
+    '<style>p { background: url(javascript:alert(1)) }</style>',
+    '<form action="javascript:alert(1)"><input type=submit></form>',
+])
+def test_attacks_are_neutralized(cache, attack):
+    out = cache.render(attack).lower()
+    for needle in ("<script", "javascript:", "onerror", "onclick", "onload", "onmouseover", "<iframe",
+                   "expression(", "url(", "<svg", "<math", "<style", "<form", "<input", "data:"):
+        assert needle not in out, (attack, out)
+
+
+def test_quill_markup_survives(cache):
+    body = ('<h2 class="ql-align-center x">Title</h2><p><strong>bold</strong> <a href="https://example.com">link</a>'
+            '<span style="color: rgb(230, 0, 0); font-size: 80px">red</span></p><ol><li class="ql-indent-1">one</li></ol>')
+    assert cache.render(body) == (
+        '<h2 class="ql-align-center">Title</h2><p><strong>bold</strong> '
+        '<a href="https://example.com" rel="noopener noreferrer" target="_blank">link</a>'
+        '<span style="color: rgb(230, 0, 0)">red</span></p><ol><li class="ql-indent-1">one</li></ol>')
+
+
+def test_text_is_escaped(cache):
+    assert cache.render('<p>a < b & "c" </script></p>') == '<p>a &lt; b &amp; "c" </p>'
+
+
+def test_pasted_images_become_files(cache, tmp_path):
+    out = cache.render(f'<p><img src="data:image/png;base64,{PNG}" alt="shot"></p>')
+    name = out.split('src="app/static/rich/')[1].split('"')[0]
+    assert name.endswith(".png") and os.path.exists(tmp_path / "rich" / name)
+    assert "base64" not in out
+
+
+def test_truncated_output_stays_well_formed(cache):
+    out = cache.render("<ul>" + "<li><b>item</b></li>" * 1000 + "</ul>")
+    assert len(out) < 4096 + 100
+    assert out.endswith("</ul><p><em>(content truncated)</em></p>")
+    assert out.count("<li>") == out.count("</li>")
+
+
+def test_plain_text_for_search():
+    assert plain_text("<p>Hello <b>world</b></p><p>again</p><script>x</script>").split() == ["Hello", "world", "again"]
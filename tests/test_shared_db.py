@@ -0,0 +1,54 @@
+import threading
+
+import storage
+
+
+def make_stores(tmp_path):
+    path = str(tmp_path / "portal_data.json")
+    first = storage.JsonStore(path)
+    first.reset({"mods": [], "role_db": {}})
+    return first, storage.JsonStore(path)
+
+
+def test_get_reloads_only_after_a_write(tmp_path):
+    store, other = make_stores(tmp_path)
+    loads = []
+    db = storage.SharedDB(store, lambda: loads.append(1) or store.load())
+    assert db.get() is db.get()
+    assert len(loads) == 1
+    data = other.load()
+    data["role_db"]["a@x"] = "admin"
+    other.save(data)
+    assert db.get()["role_db"] == {"a@x": "admin"}
+    assert len(loads) == 2
+
+
+def test_save_after_a_merge_adopts_the_merged_document(tmp_path):
+    store, other = make_stores(tmp_path)
+    db = storage.SharedDB(store, store.load)
+    data = db.get()
+    theirs = other.load()
+    theirs["mods"].append({"id": 0, "name": "theirs"})
+    other.save(theirs)
+
+    with db.lock:
+        data["mods"].append({"id": 1, "name": "ours"})
+        db.save(data)
+    assert db.data is not data
+    assert [m["name"] for m in db.data["mods"]] == ["theirs", "ours"]
+    assert db.get() is db.data  # no reload: the merged copy is what is on disk
+
+
+def test_save_waits_for_an_edit_in_progress(tmp_path):
+    store, _ = make_stores(tmp_path)
+    db = storage.SharedDB(store, store.load)
+    data = db.get()
+    saver = threading.Thread(target=db.save, args=(data,))
+    with db.lock:
+        data["role_db"]["a@x"] = "staff"
+        saver.start()
+        saver.join(0.2)
+        assert saver.is_alive()
+        data["role_db"]["b@x"] = "staff"
+    saver.join()
+    assert storage.JsonStore(store.path).load()["role_db"] == {"a@x": "staff", "b@x": "staff"}
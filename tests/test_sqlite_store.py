@@ -0,0 +1,25 @@
+from sqlite_store import SqliteStore
+
+
+def test_exists_only_after_a_document_was_written(tmp_path):
+    path = str(tmp_path / "portal_data.sqlite")
+    store = SqliteStore(path)
+    assert not store.exists()
+    store.reset({"role_db": {}, "mods": []})
+    assert SqliteStore(path).exists()  # an empty role_db is still a database
+
+
+def test_row_level_saves_round_trip(tmp_path):
+    path = str(tmp_path / "portal_data.sqlite")
+    store = SqliteStore(path)
+    store.reset({"role_db": {"a@x": "staff"}, "mods": [{"id": 0, "name": "a"}], "_seq": {"mods": 1}})
+    data = store.load()
+    data["mods"].append({"id": 1, "name": "b"})
+    data["mods"][0]["complete"] = True
+    del data["role_db"]["a@x"]
+    data["_seq"]["mods"] = 2
+    store.save(data)
+    again = SqliteStore(path).load()
+    assert again["mods"] == [{"id": 0, "name": "a", "complete": True}, {"id": 1, "name": "b"}]
+    assert again["role_db"] == {}
+    assert again["_seq"] == {"mods": 2}
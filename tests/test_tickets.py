@@ -0,0 +1,42 @@
+import tickets
+
+
+def test_ensure_ids_renumbers_repeats_after_the_first():
+    data = {"mods": [{"id": 0}, {"id": 1}, {"id": 1}, {}, {"id": 0}], "projects": [], "_seq": {"mods": 5}}
+    assert tickets.ensure_ids(data) == 3
+    assert [m["id"] for m in data["mods"]] == [0, 1, 5, 6, 7]
+    assert data["_seq"] == {"mods": 8, "projects": 0}
+    assert tickets.ensure_ids(data) == 0  # idempotent
+
+
+def test_ensure_ids_starts_past_the_largest_id():
+    data = {"mods": [{"id": 9}, {}], "projects": [{"name": "p"}]}
+    tickets.ensure_ids(data)
+    assert [m["id"] for m in data["mods"]] == [9, 10]
+    assert data["projects"][0]["id"] == 0
+    assert data["_seq"] == {"mods": 11, "projects": 1}
+
+
+def test_assign_ids_against_another_writers_tickets():
+    # Both writers started from _seq 3 and created a ticket with provisional id 3.
+    ours = {"mods": [{"id": 0}, {"id": 3, tickets.PENDING: True, "name": "ours"}], "_seq": {"mods": 3}}
+    target = {"mods": [{"id": 0}, {"id": 3, "name": "theirs"}, {"id": 3, tickets.PENDING: True, "name": "ours"}],
+              "_seq": {"mods": 4}}
+    tickets.assign_ids(target, ours)
+    assert [(m["id"], m["name"]) for m in target["mods"][1:]] == [(3, "theirs"), (4, "ours")]
+    assert ours["mods"][1] == {"id": 4, "name": "ours"}
+    assert target["_seq"]["mods"] == 5 and tickets.PENDING not in target["mods"][2]
+
+
+def test_index_add_and_counters():
+    data = {"mods": [{"id": 0, "complete": False, "read": True, "severity": 2}], "projects": [], "_seq": {"mods": 1}}
+    index = tickets.TicketIndex(data)
+    item = index.add("mods", {"complete": False, "read": False, "severity": 7})
+    assert item["id"] == 1 and index.get("mods", 1) is item
+    stats = index.stats["mods"]
+    assert (stats.unread, stats.active, stats.max_open_severity) == (1, 2, 7)
+    index.mark_read("mods", item)
+    index.set_complete("mods", item, True)
+    assert (stats.unread, stats.active, stats.complete, stats.max_open_severity) == (0, 1, 1, 2)
+    tickets.assign_ids(data, data)
+    assert data["mods"][1]["id"] == 1 and data["_seq"]["mods"] == 2
@@ -0,0 +1,57 @@
+import threading
+import time
+
+import workshop
+
+from tests.test_workshop_cache import StubGet, page
+
+IDS = [f"{i:016X}" for i in range(12)]
+
+
+def test_parse_bulk_input_dedupes_in_order():
+    text = f"https://reforger.armaplatform.com/workshop/{IDS[1]}-name\n{IDS[0]}, {IDS[1].lower()}\n\n{IDS[2]}"
+    assert workshop.parse_bulk_input(text) == [IDS[1], IDS[0], IDS[2]]
+
+
+def test_fetch_many_returns_every_mod_and_its_errors():
+    pages = {i: (200, page(i)) for i in IDS}
+    pages[IDS[3]] = (404, "")
+    pages[IDS[4]] = TimeoutError("timed out")
+    results = {r[0]: r for r in workshop.fetch_many(IDS, get=StubGet(pages), max_workers=4)}
+    assert results.keys() == set(IDS)
+    assert results[IDS[0]] == (IDS[0], IDS[0], f"https://img/{IDS[0]}.png", "1.0")
+    assert results[IDS[3]] == (IDS[3], None, None, "Error: 404")
+    assert results[IDS[4]] == (IDS[4], None, None, "timed out")
+
+
+def test_fetch_many_bounds_concurrent_requests():
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def slow_get(url):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return 200, page("x")
+
+    assert len(list(workshop.fetch_many(IDS, get=slow_get, max_workers=3))) == len(IDS)
+    assert 1 < peak[0] <= 3
+
+
+def test_fetch_many_goes_through_the_cache(tmp_path):
+    get = StubGet({i: (200, page(i)) for i in IDS})
+    cache = workshop.MetadataCache(str(tmp_path / "workshop.sqlite"), get=get)
+    list(workshop.fetch_many(IDS, cache=cache))
+    list(workshop.fetch_many(IDS, cache=cache))
+    assert len(get.urls) == len(IDS)
+
+
+def test_rate_limiter_spaces_requests_per_host():
+    limiter = workshop.HostRateLimiter(rate=50)
+    start = time.monotonic()
+    for _ in range(4):
+        limiter.wait("https://a.example/x")
+    limiter.wait("https://b.example/x")  # another host is not held up
+    assert 0.05 <= time.monotonic() - start < 0.5
@@ -0,0 +1,94 @@
+import workshop
+
+MOD_ID = "5965550F24A0C152"
+
+
+def page(name, version="1.0"):
+    return (f'<html><head><meta property="og:title" content="{name}">'
+            f'<meta property="og:image" content="https://img/{name}.png">'
+            f'<meta name="version" content="{version}"></head><body></body></html>')
+
+
+class StubGet:
+    """A workshop `get(url)` that serves canned pages and counts requests."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.urls = []
+
+    def __call__(self, url):
+        self.urls.append(url)
+        answer = self.pages[url.rsplit("/", 1)[-1]]
+        if isinstance(answer, Exception): raise answer
+        return answer
+
+
+def make_cache(tmp_path, get, now, **kw):
+    return workshop.MetadataCache(str(tmp_path / "workshop.sqlite"), get=get, clock=lambda: now[0], **kw)
+
+
+def test_fresh_entries_are_served_without_a_request(tmp_path):
+    get, now = StubGet({MOD_ID: (200, page("Alpha"))}), [1000.0]
+    cache = make_cache(tmp_path, get, now, ttl=60)
+    assert cache.lookup(MOD_ID) == ({"name": "Alpha", "image_url": "https://img/Alpha.png", "version": "1.0"}, None)
+    now[0] += 59
+    assert cache.lookup(MOD_ID)[0]["name"] == "Alpha"
+    assert len(get.urls) == 1
+
+
+def test_entries_survive_a_restart(tmp_path):
+    get, now = StubGet({MOD_ID: (200, page("Alpha"))}), [1000.0]
+    make_cache(tmp_path, get, now).lookup(MOD_ID)
+    assert make_cache(tmp_path, get, now).lookup(MOD_ID)[0]["name"] == "Alpha"
+    assert len(get.urls) == 1
+
+
+def test_expired_entries_are_served_stale_while_refreshing(tmp_path, monkeypatch):
+    get, now = StubGet({MOD_ID: (200, page("Alpha"))}), [1000.0]
+    cache = make_cache(tmp_path, get, now, ttl=60, max_stale=600)
+    cache.lookup(MOD_ID)
+    refreshed = []
+    monkeypatch.setattr(cache, "_refresh_in_background", lambda mod_id, dependencies=False: refreshed.append(mod_id))
+    now[0] += 120
+    assert cache.lookup(MOD_ID)[0]["name"] == "Alpha"
+    assert refreshed == [MOD_ID]
+    now[0] += 600
+    get.pages[MOD_ID] = (200, page("Beta"))
+    assert cache.lookup(MOD_ID)[0]["name"] == "Beta"  # past max_stale: fetched in line
+
+
+def test_missing_mods_are_remembered(tmp_path):
+    get, now = StubGet({MOD_ID: (404, "")}), [1000.0]
+    cache = make_cache(tmp_path, get, now, negative_ttl=60)
+    assert cache.lookup(MOD_ID) == (None, "Error: 404")
+    assert cache.lookup(MOD_ID) == (None, "Error: 404")
+    assert len(get.urls) == 1
+    now[0] += 61
+    cache.lookup(MOD_ID)
+    assert len(get.urls) == 2
+
+
+def test_network_errors_fall_back_to_the_old_answer(tmp_path):
+    get, now = StubGet({MOD_ID: (200, page("Alpha"))}), [1000.0]
+    cache = make_cache(tmp_path, get, now, ttl=60, max_stale=0)
+    cache.lookup(MOD_ID)
+    get.pages[MOD_ID] = ConnectionError("offline")
+    now[0] += 120
+    assert cache.lookup(MOD_ID) == ({"name": "Alpha", "image_url": "https://img/Alpha.png", "version": "1.0"}, None)
+
+
+def test_memory_tier_is_bounded(tmp_path):
+    ids = [f"{i:016X}" for i in range(5)]
+    get, now = StubGet({i: (200, page(i)) for i in ids}), [1000.0]
+    cache = make_cache(tmp_path, get, now, max_entries=3)
+    for i in ids: cache.lookup(i)
+    assert list(cache._mem) == ids[2:]
+    assert cache.lookup(ids[0])[0]["name"] == ids[0]  # still on disk
+    assert len(get.urls) == 5
+
+
+def test_fetch_mod_details_accepts_urls(tmp_path):
+    get = StubGet({MOD_ID: (200, page("Alpha", "2.1"))})
+    url = f"https://reforger.armaplatform.com/workshop/{MOD_ID.lower()}-alpha?tab=x"
+    assert workshop.fetch_mod_details(url, get=get) == (MOD_ID, "Alpha", "https://img/Alpha.png", "2.1")
+    assert workshop.fetch_mod_details("https://reforger.armaplatform.com/workshop/-", get=get) == (None, None, None, "Invalid URL format")
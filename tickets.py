@@ -0,0 +1,169 @@
+"""
+Materialized aggregates and the id index over the ticket collections
+(DB['mods'], DB['projects']).
+
+The sidebar needs unread counts, active/complete counts and the highest open
+severity on every rerun. TicketIndex computes them once per loaded DB and then
+keeps them current through add / mark_read / set_complete, which are also the
+only places the app mutates those fields, so reading a counter is O(1).
+
+Ids come from a per-collection sequence stored in the document (DB['_seq']),
+so they are never reused, and get() finds a ticket by id through a dict. A new
+ticket carries a provisional id until it is saved: assign_ids() gives it the
+final one under the store lock, against every other writer's tickets.
+"""
+import threading
+from collections import Counter
+from datetime import datetime
+
+COLLECTIONS = ("mods", "projects")
+PENDING = "_pending"  # on a ticket created since the last save; assign_ids() removes it
+
+
+def now_stamp():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def ensure_ids(data):
+    """
+    Migration: gives tickets from before ids existed an integer id, renumbers
+    every repeat of an id after its first ticket (older versions numbered by
+    list length and could hand one id out twice), and moves DB['_seq'] past
+    the largest id. New ids come from the sequence. Returns how many tickets
+    were numbered.
+    """
+    seq = data.setdefault("_seq", {})
+    numbered = 0
+    for name in COLLECTIONS:
+        items = data.get(name, [])
+        top = max((x['id'] for x in items if isinstance(x.get('id'), int)), default=-1)
+        next_id = max(seq.get(name, 0), top + 1)
+        seen = set()
+        for item in items:
+            if not isinstance(item.get('id'), int) or item['id'] in seen:
+                item['id'] = next_id
+                next_id += 1
+                numbered += 1
+            seen.add(item['id'])
+        seq[name] = next_id
+    return numbered
+
+
+def assign_ids(target, ours):
+    """
+    Final ids for the tickets created since the last save. For
+    _DocumentStore.save(prepare=...): `target` is the document about to be
+    written, merged with whatever other processes saved first, so two
+    processes appending at once get different ids and nothing saved is ever
+    renumbered. The same ids are written back to the tickets in `ours`.
+    """
+    seq = target.setdefault("_seq", {})
+    for name in COLLECTIONS:
+        items = target.get(name, [])
+        new = [x for x in items if x.get(PENDING)]
+        if not new: continue
+        mine = [x for x in ours.get(name, []) if x.get(PENDING)] if ours is not target else new
+        top = max((x['id'] for x in items if not x.get(PENDING) and isinstance(x.get('id'), int)), default=-1)
+        next_id = max(seq.get(name, 0), top + 1)
+        for item in new:
+            item['id'] = next_id
+            next_id += 1
+            del item[PENDING]
+        for item, saved in zip(mine, new):
+            item['id'] = saved['id']
+            item.pop(PENDING, None)
+        seq[name] = next_id
+
+
+class TicketStats:
+    """Counters for one collection."""
+
+    def __init__(self, items=()):
+        self.unread = 0
+        self.active = 0
+        self.complete = 0
+        self._open_severity = Counter()
+        for item in items:
+            self._count(item, 1)
+
+    def _count(self, item, sign):
+        if not item.get('read', True): self.unread += sign
+        if item.get('complete'):
+            self.complete += sign
+        else:
+            self.active += sign
+            self._open_severity[item.get('severity', 1)] += sign
+
+    @property
+    def max_open_severity(self):
+        """Highest severity among open tickets (0 when none); at most 10 distinct values to scan."""
+        return max((sev for sev, n in self._open_severity.items() if n > 0), default=0)
+
+
+class TicketIndex:
+    def __init__(self, data):
+        self.data = data
+        self.stats = {name: TicketStats(data.get(name, [])) for name in COLLECTIONS}
+        self.by_id = {name: {x.get('id'): x for x in data.get(name, [])} for name in COLLECTIONS}
+        self._lock = threading.Lock()
+
+    def get(self, collection, ticket_id):
+        return self.by_id[collection].get(ticket_id)
+
+    def add(self, collection, fields):
+        """
+        Appends a new ticket under a provisional id, the next one from the
+        collection's sequence; saving makes it final (see assign_ids). Returns it.
+        """
+        with self._lock:
+            seq = self.data.get("_seq", {}).get(collection, 0)
+            pending = [x['id'] for x in self.data[collection] if x.get(PENDING)]
+            item = {"id": max(pending, default=seq - 1) + 1, **fields, "created_at": now_stamp(), PENDING: True}
+            self._insert(collection, item)
+        return item
+
+    def restore(self, collection, item):
+        """Puts a ticket that came back from the archive into the list under its own id."""
+        with self._lock:
+            self._insert(collection, item)
+        return item
+
+    def _insert(self, collection, item):
+        self.data[collection].append(item)
+        self.by_id[collection][item['id']] = item
+        self.stats[collection]._count(item, 1)
+
+    def mark_read(self, collection, item):
+        """Returns True if the item was unread."""
+        if item.get('read', True): return False
+        item['read'] = True
+        self.stats[collection].unread -= 1
+        return True
+
+    def set_complete(self, collection, item, complete):
+        stats = self.stats[collection]
+        stats._count(item, -1)
+        item['complete'] = complete
+        if complete: item['completed_at'] = now_stamp()
+        else: item.pop('completed_at', None)
+        stats._count(item, 1)
+
+
+class IndexCache:
+    """One TicketIndex per loaded DB dict: SharedDB swaps in a new dict on every reload."""
+
+    def __init__(self, build=TicketIndex):
+        self.build = build
+        self._data = None
+        self._lists = {}
+        self._index = None
+        self._lock = threading.Lock()
+
+    def get(self, data):
+        with self._lock:
+            # A save may also swap a whole collection list (archive.sweep does).
+            if data is not self._data or any(data.get(n) is not self._lists[n] for n in COLLECTIONS):
+                self._index = self.build(data)
+                self._data = data
+                self._lists = {n: data.get(n) for n in COLLECTIONS}
+            return self._index
@@ -0,0 +1,62 @@
+"""
+The portal's pages, grouped by area, each module imported on first visit.
+
+PAGES maps a st.session_state.page value to the module that renders it; the
+page function has the same name as the page. render() imports that module the
+first time the page is routed to in this process. A login or announcements
+render therefore never pays for pandas, the Workshop scraper (requests,
+BeautifulSoup) or the Quill editor.
+
+Page functions take the app's shared state as one namespace argument
+(`app.DB`, `app.save_db`, `app.user_role`, ...) built by app.py. app.DB is
+shared by every session: a page changes it only inside `with app.DB_LOCK:`,
+together with the save_db call that persists the change.
+
+(The folder is not called pages/: Streamlit would turn that into its own
+multipage navigation.)
+"""
+import importlib
+
+PAGES = {
+    "view_announcements": "announcements",
+    "create_project": "projects",
+    "view_projects": "projects",
+    "project_detail": "projects",
+    "report_broken_mod": "mods",
+    "view_broken_mods": "mods",
+    "view_fixed_mods": "mods",
+    "mod_detail": "mods",
+    "create_event": "events",
+    "view_events": "events",
+    "create_tutorial": "tutorials",
+    "view_tutorials": "tutorials",
+    "view_users": "users",
+    "roles": "roles",
+    "metrics": "performance",
+    "search": "search",
+    "json_editor": "mod_studio",
+}
+
+
+# Top-level DB keys each page shows. While a session sits on one of these pages,
+# a change to them (by any session or replica) reruns it; see live_updates in
+# app.py. Pages not listed, the forms, are left alone.
+LIVE_KEYS = {
+    "view_announcements": {"announcements"},
+    "view_broken_mods": {"mods"},
+    "view_fixed_mods": {"mods"},
+    "mod_detail": {"mods"},
+    "view_projects": {"projects"},
+    "project_detail": {"projects"},
+    "view_events": {"events"},
+    "view_tutorials": {"tutorials"},
+    "view_users": {"role_db", "usernames"},
+    "roles": {"role_db", "usernames"},
+}
+
+
+def render(page, app):
+    """Renders `page`. Unknown pages render nothing."""
+    module = PAGES.get(page)
+    if module is None: return
+    getattr(importlib.import_module(f"{__name__}.{module}"), page)(app)
@@ -0,0 +1,27 @@
+"""Announcements feed; SUPER_ADMIN can post."""
+from datetime import datetime
+
+import streamlit as st
+
+
+def view_announcements(app):
+    st.title("📢 Announcements")
+    if app.user_role == "SUPER_ADMIN":
+        from streamlit_quill import st_quill  # only posters need the editor; readers skip its import
+        with st.expander("Post New Announcement"):
+            title = st.text_input("Title")
+            content = st_quill(key="ann_quill")
+            if st.button("Post"):
+                with app.DB_LOCK:
+                    app.DB['announcements'].insert(0, {"date": datetime.now().strftime("%Y-%m-%d"), "title": title, "content": content, "author": app.USER_NAME})
+                    app.save_db(app.DB)
+                st.success("Posted!")
+                st.rerun()
+    def show_announcement(a):
+        with st.container(border=True):
+            st.subheader(a['title'])
+            st.caption(f"{a['date']} by {a['author']}")
+            app.show_html(a['content'])
+    # New posts are inserted at the front, so list order is already newest first.
+    app.render_feed("announcements", app.DB['announcements'], show_announcement,
+                    {"Newest first": (None, False), "Oldest first": (None, True)}, empty="No announcements.")
@@ -0,0 +1,32 @@
+"""Events and training schedules."""
+import streamlit as st
+from streamlit_quill import st_quill
+
+
+def create_event(app):
+    st.title("Create Event")
+    name = st.text_input("Name")
+    date = st.date_input("Date")
+    time = st.time_input("Time")
+    tz = st.selectbox("Timezone", ["EST", "UTC", "PST"])
+    loc = st.text_input("Location")
+    desc = st_quill(key="ev_desc")
+    if st.button("Publish"):
+        with app.DB_LOCK:
+            app.DB['events'].append({"name": name, "date": str(date), "time": str(time), "tz": tz, "loc": loc, "desc": desc})
+            app.save_db(app.DB)
+        st.success("Published!")
+        st.session_state.page = "view_events"
+        st.rerun()
+
+
+def view_events(app):
+    st.title("Events")
+    def show_event(e):
+        with st.chat_message("event"):
+            st.write(f"### {e['name']}")
+            st.write(f"🕒 {e['date']} {e['time']} ({e['tz']}) | 📍 {e['loc']}")
+            app.show_html(e['desc'])
+    when = lambda e: (e.get('date', ''), e.get('time', ''))
+    app.render_feed("events", app.DB['events'], show_event,
+                    {"Soonest first": (when, False), "Latest first": (when, True)}, empty="No events.")
@@ -0,0 +1,310 @@
+"""
+Mod Studio (SUPER_ADMIN): server config editor, Workshop lookups, mod library
+and presets. The Workshop scraper (requests, BeautifulSoup) loads with this page.
+"""
+import json
+
+import streamlit as st
+
+import editor_model
+import feeds
+import mod_import
+import presets
+import workshop
+
+
+# --- SMART JSON INSERTER (FIXES BRACKET ISSUES) ---
+def inject_mod(current_text, mod_obj):
+    """
+    Intelligently inserts a mod object into a JSON list string.
+    Handles trailing whitespace and malformed JSON better.
+    """
+    # 1. Clean input
+    s = current_text.strip()
+    
+    # 2. Try Strict Parse (Best Case)
+    try:
+        data = json.loads(s)
+        if isinstance(data, list):
+            data.append(mod_obj)
+            return json.dumps(data, indent=4)
+    except:
+        pass # Fallback to string manipulation if JSON is currently invalid (common while editing)
+
+    # 3. String Manipulation Fallback
+    snippet = json.dumps(mod_obj, indent=4)
+    
+    if s.endswith("]"):
+        # We found the end of the list.
+        # Check if list is effectively empty "[]"
+        if len(s) < 3:
+            return f"[\n{snippet}\n]"
+        
+        # Peel off the last ']'
+        # rstrip() removes whitespace/newlines before the bracket to prevent weird gaps
+        content = s[:-1].rstrip()
+        
+        # Add comma, new object, and close bracket
+        return f"{content},\n{snippet}\n]"
+    
+    elif not s:
+        # Empty editor -> Start new list
+        return f"[\n{snippet}\n]"
+    
+    else:
+        # No closing bracket found? Just append (Safe fallback)
+        return s + ",\n" + snippet
+
+
+# --- CALLBACK TO SYNC EDITOR ---
+def sync_editor():
+    """Captures manual typing in the text box"""
+    st.session_state.editor_content = st.session_state[f"json_area_{st.session_state.editor_key}"]
+
+
+def get_editor_model():
+    """Parsed editor contents, re-parsed only when the text changed. None while the JSON is invalid."""
+    text = st.session_state.editor_content
+    cached = st.session_state.editor_model
+    if cached is None or cached[0] != text:
+        cached = (text, editor_model.EditorModel.from_text(text))
+        st.session_state.editor_model = cached
+    return cached[1]
+
+
+def add_to_editor(mods):
+    """Adds mod snippets to the editor, skipping modIds already in it. Returns how many were added."""
+    model = get_editor_model()
+    if model is None:
+        # Text is mid-edit and not valid JSON: fall back to splicing strings.
+        text = st.session_state.editor_content
+        for mod in mods: text = inject_mod(text, mod)
+        added = len(mods)
+    else:
+        added = sum(model.add(mod) for mod in mods)
+        text = model.text
+        st.session_state.editor_model = (text, model)
+    if added:
+        st.session_state.editor_content = text
+        st.session_state.editor_key += 1
+    return added
+
+
+def show_dependency_report(report):
+    """What the last "Add with Dependencies" did: counts, plus anything it could not resolve cleanly."""
+    needed = len(report["mods"]) - 1
+    st.info(f"{needed} dependencies; added {report['added']} mods to the editor "
+            f"({len(report['mods']) - report['added']} already there).")
+    if report["failed"]:
+        st.warning("Could not fetch (added by ID only): " + ", ".join(f"{m} ({e})" for m, e in report["failed"].items()))
+    if report["truncated"]:
+        st.warning(f"{len(report['truncated'])} mods sit deeper than WORKSHOP_DEPENDENCY_DEPTH; their own dependencies were not checked.")
+    for cycle in report["cycles"]:
+        st.warning("Circular dependency: " + " → ".join(cycle))
+
+
+# --- PAGE ---
+def json_editor(app):
+    st.title("📝 Mod Configuration Studio")
+    if app.user_role != "SUPER_ADMIN":
+        st.error("Access Denied.")
+    else:
+        col_editor, col_tools = st.columns([2, 1])
+
+        with col_editor:
+            with st.container(border=True):
+                st.subheader("📁 Configuration File Manager")
+                c_load, c_save = st.columns(2)
+                with c_load:
+                    config_names = [c['name'] for c in app.DB.get('server_configs', [])]
+                    selected_conf = st.selectbox("Load Saved Config", ["Select..."] + config_names)
+                    if st.button("📂 Load Preset") and selected_conf != "Select...":
+                        found = presets.get(app.DB, selected_conf)
+                        if found:
+                            st.session_state.editor_content = presets.expand(app.DB, found)
+                            st.session_state.editor_key += 1
+                            lost = presets.missing(app.DB, found)
+                            if lost: st.warning(f"{lost} mod entries of '{selected_conf}' are missing from the pool and were left out.")
+                            else: st.success(f"Loaded '{selected_conf}'!")
+                            st.rerun()
+                with c_save:
+                    new_conf_name = st.text_input("Save Current as...")
+                    if st.button("💾 Save as Preset") and new_conf_name:
+                        with app.DB_LOCK:
+                            presets.save(app.DB, new_conf_name, st.session_state.editor_content)
+                            app.save_db(app.DB)
+                        st.success(f"Saved '{new_conf_name}'!")
+                        st.rerun()
+                if selected_conf != "Select...":
+                    if st.button("🗑️ Delete Selected Preset"):
+                        with app.DB_LOCK:
+                            presets.delete(app.DB, selected_conf)
+                            app.save_db(app.DB)
+                        st.success("Deleted.")
+                        st.rerun()
+                if len(config_names) > 1:
+                    with st.expander("🔀 Compare Presets"):
+                        c_a, c_b = st.columns(2)
+                        with c_a: name_a = st.selectbox("From", config_names, key="preset_diff_a")
+                        with c_b: name_b = st.selectbox("To", config_names, index=1, key="preset_diff_b")
+                        changes = presets.diff(app.DB, presets.get(app.DB, name_a), presets.get(app.DB, name_b))
+                        label = lambda m: f"{m.get('name', '?')} ({m.get('modId', '?')})" if isinstance(m, dict) else "(missing entry)"
+                        if not any(changes.values()): st.caption("Identical.")
+                        for m in changes["added"]: st.markdown(f":green[+ {label(m)}]")
+                        for m in changes["removed"]: st.markdown(f":red[− {label(m)}]")
+                        for old, new in changes["changed"]:
+                            st.markdown(f":orange[~ {label(new)}] {old.get('version') or '—'} → {new.get('version') or '—'}")
+                        if changes["settings"]: st.caption("Server settings outside the mods list differ too.")
+
+            st.divider()
+            st.subheader("Active JSON Editor")
+            st.caption("Press 'Ctrl+A' then 'Ctrl+C' inside the box to copy everything.")
+
+            json_text = st.text_area(
+                "JSON Output", 
+                value=st.session_state.editor_content, 
+                height=600, 
+                key=f"json_area_{st.session_state.editor_key}", 
+                on_change=sync_editor
+            )
+
+        with col_tools:
+            # FIX: Place Tabs OUTSIDE the scrollable container
+            tab_search, tab_saved, tab_import = st.tabs(["🌐 Search", "💾 Library", "📥 Import"])
+
+            with tab_search:
+                st.info("💡 **Tip:** Type a name to find the link, then Paste the URL to fetch data.")
+                search_term = st.text_input("1. Search Term", placeholder="e.g. RHS Status Quo")
+                if search_term:
+                    st.link_button(f"🌐 Open Search: '{search_term}'", f"https://reforger.armaplatform.com/workshop?search={search_term}")
+                st.divider()
+                st.write("**2. Paste Workshop URL**")
+                fetch_url = st.text_input("Paste URL here to auto-fetch", placeholder="https://reforger.armaplatform.com/workshop/...")
+                if st.button("🚀 Fetch Details"):
+                    if fetch_url:
+                        mid, mname, mimg, mver = app.fetch_mod_details(fetch_url)
+                        if mname:
+                            st.session_state.fetched_mod = {"modId": mid, "name": mname, "version": mver, "image_url": mimg}
+                            st.success("Found!")
+                        else: st.error("Could not find mod. Check URL.")
+
+                with st.container(height=500, border=True):
+                    if st.session_state.fetched_mod:
+                        mod = st.session_state.fetched_mod
+                        if mod['image_url']: st.image(mod['image_url'])
+                        st.subheader(mod['name'])
+                        clean_mod = {"modId": mod['modId'], "name": mod['name'], "version": ""}
+                        st.code(json.dumps(clean_mod, indent=4), language='json')
+                        c1, c2, c3 = st.columns(3)
+                        with c1:
+                            if st.button("💾 Save to Library"):
+                                with app.DB_LOCK:
+                                    app.DB['mod_library'].append(mod)
+                                    app.save_db(app.DB)
+                                st.success("Saved!")
+                        with c2:
+                            if st.button("➕ Add to Editor"):
+                                if add_to_editor([clean_mod]): st.rerun()
+                                else: st.toast("Already in the editor.")
+                        with c3:
+                            if st.button("🧩 Add with Dependencies"):
+                                with st.spinner("Resolving dependencies..."):
+                                    resolved = app.resolve_dependencies([mod['modId']])
+                                resolved["added"] = add_to_editor(resolved["mods"])
+                                resolved["root"] = mod['modId']
+                                st.session_state.dependency_report = resolved
+                                if resolved["added"]: st.rerun()
+                        report = st.session_state.dependency_report
+                        if report and report["root"] == mod['modId']:
+                            show_dependency_report(report)
+
+                st.divider()
+                st.write("**3. Bulk Fetch**")
+                bulk_text = st.text_area("One workshop URL or modId per line", height=150, key="bulk_urls")
+                if st.button("🚀 Fetch All") and bulk_text.strip():
+                    mod_ids = workshop.parse_bulk_input(bulk_text)
+                    progress = st.progress(0.0, text=f"Fetching 0/{len(mod_ids)}...")
+                    found, failed = [], []
+                    for i, (mid, mname, mimg, mver) in enumerate(workshop.fetch_many(mod_ids, cache=app.get_workshop_cache(), max_workers=app.WORKSHOP_MAX_CONNECTIONS), 1):
+                        if mname: found.append({"modId": mid, "name": mname, "version": mver, "image_url": mimg})
+                        else: failed.append(f"{mid}: {mver}")
+                        progress.progress(i / len(mod_ids), text=f"Fetching {i}/{len(mod_ids)}...")
+                    order = {mid: i for i, mid in enumerate(mod_ids)}
+                    st.session_state.bulk_results = {"found": sorted(found, key=lambda m: order[m['modId']]), "failed": failed}
+                bulk = st.session_state.bulk_results
+                if bulk:
+                    st.success(f"Found {len(bulk['found'])} mods.")
+                    if bulk['failed']:
+                        with st.expander(f"⚠️ {len(bulk['failed'])} failed"):
+                            st.code("\n".join(bulk['failed']))
+                    add_lib = st.checkbox("Save to Library", value=True, key="bulk_to_lib")
+                    add_edit = st.checkbox("Add to Editor", value=True, key="bulk_to_editor")
+                    if st.button("✅ Add All Found") and bulk['found']:
+                        if add_lib:
+                            with app.DB_LOCK:
+                                lib_ids = {m['modId'] for m in app.DB['mod_library']}
+                                new_mods = [m for m in bulk['found'] if m['modId'] not in lib_ids]
+                                if new_mods:
+                                    app.DB['mod_library'].extend(new_mods)
+                                    app.save_db(app.DB)
+                        if add_edit:
+                            add_to_editor([{"modId": m['modId'], "name": m['name'], "version": ""} for m in bulk['found']])
+                        st.session_state.bulk_results = None
+                        st.rerun()
+
+            with tab_saved:
+                lib_search = st.text_input("Filter Library", placeholder="Filter by name...")
+                if st.session_state.lib_query != lib_search:
+                    st.session_state.lib_query, st.session_state.lib_page = lib_search, 0
+                lib_index = app.get_library_index()
+                lib_index.sync(app.DB['mod_library'], app.DB.get('_version'))
+                filtered, total = lib_index.search(lib_search, st.session_state.lib_page, app.LIBRARY_PAGE_SIZE)
+                pages = feeds.page_count(total, app.LIBRARY_PAGE_SIZE)
+                if st.session_state.lib_page >= pages:  # the library shrank under us
+                    st.session_state.lib_page = pages - 1
+                    filtered, total = lib_index.search(lib_search, st.session_state.lib_page, app.LIBRARY_PAGE_SIZE)
+                app.render_pager("lib_page", st.session_state.lib_page, pages, f"{total} mods")
+                with st.container(height=600, border=True):
+                    if not filtered: st.info("No saved mods.")
+                    for mod in filtered:
+                        with st.container(border=True):
+                            c_info, c_add, c_copy, c_del = st.columns([3, 1, 1, 1], vertical_alignment="center")
+                            with c_info:
+                                st.write(f"**{mod['name']}**")
+                                if mod.get('missing'): st.caption("⚠️ No longer on the Workshop")
+                                mini_json = {"modId": mod['modId'], "name": mod['name'], "version": ""}
+                                json_str = json.dumps(mini_json, indent=4)
+                            with c_add:
+                                if st.button("➕", key=f"ins_{mod['modId']}", help="Insert into Editor", use_container_width=True):
+                                    if add_to_editor([mini_json]): st.rerun()
+                                    else: st.toast("Already in the editor.")
+                            with c_copy:
+                                with st.popover("📋", use_container_width=True):
+                                    st.code(json_str, language='json')
+                                    st.caption("Click the icon in the corner to copy.")
+                            with c_del:
+                                if st.button("🗑️", key=f"rm_{mod['modId']}", help="Delete from Library", use_container_width=True):
+                                    with app.DB_LOCK:
+                                        app.DB['mod_library'].remove(mod)
+                                        lib_index.remove(mod['modId'])
+                                        app.save_db(app.DB)
+                                    st.rerun()
+
+            with tab_import:
+                st.subheader("Batch Importer")
+                st.caption("Paste a full JSON file or a list of mods, or upload a server config. We will extract every mod block (nested ones too) and save it to your library.")
+                import_file = st.file_uploader("Upload JSON", type=["json", "txt"])
+                import_text = st.text_area("Paste JSON Here", height=300)
+                update_existing = st.checkbox("Update name/version of mods already in the library")
+                if st.button("Process & Import Mods", type="primary"):
+                    try:
+                        counts = {"added": 0, "updated": 0, "skipped": 0}
+                        with app.DB_LOCK:
+                            for source in ([import_file] if import_file else []) + ([import_text] if import_text.strip() else []):
+                                for k, v in mod_import.import_mods(app.DB['mod_library'], source, update_existing).items():
+                                    counts[k] += v
+                            if counts["added"] or counts["updated"]: app.save_db(app.DB)
+                        if counts["added"] or counts["updated"]:
+                            st.success(f"Imported {counts['added']} new mods, updated {counts['updated']}, skipped {counts['skipped']} duplicates.")
+                        else: st.warning(f"No new mods found ({counts['skipped']} duplicates skipped).")
+                    except Exception as e: st.error(f"Error processing text: {e}")
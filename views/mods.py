@@ -0,0 +1,105 @@
+"""Broken-mod tickets: report, active list, fixed list and detail."""
+import streamlit as st
+from streamlit_quill import st_quill
+
+
+def report_broken_mod(app):
+    st.title("Report Broken Mod")
+    st.caption("This will create a ticket in the 'Broken Mods' tab.")
+    name = st.text_input("Mod Name")
+    json_code = st.text_area("JSON Code", height=100)
+    sev = st.slider("Severity", 1, 10)
+    assign = st.text_input("Assign To")
+    st.write("Description:")
+    desc = st_quill(key="mod_desc", html=True)
+    if st.button("Submit Report"):
+        with app.DB_LOCK:
+            app.TICKETS.add('mods', {
+                "name": name, "json_data": json_code, "severity": sev,
+                "assignment": assign, "description": desc, "complete": False, "read": False
+            })
+            app.save_db(app.DB)
+        st.success("Submitted! Saved to Broken Mods.")
+        st.session_state.page = "view_broken_mods"
+        st.rerun()
+
+
+def view_broken_mods(app):
+    if app.user_role not in ["admin", "SUPER_ADMIN"]: st.error("Access Denied.")
+    else:
+        st.title("Active Broken Mods")
+        active = [m for m in app.DB['mods'] if not m['complete']]
+        if not active: st.success("No active issues.")
+        def show_broken_mod(m):
+            with st.container(border=True):
+                c1, c2 = st.columns([5,1])
+                with c1: 
+                    prefix = "🆕 " if not m.get('read', True) else "⚠️ "
+                    st.subheader(f"{prefix}{m['name']}")
+                    st.caption(f"Severity: {m['severity']} | Assigned: {m['assignment']}")
+                with c2: 
+                    if st.button("Details", key=f"d_{m['id']}", on_click=app.navigate_to, args=("mod_detail", m['id'], None)): pass
+        if active: app.render_feed("broken_mods", active, show_broken_mod, app.TICKET_SORTS)
+
+
+def view_fixed_mods(app):
+    if app.user_role not in ["admin", "SUPER_ADMIN"]: st.error("Access Denied.")
+    else:
+        st.title("Fixed Mods Archive")
+        # Archived tickets are listed from the archive's summary index; the full ticket is read on open.
+        fixed = app.get_archive().summaries('mods') + [m for m in app.DB['mods'] if m['complete']]
+        def show_fixed_mod(m):
+            with st.container(border=True):
+                c1, c2 = st.columns([5,1])
+                with c1:
+                    st.subheader(f"✅ {m['name']}")
+                    if 'seg' in m: st.caption(f"🗄️ Archived · resolved {(m.get('completed_at') or '')[:10]}")
+                with c2: st.button("Archive View", key=f"a_{m['id']}", on_click=app.navigate_to, args=("mod_detail", m['id'], None))
+        app.render_feed("fixed_mods", fixed, show_fixed_mod,
+                        {"Newest first": (None, True), "Oldest first": (None, False)}, empty="Empty archive.")
+
+
+def mod_detail(app):
+    m = app.TICKETS.get('mods', st.session_state.selected_mod_id)
+    archived = False
+    if m is None and st.session_state.selected_mod_id is not None:
+        m = app.get_archive().get('mods', st.session_state.selected_mod_id)
+        archived = m is not None
+        if archived: app.get_discussions().import_inline('mods', m)  # archived before threads had files
+    if m and not archived and not m.get('read', True) and app.user_role in ["admin", "SUPER_ADMIN"]:
+        with app.DB_LOCK:
+            app.TICKETS.mark_read('mods', m)
+            app.save_db(app.DB)
+        st.rerun()
+    if m:
+        st.title(f"Issue: {m['name']}")
+        c1, c2 = st.columns([2,1])
+        with c1:
+            st.caption(f"Severity: {m['severity']} | Assigned: {m['assignment']}")
+            if m.get('json_data'): st.code(m['json_data'], language='json')
+            app.show_html(m['description'])
+            st.divider()
+            if app.user_role in ["admin", "SUPER_ADMIN"]:
+                if not m['complete']:
+                    if st.button("✅ Mark Resolved", type="primary"):
+                        with app.DB_LOCK:
+                            app.TICKETS.set_complete('mods', m, True)
+                            app.save_db(app.DB)
+                        st.success("Resolved!")
+                        st.session_state.page = "view_fixed_mods"
+                        st.rerun()
+                else:
+                    st.success("Resolved." + (" (archived)" if archived else ""))
+                    if st.button("Re-open"):
+                        with app.DB_LOCK:
+                            if archived:
+                                m = app.get_archive().restore('mods', m['id'])
+                                if m:
+                                    app.get_discussions().import_inline('mods', m)
+                                    app.TICKETS.restore('mods', m)
+                            if m:
+                                app.TICKETS.set_complete('mods', m, False)
+                                app.save_db(app.DB)
+                        st.rerun()
+        with c2:
+            app.render_discussion('mods', m, "chat", read_only=archived)
@@ -0,0 +1,29 @@
+"""SUPER_ADMIN performance page: timings recorded by the metrics module."""
+import pandas as pd
+import streamlit as st
+
+
+def metrics(app):
+    st.title("📈 Performance")
+    render_cache = app.get_render_cache()
+    c1, c2, c3 = st.columns(3)
+    c1.metric("DB read", f"{app.STORE.bytes_read / 1024:,.0f} KB")
+    c2.metric("DB written", f"{app.STORE.bytes_written / 1024:,.0f} KB")
+    c3.metric("Rich-text cache", f"{render_cache.hits} hits", f"{render_cache.misses} misses", delta_color="off")
+    if not app.METRICS_ENABLED:
+        st.info("Timings are off. Set METRICS_ENABLED = true in secrets.toml and restart the app to record them.")
+    else:
+        rows = [{"Operation": name, "Labels": ", ".join(f"{k}={v}" for k, v in labels.items()), "Count": h.count,
+                 "Mean ms": h.sum / h.count * 1000, "p50 ms": h.quantile(0.5) * 1000,
+                 "p95 ms": h.quantile(0.95) * 1000, "p99 ms": h.quantile(0.99) * 1000, "Total s": h.sum}
+                for name, labels, h in app.METRICS.histograms()]
+        if rows:
+            st.dataframe(pd.DataFrame(rows).sort_values("Total s", ascending=False).round(2), hide_index=True, use_container_width=True)
+            st.caption("Percentiles are estimated from histogram buckets.")
+        else: st.caption("Nothing recorded yet.")
+        counts = [(name, labels, v) for name, labels, v in app.METRICS.counters() if not name.startswith("db_")]
+        for name, labels, v in counts:
+            st.write(f"**{name}** {', '.join(f'{k}={val}' for k, val in labels.items())}: {v}")
+        with st.expander("Prometheus exposition"):
+            if app.METRICS_FILE: st.caption(f"Rewritten to `{app.METRICS_FILE}` every {app.METRICS_WRITE_INTERVAL} s.")
+            st.code(app.METRICS.exposition(), language="text")
@@ -0,0 +1,85 @@
+"""New Work: project tickets."""
+import streamlit as st
+from streamlit_quill import st_quill
+
+
+def create_project(app):
+    st.title("🚀 Submit New Job / Project")
+    st.caption("This will create a task in the 'New Work' tab.")
+    with st.container(border=True):
+        p_name = st.text_input("Project Title")
+        p_assign = st.text_input("Lead Developer/Assignee")
+        p_sev = st.slider("Severity / Priority", 1, 10, 5)
+        st.write("Project Brief:")
+        p_desc = st_quill(key="proj_desc_page", html=True)
+        if st.button("Create Project", type="primary"):
+            with app.DB_LOCK:
+                app.TICKETS.add('projects', {
+                    "name": p_name, "assigned": p_assign, "severity": p_sev,
+                    "description": p_desc, "complete": False, "read": False
+                })
+                app.save_db(app.DB)
+            st.success("Project Created! Saved to New Work.")
+            st.session_state.page = "view_projects"
+            st.rerun()
+
+
+def view_projects(app):
+    st.title("New Work / Active Projects")
+    active_projs = [p for p in app.DB['projects'] if not p['complete']]
+    def show_project(p):
+        with st.container(border=True):
+            c1, c2 = st.columns([5,1])
+            with c1:
+                prefix = "🆕 " if not p.get('read', True) else "📁 "
+                st.subheader(f"{prefix}{p['name']}")
+                sev = p.get('severity', 1)
+                st.caption(f"Lead: {p['assigned']} | Severity: {sev}/10")
+            with c2:
+                if st.button("Open", key=f"p_{p['id']}", on_click=app.navigate_to, args=("project_detail", None, p['id'])): pass
+    app.render_feed("projects", active_projs, show_project, app.TICKET_SORTS, empty="No active projects.")
+
+
+def project_detail(app):
+    p = app.TICKETS.get('projects', st.session_state.selected_project_id)
+    archived = False
+    if p is None and st.session_state.selected_project_id is not None:
+        p = app.get_archive().get('projects', st.session_state.selected_project_id)
+        archived = p is not None
+        if archived: app.get_discussions().import_inline('projects', p)  # archived before threads had files
+    if p and not archived and not p.get('read', True) and app.user_role in ["admin", "SUPER_ADMIN"]:
+        with app.DB_LOCK:
+            app.TICKETS.mark_read('projects', p)
+            app.save_db(app.DB)
+        st.rerun()
+    if p:
+        st.title(f"Project: {p['name']}")
+        c1, c2 = st.columns([2,1])
+        with c1:
+            sev = p.get('severity', 1)
+            st.caption(f"Lead: {p['assigned']} | Severity: {sev}/10")
+            app.show_html(p['description'])
+            st.divider()
+            if not p['complete']:
+                if st.button("✅ Mark Complete", type="primary"):
+                    with app.DB_LOCK:
+                        app.TICKETS.set_complete('projects', p, True)
+                        app.save_db(app.DB)
+                    st.success("Completed!")
+                    st.session_state.page = "view_projects"
+                    st.rerun()
+            else:
+                st.success("Project Completed." + (" (archived)" if archived else ""))
+                if app.user_role in ["admin", "SUPER_ADMIN"] and st.button("Re-open"):
+                    with app.DB_LOCK:
+                        if archived:
+                            p = app.get_archive().restore('projects', p['id'])
+                            if p:
+                                app.get_discussions().import_inline('projects', p)
+                                app.TICKETS.restore('projects', p)
+                        if p:
+                            app.TICKETS.set_complete('projects', p, False)
+                            app.save_db(app.DB)
+                    st.rerun()
+        with c2:
+            app.render_discussion('projects', p, "p_chat", read_only=archived)
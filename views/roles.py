@@ -0,0 +1,31 @@
+"""SUPER_ADMIN role management."""
+import pandas as pd
+import streamlit as st
+
+
+def roles(app):
+    st.title("Role Management")
+    with st.container(border=True):
+        st.subheader("Update User Role")
+        u_email = st.text_input("User Email to Update")
+        u_role = st.selectbox("New Role", ["admin", "CLPLEAD", "CLP", "staff"])
+        if st.button("Update Role"):
+            if u_email in app.DB['role_db']:
+                with app.DB_LOCK:
+                    app.DB['role_db'][u_email] = u_role
+                    app.save_db(app.DB)
+                st.success("Updated!")
+            else: st.error("User not found.")
+    with st.expander("❌ Delete User (Danger Zone)"):
+        st.warning("Cannot be undone.")
+        del_email = st.text_input("Enter Email to Delete")
+        if st.button("Permanently Delete User", type="primary"):
+            if del_email in app.DB['role_db']:
+                with app.DB_LOCK:
+                    del app.DB['role_db'][del_email]
+                    if del_email in app.DB['passwords']: del app.DB['passwords'][del_email]
+                    if del_email in app.DB['usernames']: del app.DB['usernames'][del_email]
+                    app.save_db(app.DB)
+                st.success(f"User {del_email} deleted.")
+            else: st.error("User not found.")
+    st.table(pd.DataFrame(app.DB['role_db'].items(), columns=["Email", "Role"]))
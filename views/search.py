@@ -0,0 +1,43 @@
+"""Global search results for the sidebar search box."""
+import streamlit as st
+
+ICONS = {"mods": "🔧", "projects": "🚀", "announcements": "📢", "tutorials": "📚", "events": "📅"}
+
+
+def searchable(role):
+    """Collections `role` may see: the same split as the top navigation."""
+    if role in ["admin", "SUPER_ADMIN"]: return None  # everything
+    if role == "staff": return ["announcements"]
+    return ["announcements", "tutorials", "events"]
+
+
+def open_args(hit):
+    """navigate_to() arguments for the page showing `hit`."""
+    if hit['collection'] == "mods": return ("mod_detail", hit['ref'], None)
+    if hit['collection'] == "projects": return ("project_detail", None, hit['ref'])
+    return (f"view_{hit['collection']}",)
+
+
+def search(app):
+    st.title("🔎 Search")
+    query = st.session_state.get("search_query", "")
+    if not query.strip():
+        st.info("Type a word or two into the search box in the sidebar.")
+        return
+    index = app.get_search_index()
+    with app.METRICS.time("search"):
+        index.sync_threads(app.DISCUSSIONS_DIR)  # messages posted since the last search, by any process
+        hits, total = index.search(query, app.SEARCH_RESULTS, collections=searchable(app.user_role))
+    if not hits:
+        st.info(f"Nothing matches “{query}”.")
+        return
+    st.caption(f"{total} matches" + (f", best {len(hits)} shown" if total > len(hits) else ""))
+    for i, hit in enumerate(hits):
+        with st.container(border=True):
+            c1, c2 = st.columns([5, 1])
+            with c1:
+                where = f"💬 {hit['author']} in " if hit['message'] else ""
+                st.markdown(f"{ICONS[hit['collection']]} {where}**{hit['title']}**", unsafe_allow_html=True)
+                st.markdown(hit['snippet'], unsafe_allow_html=True)
+            with c2:
+                st.button("Open", key=f"hit_{i}", on_click=app.navigate_to, args=open_args(hit))
@@ -0,0 +1,26 @@
+"""Tutorials."""
+import streamlit as st
+from streamlit_quill import st_quill
+
+
+def create_tutorial(app):
+    st.title("Create Tutorial")
+    title = st.text_input("Title")
+    content = st_quill(key="tut_desc")
+    if st.button("Save"):
+        with app.DB_LOCK:
+            app.DB['tutorials'].append({"title": title, "content": content})
+            app.save_db(app.DB)
+        st.success("Saved!")
+        st.session_state.page = "view_tutorials"
+        st.rerun()
+
+
+def view_tutorials(app):
+    st.title("Tutorials")
+    def show_tutorial(t):
+        with st.container(border=True):
+            st.subheader(t['title'])
+            app.show_html(t['content'])
+    app.render_feed("tutorials", app.DB['tutorials'], show_tutorial,
+                    {"Oldest first": (None, False), "Newest first": (None, True)}, empty="No tutorials.")
@@ -0,0 +1,24 @@
+"""Staff roster."""
+import streamlit as st
+
+
+def view_users(app):
+    st.title("Staff Roster")
+
+    @st.fragment(run_every=app.LIVE_POLL_SECONDS or None)
+    def roster():
+        online = app.get_presence().online(app.DB['role_db'])  # heartbeat files: one stat() per user
+        for email, role in list(app.DB['role_db'].items()):  # a copy: an edit may be changing the dict
+            show_user(email, role, email in online)
+
+    def show_user(email, role, online):
+        with st.container(border=True):
+            c1, c2, c3 = st.columns([1,4,2])
+            u_name = app.DB.get('usernames', {}).get(email, "Unknown User")
+            with c1: st.write("👤")
+            with c2: 
+                st.subheader(u_name)
+                if app.user_role == "SUPER_ADMIN": st.caption(f"Email: {email}")
+                st.caption(f"Role: {role}")
+            with c3: st.write("🟢 Online" if online else "⚪ Offline")
+    roster()
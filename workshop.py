@@ -0,0 +1,473 @@
+"""
+Reforger Workshop scraping and the metadata cache in front of it.
+"""
+import codecs
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+WORKSHOP_URL = "https://reforger.armaplatform.com/workshop/"
+
+
+# --- HTTP ---
+# A `get(url)` returns (status_code, body). body is either the whole page as a
+# str or an iterable of bytes chunks; stop iterating (and close() it) to drop
+# the connection early. Swap it out to test without the network.
+
+def _stream_body(response, chunk_size=8192):
+    try:
+        yield from response.iter_content(chunk_size)
+    finally:
+        response.close()
+
+
+def http_get(url, timeout=5):
+    response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=timeout, stream=True)
+    return response.status_code, _stream_body(response)
+
+
+class HostRateLimiter:
+    """Spaces requests to the same host at least 1/rate seconds apart, across threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        if not self.interval: return
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def make_session_get(max_connections=8, rate=4.0, timeout=5):
+    """A get(url) that reuses keep-alive connections and respects a per-host request rate."""
+    session = requests.Session()
+    session.headers['User-Agent'] = 'Mozilla/5.0'
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_connections)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    limiter = HostRateLimiter(rate)
+
+    def get(url):
+        limiter.wait(url)
+        response = session.get(url, timeout=timeout, stream=True)
+        return response.status_code, _stream_body(response)
+
+    return get
+
+
+def normalize_mod_id(mod_input):
+    """Accepts a workshop URL or a bare ID; returns the upper-case modId, or None if unparseable."""
+    mod_id = mod_input.strip()
+    if "reforger.armaplatform.com/workshop/" in mod_id:
+        try:
+            mod_id = mod_id.split("workshop/")[1].split("-")[0]
+        except IndexError: return None
+    mod_id = mod_id.split("?")[0].split("#")[0].strip("/ ")
+    return mod_id.upper() or None
+
+
+# --- PAGE PARSING ---
+VERSION_META = ("version", "og:version", "product:version", "softwareversion")
+
+
+class _HeadMetaParser(HTMLParser):
+    """Collects og:title / og:image / version meta tags and flags when the <head> is over."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta = {}
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "body":
+            self.done = True
+        elif tag == "meta":
+            a = dict(attrs)
+            key = (a.get("property") or a.get("name") or a.get("itemprop") or "").lower()
+            if key in ("og:title", "og:image") or key in VERSION_META:
+                self.meta.setdefault("version" if key in VERSION_META else key, a.get("content"))
+                if {"og:title", "og:image", "version"} <= self.meta.keys():
+                    self.done = True
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            self.done = True
+
+
+def _soup_meta(html):
+    """Full BeautifulSoup parse: the slow path, kept for pages the streaming parser can't read."""
+    from bs4 import BeautifulSoup  # imported on first use; most pages never get here
+    soup = BeautifulSoup(html, 'html.parser')
+    meta = {}
+    for key in ("og:title", "og:image"):
+        tag = soup.find("meta", property=key)
+        if tag: meta[key] = tag.get("content")
+    return meta
+
+
+def extract_head_meta(body):
+    """
+    Reads the page a chunk at a time and stops at </head> (or once title, image
+    and version are all seen), closing the stream so the rest is never
+    downloaded. Returns a subset of {"og:title", "og:image", "version"}.
+    """
+    chunks = iter([body] if isinstance(body, (str, bytes)) else body)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    decode = lambda c: decoder.decode(c) if isinstance(c, bytes) else c
+    parser = _HeadMetaParser()
+    seen = []
+    try:
+        try:
+            for chunk in chunks:
+                seen.append(decode(chunk))
+                parser.feed(seen[-1])
+                if parser.done:
+                    break
+            meta = parser.meta
+        except Exception:
+            meta = {}
+        if "og:title" not in meta:
+            seen.extend(decode(c) for c in chunks)
+            meta = {**_soup_meta("".join(seen)), **meta}
+    finally:
+        if hasattr(body, "close"):
+            body.close()
+    return meta
+
+
+def parse_mod_page(body):
+    """Returns {"name", "image_url", "version"} from a workshop page body (str or chunk stream)."""
+    meta = extract_head_meta(body)
+    return {
+        "name": meta.get("og:title") or "Unknown Mod",
+        "image_url": meta.get("og:image"),
+        "version": meta.get("version") or "",
+    }
+
+
+_NEXT_DATA = re.compile(r'<script[^>]*\bid="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+_MOD_ID = re.compile(r"^[0-9A-Fa-f]{16}$")
+
+
+def _read_all(body):
+    if isinstance(body, str): return body
+    if isinstance(body, bytes): return body.decode("utf-8", "replace")
+    try:
+        return b"".join(c if isinstance(c, bytes) else c.encode() for c in body).decode("utf-8", "replace")
+    finally:
+        if hasattr(body, "close"): body.close()
+
+
+def _dependency(item):
+    """{"modId", "name"} from one entry of a dependencies list, or None if it has no usable id."""
+    if not isinstance(item, dict): return None
+    asset = item.get("asset") if isinstance(item.get("asset"), dict) else {}
+    mod_id = next((str(v) for v in (item.get("id"), item.get("assetId"), item.get("modId"), asset.get("id")) if v), "")
+    if not _MOD_ID.match(mod_id): return None
+    return {"modId": mod_id.upper(), "name": item.get("name") or asset.get("name") or mod_id.upper()}
+
+
+def parse_dependencies(html, mod_id=None):
+    """
+    [{"modId", "name"}] the page's mod depends on, read from the Next.js
+    __NEXT_DATA__ payload at the end of the page: the "dependencies" list of
+    the asset whose id is `mod_id`, else the first such list found. [] when
+    the page has none.
+    """
+    m = _NEXT_DATA.search(html)
+    if not m: return []
+    try:
+        stack = [json.loads(m.group(1))]
+    except ValueError:
+        return []
+    first = None
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            deps = node.get("dependencies")
+            if isinstance(deps, list):
+                if mod_id and str(node.get("id", "")).upper() == mod_id:
+                    first = deps
+                    break
+                if first is None: first = deps
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    found = {}
+    for item in first or ():
+        dep = _dependency(item)
+        if dep and dep["modId"] != mod_id: found.setdefault(dep["modId"], dep)
+    return list(found.values())
+
+
+def scrape_mod(mod_id, get=http_get, base_url=WORKSHOP_URL, dependencies=False):
+    """
+    Fetches one workshop page. Returns (status, meta) where meta is
+    {"name", "image_url", "version"} on a 200 and None otherwise. With
+    `dependencies` the whole page is read (not just the <head>) and meta also
+    gets "dependencies": [{"modId", "name"}].
+    """
+    status, body = get(base_url + mod_id)
+    if status != 200:
+        if hasattr(body, "close"): body.close()
+        return status, None
+    if not dependencies:
+        return status, parse_mod_page(body)
+    page = _read_all(body)
+    return status, {**parse_mod_page(page), "dependencies": parse_dependencies(page, mod_id)}
+
+
+# --- CACHE ---
+class MetadataCache:
+    """
+    modId -> {"name", "image_url", "version"} with an in-memory LRU in front of
+    a small SQLite file, so entries survive restarts.
+
+    Entries younger than `ttl` are served as-is. Older ones (up to `max_stale`)
+    are served immediately while a background thread refreshes them. 404s are
+    remembered for `negative_ttl` so a bad ID does not hit the site on every click.
+    """
+
+    def __init__(self, path, ttl=86400, max_stale=7 * 86400, negative_ttl=3600,
+                 max_entries=2000, get=http_get, clock=time.time, base_url=WORKSHOP_URL):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.get = get
+        self.clock = clock
+        self.base_url = base_url
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS workshop_cache (mod_id TEXT PRIMARY KEY, entry TEXT NOT NULL)")
+
+    def lookup(self, mod_id, dependencies=False):
+        """
+        Returns (meta, error). meta is None when the mod does not exist or
+        could not be fetched; error then says why. With `dependencies`, meta
+        also holds the mod's "dependencies"; entries cached without them
+        (head-only fetches) are fetched again in full.
+        """
+        entry = self._entry(mod_id)
+        now = self.clock()
+        if dependencies and entry is not None and entry["meta"] is not None and "dependencies" not in entry["meta"]:
+            return self._fetch(mod_id, fallback=entry, dependencies=True)
+        if entry is not None:
+            age = now - entry["fetched"]
+            if entry["missing"]:
+                if age < self.negative_ttl:
+                    return None, "Error: 404"
+            elif age < self.ttl:
+                return entry["meta"], None
+            elif age < self.ttl + self.max_stale:
+                self._refresh_in_background(mod_id, dependencies=dependencies)
+                return entry["meta"], None
+        return self._fetch(mod_id, fallback=entry, dependencies=dependencies)
+
+    def refresh(self, mod_id):
+        """
+        Re-fetches regardless of age. Returns (meta, status): status is the
+        HTTP code, or None when the request itself failed.
+        """
+        try:
+            return self._scrape_and_store(mod_id)[::-1]
+        except Exception:
+            return None, None
+
+    def invalidate(self, mod_id):
+        with self._lock:
+            self._mem.pop(mod_id, None)
+            self._conn.execute("DELETE FROM workshop_cache WHERE mod_id = ?", (mod_id,))
+
+    def _entry(self, mod_id):
+        with self._lock:
+            if mod_id in self._mem:
+                self._mem.move_to_end(mod_id)
+                return self._mem[mod_id]
+            row = self._conn.execute("SELECT entry FROM workshop_cache WHERE mod_id = ?", (mod_id,)).fetchone()
+            if row is None:
+                return None
+            entry = json.loads(row[0])
+            self._remember(mod_id, entry)
+            return entry
+
+    def _remember(self, mod_id, entry):
+        self._mem[mod_id] = entry
+        self._mem.move_to_end(mod_id)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def _store(self, mod_id, entry):
+        with self._lock:
+            self._remember(mod_id, entry)
+            self._conn.execute("INSERT OR REPLACE INTO workshop_cache VALUES (?, ?)", (mod_id, json.dumps(entry)))
+
+    def _scrape_and_store(self, mod_id, dependencies=False):
+        status, meta = scrape_mod(mod_id, get=self.get, base_url=self.base_url, dependencies=dependencies)
+        if status == 200 and not dependencies:
+            # A head-only fetch keeps the dependency list a full fetch stored, or the next resolve refetches it.
+            previous = self._entry(mod_id)
+            if previous is not None and previous["meta"] and "dependencies" in previous["meta"]:
+                meta["dependencies"] = previous["meta"]["dependencies"]
+        if status == 200 or status == 404:
+            self._store(mod_id, {"meta": meta, "missing": status == 404, "fetched": self.clock()})
+        return status, meta
+
+    def _fetch(self, mod_id, fallback=None, dependencies=False):
+        try:
+            status, meta = self._scrape_and_store(mod_id, dependencies)
+        except Exception as e:
+            # Network trouble: an old answer beats none.
+            if fallback is not None and not fallback["missing"]:
+                return fallback["meta"], None
+            return None, str(e)
+        if meta is None:
+            return None, f"Error: {status}"
+        return meta, None
+
+    def _refresh_in_background(self, mod_id, dependencies=False):
+        with self._lock:
+            if mod_id in self._refreshing: return
+            self._refreshing.add(mod_id)
+
+        def run():
+            try:
+                self._fetch(mod_id, dependencies=dependencies)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(mod_id)
+
+        threading.Thread(target=run, daemon=True).start()
+
+
+def fetch_mod_details(mod_input, cache=None, get=http_get):
+    """Returns (mod_id, name, image_url, version) on success or (mod_id, None, None, error)."""
+    mod_id = normalize_mod_id(mod_input)
+    if mod_id is None:
+        return None, None, None, "Invalid URL format"
+    if cache is not None:
+        meta, error = cache.lookup(mod_id)
+    else:
+        try:
+            status, meta = scrape_mod(mod_id, get=get)
+            error = None if meta else f"Error: {status}"
+        except Exception as e:
+            meta, error = None, str(e)
+    if meta is None:
+        return mod_id, None, None, error
+    return mod_id, meta["name"], meta["image_url"], meta["version"]
+
+
+# --- BULK ---
+def parse_bulk_input(text):
+    """Splits pasted text (one URL/ID per line, commas or spaces also fine) into unique modIds, in order."""
+    seen = {}
+    for token in re.split(r"[\s,]+", text):
+        if token:
+            mod_id = normalize_mod_id(token)
+            if mod_id: seen.setdefault(mod_id, None)
+    return list(seen)
+
+
+def fetch_many(mod_ids, cache=None, get=http_get, max_workers=8):
+    """
+    Looks up many mods concurrently on a bounded thread pool.
+    Yields (mod_id, name, image_url, version_or_error) as each one finishes.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(fetch_mod_details, mod_id, cache, get) for mod_id in mod_ids]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+# --- DEPENDENCIES ---
+def resolve_dependencies(root_ids, lookup, max_depth=5, max_workers=8):
+    """
+    Everything `root_ids` need, transitively. lookup(mod_id) -> (meta, error)
+    must fill in meta["dependencies"] (MetadataCache.lookup(..., dependencies=True)).
+
+    The graph is crawled breadth-first, one round of concurrent lookups per
+    level, each mod looked up once. A modpack that lists all its parts is one
+    round after the pack itself. Mods more than `max_depth` levels down are
+    kept (their names come from the page that lists them) but not expanded.
+
+    Returns {"mods": [{"modId", "name", "version"}] in dependency order,
+    every mod after the ones it needs; "cycles": [[modId, ..., modId]] edges
+    that had to be ignored; "failed": {modId: error}; "truncated": [modId]}.
+    """
+    names, edges, failed = {}, {}, {}
+    roots = list(dict.fromkeys(root_ids))
+    seen, frontier = set(roots), roots
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for _ in range(max_depth + 1):
+            if not frontier: break
+            found = []
+            for mod_id, result in zip(frontier, pool.map(lambda m: _safe_lookup(lookup, m), frontier)):
+                meta, error = result
+                if meta is None:
+                    failed[mod_id] = error
+                    continue
+                names[mod_id] = meta["name"]
+                deps = meta.get("dependencies") or []
+                edges[mod_id] = [d["modId"] for d in deps]
+                for d in deps:
+                    names.setdefault(d["modId"], d["name"])
+                    if d["modId"] not in seen:
+                        seen.add(d["modId"])
+                        found.append(d["modId"])
+            frontier = found
+    order, cycles = _topological(roots, edges)
+    return {
+        "mods": [{"modId": m, "name": names.get(m, m), "version": ""} for m in order],
+        "cycles": cycles,
+        "failed": failed,
+        "truncated": frontier,
+    }
+
+
+def _safe_lookup(lookup, mod_id):
+    try:
+        return lookup(mod_id)
+    except Exception as e:
+        return None, str(e)
+
+
+def _topological(roots, edges):
+    """Post-order DFS from `roots` (iterative): (order, cycles). A back edge closes a cycle and is skipped."""
+    order, cycles, state = [], [], {}
+    for root in roots:
+        if root in state: continue
+        state[root] = "open"
+        stack = [(root, iter(edges.get(root, ())))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                state[node] = "done"
+                order.append(node)
+            elif state.get(child) == "open":
+                path = [n for n, _ in stack]
+                cycles.append(path[path.index(child):] + [child])
+            elif child not in state:
+                state[child] = "open"
+                stack.append((child, iter(edges.get(child, ()))))
+    return order, cycles